@@ -5,6 +5,7 @@
 提供智能的並發處理、負載均衡和資源管理
 """
 
+import multiprocessing
 import time
 import threading
 import queue
@@ -15,7 +16,7 @@ from dataclasses import dataclass
 from enum import Enum
 import psutil
 import os
-from ..utils.logger import setup_logger
+from ..utils.logger import setup_logger, init_worker_logging
 
 # 建立日誌器
 logger = setup_logger(__name__)
@@ -217,8 +218,10 @@ class ConcurrentOptimizer:
             
             # 創建執行器
             if task_type == TaskType.CPU_INTENSIVE:
-                # CPU密集型使用進程池
-                executor = ProcessPoolExecutor(max_workers=max_workers)
+                # CPU密集型使用進程池（spawn 啟動，子進程改用一般日誌handler）
+                executor = ProcessPoolExecutor(max_workers=max_workers,
+                                               mp_context=multiprocessing.get_context('spawn'),
+                                               initializer=init_worker_logging)
             else:
                 # 其他類型使用線程池
                 executor = ThreadPoolExecutor(max_workers=max_workers)
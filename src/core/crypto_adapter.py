@@ -104,8 +104,8 @@ class CryptoAdapter:
             pair_column = 'pair' if 'pair' in validated_data.columns else 'symbol'
             
             for pair in validated_data[pair_column].unique():
-                pair_data = validated_data[validated_data[pair_column] == pair].copy()
-                pair_data = pair_data.set_index('Date', drop=False)
+                # set_index 會回傳新的DataFrame，不需先 copy
+                pair_data = validated_data[validated_data[pair_column] == pair].set_index('Date', drop=False)
                 
                 # 計算技術指標
                 try:
@@ -243,16 +243,16 @@ class CryptoDatabaseManager:
                 if col in save_data.columns:
                     save_data = save_data.drop(col, axis=1)
             
-            # 刪除舊資料
-            for _, row in save_data.iterrows():
-                if pd.notna(row.get('date')) and pd.notna(row.get('pair')):
-                    # 確保日期格式一致（只保留日期部分）
-                    date_str = pd.to_datetime(row['date']).strftime('%Y-%m-%d')
-                    # 刪除可能存在的帶時間格式的記錄
-                    conn.execute(
-                        "DELETE FROM crypto_data WHERE (date = ? OR date = ?) AND pair = ?",
-                        (date_str, date_str + ' 00:00:00', str(row['pair']))
-                    )
+            # 刪除舊資料（同一交易內以 executemany 批次刪除）
+            if 'date' in save_data.columns and 'pair' in save_data.columns:
+                keys = save_data[['date', 'pair']].dropna()
+                # 確保日期格式一致（只保留日期部分）
+                date_strs = pd.to_datetime(keys['date']).dt.strftime('%Y-%m-%d')
+                # 刪除可能存在的帶時間格式的記錄
+                conn.executemany(
+                    "DELETE FROM crypto_data WHERE (date = ? OR date = ?) AND pair = ?",
+                    zip(date_strs, date_strs + ' 00:00:00', keys['pair'].astype(str))
+                )
             
             # 插入新資料
             save_data.to_sql('crypto_data', conn, if_exists='append', index=False)
@@ -212,13 +212,13 @@ class DatabaseManager:
                 if col in save_data.columns:
                     save_data = save_data.drop(col, axis=1)
             
-            # 刪除舊資料
-            for _, row in save_data.iterrows():
-                if pd.notna(row.get('date')) and pd.notna(row.get('symbol')):
-                    conn.execute(
-                        "DELETE FROM stock_data WHERE date = ? AND symbol = ?",
-                        (str(row['date']), str(row['symbol']))
-                    )
+            # 刪除舊資料（同一交易內以 executemany 批次刪除）
+            if 'date' in save_data.columns and 'symbol' in save_data.columns:
+                keys = save_data[['date', 'symbol']].dropna()
+                conn.executemany(
+                    "DELETE FROM stock_data WHERE date = ? AND symbol = ?",
+                    zip(keys['date'].astype(str), keys['symbol'].astype(str))
+                )
             
             # 插入新資料
             save_data.to_sql('stock_data', conn, if_exists='append', index=False)
@@ -253,6 +253,9 @@ class DatabaseManager:
                 df['Date'] = pd.to_datetime(df['date'])
                 df = df.drop('date', axis=1)
                 
+                # 股票代碼大量重複，轉為類別型態以節省記憶體並加快分組
+                df['symbol'] = df['symbol'].astype('category')
+                
                 # 轉換布林值
                 bool_columns = ['system1_breakout', 'system2_breakout', 'bnf_buy_signal',
                               'volatility_check', 'price_contract', 'ma_alignment',
@@ -272,6 +275,9 @@ class DatabaseManager:
                 first_columns = ['symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
                 other_columns = [col for col in df.columns if col not in first_columns]
                 df = df[first_columns + other_columns]
+                
+                # 以日期為索引（保留 Date 欄位），分組後各股票資料不需再逐一建立索引
+                df = df.set_index('Date', drop=False)
             
             return df
     
@@ -80,37 +80,39 @@ class StockDataFetcher:
         
         logger.info(f"📊 需要更新 {len(missing_dates)} 支股票的資料...")
         
-        # 批量下載
-        all_prices = pd.DataFrame()
+        # 批量下載（整個更新過程共用同一個執行緒池）
         failed_symbols = []
         batch_size = 50
         symbols_to_update = list(missing_dates.keys())
         
-        for batch_start in range(0, len(symbols_to_update), batch_size):
-            batch_end = min(batch_start + batch_size, len(symbols_to_update))
-            batch_symbols = symbols_to_update[batch_start:batch_end]
-            
-            if batch_start > 0:
-                logger.info(f"📊 等待3秒後再抓取下一批次...")
-                time.sleep(3)
-            
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_symbol = {}
-                for symbol in batch_symbols:
-                    start_date = missing_dates[symbol]
-                    future = executor.submit(self.fetch_single_stock, symbol, start_date, end_date)
-                    future_to_symbol[future] = symbol
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_start in range(0, len(symbols_to_update), batch_size):
+                batch_end = min(batch_start + batch_size, len(symbols_to_update))
+                batch_symbols = symbols_to_update[batch_start:batch_end]
+                
+                if batch_start > 0:
+                    logger.info(f"📊 等待3秒後再抓取下一批次...")
+                    time.sleep(3)
                 
-                for future in as_completed(future_to_symbol):
+                # 一次提交整個批次的請求
+                futures = [
+                    executor.submit(self.fetch_single_stock, symbol, missing_dates[symbol], end_date)
+                    for symbol in batch_symbols
+                ]
+                
+                batch_frames = []
+                for future in as_completed(futures):
                     stock_data, failed_symbol = future.result()
                     
                     if stock_data is not None:
                         # 只保存價格資料，指標稍後計算
-                        basic_data = stock_data[['symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-                        self.db_manager.save_stock_data(basic_data)
-                        all_prices = pd.concat([all_prices, stock_data], ignore_index=True)
+                        batch_frames.append(stock_data[['symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']])
                     else:
                         failed_symbols.append(failed_symbol)
+                
+                # 每個批次合併後一次寫入資料庫
+                if batch_frames:
+                    self.db_manager.save_stock_data(pd.concat(batch_frames, ignore_index=True))
         
         # 載入完整資料
         start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days_back)).strftime('%Y-%m-%d')
@@ -124,23 +126,26 @@ class StockDataFetcher:
         """批量抓取股票資料（不分批次）"""
         logger.info(f"📊 開始批量抓取 {len(symbols)} 支股票資料...")
         
-        all_data = pd.DataFrame()
+        frames = []
         failed_symbols = []
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_symbol = {}
-            for symbol in symbols:
-                future = executor.submit(self.fetch_single_stock, symbol, start_date, end_date)
-                future_to_symbol[future] = symbol
+            futures = [
+                executor.submit(self.fetch_single_stock, symbol, start_date, end_date)
+                for symbol in symbols
+            ]
             
-            for future in as_completed(future_to_symbol):
+            for future in as_completed(futures):
                 stock_data, failed_symbol = future.result()
                 
                 if stock_data is not None:
-                    all_data = pd.concat([all_data, stock_data], ignore_index=True)
+                    frames.append(stock_data)
                 else:
                     failed_symbols.append(failed_symbol)
         
+        # 迴圈結束後一次合併，避免重複複製
+        all_data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        
         logger.info(f"✅ 批量抓取完成: 成功 {len(symbols) - len(failed_symbols)} 支, 失敗 {len(failed_symbols)} 支")
         
         return all_data, failed_symbols
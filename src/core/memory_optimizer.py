@@ -10,16 +10,24 @@ import sys
 import threading
 import time
 import weakref
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import psutil
+import numpy as np
 import pandas as pd
 from ..utils.logger import setup_logger
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
+# 整數降級查表（由小到大），避免在迴圈中重複比較硬編碼的邊界值
+_UNSIGNED_INT_DTYPES = tuple((np.iinfo(dtype).max, dtype) for dtype in (np.uint8, np.uint16, np.uint32))
+_SIGNED_INT_DTYPES = tuple(
+    (np.iinfo(dtype).min, np.iinfo(dtype).max, dtype) for dtype in (np.int8, np.int16, np.int32)
+)
+
 
 @dataclass
 class MemoryUsage:
@@ -31,19 +39,53 @@ class MemoryUsage:
     gc_collections: Dict[str, int]
 
 
+@dataclass
+class MemoryStatsSnapshot:
+    """記憶體統計快照"""
+    __slots__ = ('total_cleanups', 'total_objects_freed', 'registry_evictions', 'peak_memory_mb',
+                 'start_time', 'current_memory_mb', 'current_system_memory_percent',
+                 'current_python_objects', 'registered_objects', 'tracked_large_objects',
+                 'memory_history_size', 'memory_trend_mb')
+    total_cleanups: int
+    total_objects_freed: int
+    registry_evictions: int
+    peak_memory_mb: float
+    start_time: datetime
+    current_memory_mb: float
+    current_system_memory_percent: float
+    current_python_objects: int
+    registered_objects: int
+    tracked_large_objects: int
+    memory_history_size: int
+    memory_trend_mb: Optional[float]  # 記憶體歷史不足時為 None
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """轉換為字典（供JSON匯出等需要字典的場合）"""
+        return asdict(self)
+
+
 class MemoryOptimizer:
     """記憶體使用優化器"""
     
-    def __init__(self, monitoring_interval: float = 5.0, cleanup_threshold: float = 80.0):
+    def __init__(self, monitoring_interval: float = 5.0, cleanup_threshold: float = 80.0,
+                 max_registry_size: int = 10000, min_force_gc_interval_s: float = 1.0):
         """
         初始化記憶體優化器
         
         Args:
             monitoring_interval: 監控間隔（秒）
             cleanup_threshold: 清理閾值（記憶體使用率百分比）
+            max_registry_size: 物件註冊表最大項目數，超過時移除最久未使用的項目
+            min_force_gc_interval_s: 強制垃圾回收的最小間隔（秒），間隔內重複呼叫返回上次結果
         """
         self.monitoring_interval = monitoring_interval
         self.cleanup_threshold = cleanup_threshold
+        self.max_registry_size = max_registry_size
+        self.min_force_gc_interval_s = min_force_gc_interval_s
+        
+        # 強制垃圾回收節流狀態
+        self._last_force_gc_ns = 0
+        self._last_force_gc_result: Optional[Dict[str, int]] = None
         
         # 監控狀態
         self.monitoring = False
@@ -53,14 +95,22 @@ class MemoryOptimizer:
         self.memory_history: List[MemoryUsage] = []
         self.max_history = 1000
         
+        # 趨勢視窗：最近5筆與前5筆的滑動總和，由監控循環增量維護
+        self.trend_window = 5
+        self._recent_window: deque = deque()
+        self._prev_window: deque = deque()
+        self._recent_sum = 0.0
+        self._prev_sum = 0.0
+        
         # 弱引用集合，用於追蹤大物件
         self.large_objects: Set[weakref.ref] = set()
-        self.object_registry: Dict[str, Any] = {}
+        self.object_registry: OrderedDict[str, Any] = OrderedDict()
         
         # 統計資訊
         self.stats = {
             'total_cleanups': 0,
             'total_objects_freed': 0,
+            'registry_evictions': 0,
             'peak_memory_mb': 0,
             'start_time': datetime.now()
         }
@@ -101,6 +151,9 @@ class MemoryOptimizer:
                     if len(self.memory_history) > self.max_history:
                         self.memory_history.pop(0)
                     
+                    # 更新趨勢視窗
+                    self._update_trend_windows(memory_usage.process_memory_mb)
+                    
                     # 更新峰值記憶體
                     if memory_usage.process_memory_mb > self.stats['peak_memory_mb']:
                         self.stats['peak_memory_mb'] = memory_usage.process_memory_mb
@@ -116,6 +169,21 @@ class MemoryOptimizer:
                 logger.error(f"記憶體監控錯誤: {str(e)}")
                 time.sleep(self.monitoring_interval)
     
+    def _update_trend_windows(self, memory_mb: float):
+        """增量更新趨勢視窗總和（O(1)），需在鎖內呼叫"""
+        self._recent_window.append(memory_mb)
+        self._recent_sum += memory_mb
+        
+        if len(self._recent_window) > self.trend_window:
+            # 移出最近視窗的樣本進入前一視窗
+            shifted = self._recent_window.popleft()
+            self._recent_sum -= shifted
+            self._prev_window.append(shifted)
+            self._prev_sum += shifted
+            
+            if len(self._prev_window) > self.trend_window:
+                self._prev_sum -= self._prev_window.popleft()
+    
     def _collect_memory_usage(self) -> MemoryUsage:
         """收集記憶體使用資訊"""
         # 進程記憶體使用
@@ -242,8 +310,15 @@ class MemoryOptimizer:
             if name is None:
                 name = f"object_{id(obj)}"
             
-            # 添加到物件註冊表
+            # 添加到物件註冊表（LRU：重複註冊時移到最新位置）
             self.object_registry[name] = obj
+            self.object_registry.move_to_end(name)
+            
+            # 超過上限時移除最久未使用的項目
+            while len(self.object_registry) > self.max_registry_size:
+                evicted_name, _ = self.object_registry.popitem(last=False)
+                self.stats['registry_evictions'] += 1
+                logger.debug(f"物件註冊表已滿，移除最舊物件: {evicted_name}")
             
             # 添加到弱引用集合
             if hasattr(obj, '__weakref__'):
@@ -274,30 +349,43 @@ class MemoryOptimizer:
                 return True
             return False
     
-    def get_memory_stats(self) -> Dict[str, Any]:
+    def get_memory_stats(self) -> MemoryStatsSnapshot:
         """獲取記憶體統計資訊"""
+        # 收集當前狀態不需持有鎖
+        current_usage = self._collect_memory_usage()
+        
+        # 只在鎖內讀取數值，縮短臨界區
         with self.lock:
-            current_usage = self._collect_memory_usage()
-            
-            stats = self.stats.copy()
-            stats.update({
-                'current_memory_mb': current_usage.process_memory_mb,
-                'current_system_memory_percent': current_usage.system_memory_percent,
-                'current_python_objects': current_usage.python_objects,
-                'registered_objects': len(self.object_registry),
-                'tracked_large_objects': len(self.large_objects),
-                'memory_history_size': len(self.memory_history)
-            })
+            total_cleanups = self.stats['total_cleanups']
+            total_objects_freed = self.stats['total_objects_freed']
+            registry_evictions = self.stats['registry_evictions']
+            peak_memory_mb = self.stats['peak_memory_mb']
+            start_time = self.stats['start_time']
+            registered_objects = len(self.object_registry)
+            tracked_large_objects = len(self.large_objects)
+            history_size = len(self.memory_history)
             
             # 計算記憶體趨勢
-            if len(self.memory_history) >= 2:
+            memory_trend = None
+            if history_size >= 2:
                 recent_usage = self.memory_history[-1]
-                older_usage = self.memory_history[-min(10, len(self.memory_history))]
-                
+                older_usage = self.memory_history[-min(10, history_size)]
                 memory_trend = recent_usage.process_memory_mb - older_usage.process_memory_mb
-                stats['memory_trend_mb'] = memory_trend
-            
-            return stats
+        
+        return MemoryStatsSnapshot(
+            total_cleanups=total_cleanups,
+            total_objects_freed=total_objects_freed,
+            registry_evictions=registry_evictions,
+            peak_memory_mb=peak_memory_mb,
+            start_time=start_time,
+            current_memory_mb=current_usage.process_memory_mb,
+            current_system_memory_percent=current_usage.system_memory_percent,
+            current_python_objects=current_usage.python_objects,
+            registered_objects=registered_objects,
+            tracked_large_objects=tracked_large_objects,
+            memory_history_size=history_size,
+            memory_trend_mb=memory_trend
+        )
     
     def get_memory_history(self, hours: int = 1) -> List[MemoryUsage]:
         """
@@ -329,36 +417,42 @@ class MemoryOptimizer:
         
         original_memory = df.memory_usage(deep=True).sum() / (1024 * 1024)  # MB
         
-        optimized_df = df.copy()
-        
-        # 優化數值類型
-        for col in optimized_df.select_dtypes(include=['int64']).columns:
-            if optimized_df[col].min() >= 0:
-                if optimized_df[col].max() < 255:
-                    optimized_df[col] = optimized_df[col].astype('uint8')
-                elif optimized_df[col].max() < 65535:
-                    optimized_df[col] = optimized_df[col].astype('uint16')
-                elif optimized_df[col].max() < 4294967295:
-                    optimized_df[col] = optimized_df[col].astype('uint32')
-            else:
-                if optimized_df[col].min() > -128 and optimized_df[col].max() < 127:
-                    optimized_df[col] = optimized_df[col].astype('int8')
-                elif optimized_df[col].min() > -32768 and optimized_df[col].max() < 32767:
-                    optimized_df[col] = optimized_df[col].astype('int16')
-                elif optimized_df[col].min() > -2147483648 and optimized_df[col].max() < 2147483647:
-                    optimized_df[col] = optimized_df[col].astype('int32')
-        
-        # 優化浮點類型
-        for col in optimized_df.select_dtypes(include=['float64']).columns:
-            optimized_df[col] = optimized_df[col].astype('float32')
-        
-        # 優化字串類型
-        for col in optimized_df.select_dtypes(include=['object']).columns:
-            if optimized_df[col].dtype == 'object':
-                try:
-                    optimized_df[col] = optimized_df[col].astype('category')
-                except:
-                    pass  # 如果轉換失敗，保持原樣
+        # 欄位轉換期間會產生大量短命的暫存Series，暫停自動循環回收以避免
+        # 在批次配置中途觸發gen-0回收；僅限此區段，結束後恢復原本的GC狀態
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            optimized_df = df.copy()
+        
+            # 優化數值類型
+            for col in optimized_df.select_dtypes(include=['int64']).columns:
+                col_min = optimized_df[col].min()
+                col_max = optimized_df[col].max()
+                if col_min >= 0:
+                    for max_val, dtype in _UNSIGNED_INT_DTYPES:
+                        if col_max <= max_val:
+                            optimized_df[col] = optimized_df[col].astype(dtype)
+                            break
+                else:
+                    for min_val, max_val, dtype in _SIGNED_INT_DTYPES:
+                        if min_val <= col_min and col_max <= max_val:
+                            optimized_df[col] = optimized_df[col].astype(dtype)
+                            break
+        
+            # 優化浮點類型
+            for col in optimized_df.select_dtypes(include=['float64']).columns:
+                optimized_df[col] = optimized_df[col].astype('float32')
+        
+            # 優化字串類型
+            for col in optimized_df.select_dtypes(include=['object']).columns:
+                if optimized_df[col].dtype == 'object':
+                    try:
+                        optimized_df[col] = optimized_df[col].astype('category')
+                    except:
+                        pass  # 如果轉換失敗，保持原樣
+        finally:
+            if gc_was_enabled:
+                gc.enable()
         
         optimized_memory = optimized_df.memory_usage(deep=True).sum() / (1024 * 1024)  # MB
         memory_saved = original_memory - optimized_memory
@@ -387,14 +481,14 @@ class MemoryOptimizer:
             if current_usage.python_objects > 100000:
                 suggestions.append("Python物件數量過多，建議執行垃圾回收")
             
-            # 檢查註冊物件數量
-            if len(self.object_registry) > 1000:
-                suggestions.append("註冊物件數量過多，建議清理物件註冊表")
+            # 檢查註冊物件數量（註冊表已有上限，接近上限時才提示）
+            if len(self.object_registry) >= self.max_registry_size * 0.9:
+                suggestions.append("註冊物件數量接近上限，建議清理物件註冊表")
             
             # 檢查記憶體趨勢
-            if len(self.memory_history) >= 10:
-                recent_trend = sum(usage.process_memory_mb for usage in self.memory_history[-5:]) / 5
-                older_trend = sum(usage.process_memory_mb for usage in self.memory_history[-10:-5]) / 5
+            if len(self._prev_window) == self.trend_window:
+                recent_trend = self._recent_sum / self.trend_window
+                older_trend = self._prev_sum / self.trend_window
                 
                 if recent_trend - older_trend > 100:  # 記憶體增長超過100MB
                     suggestions.append("記憶體使用持續增長，建議檢查記憶體洩漏")
@@ -402,20 +496,31 @@ class MemoryOptimizer:
         return suggestions
     
     def force_gc(self) -> Dict[str, int]:
-        """強制垃圾回收"""
-        before_objects = len(gc.get_objects())
-        collected = gc.collect()
-        after_objects = len(gc.get_objects())
+        """
+        強制垃圾回收（在最小間隔內重複呼叫時返回上次結果）
         
+        回收本身不持有 self.lock，避免完整回收期間阻塞監控執行緒與物件註冊；
+        釋放數量為 gc.collect() 回傳的不可達物件數
+        """
+        with self.lock:
+            now_ns = time.monotonic_ns()
+            if (self._last_force_gc_result is not None and
+                    now_ns - self._last_force_gc_ns < self.min_force_gc_interval_s * 1e9):
+                logger.debug("強制垃圾回收過於頻繁，返回上次結果")
+                return dict(self._last_force_gc_result)
+        
+        collected = gc.collect()
         result = {
-            'objects_before': before_objects,
-            'objects_after': after_objects,
-            'objects_freed': before_objects - after_objects,
+            'objects_freed': collected,
             'gc_collections': collected
         }
         
+        with self.lock:
+            self._last_force_gc_ns = time.monotonic_ns()
+            self._last_force_gc_result = result
+        
         logger.info(f"強制垃圾回收: 釋放 {result['objects_freed']} 個物件")
-        return result
+        return dict(result)
 
 
 # 全域記憶體優化器實例
@@ -452,11 +557,11 @@ def main():
         # 顯示統計資訊
         stats = memory_optimizer.get_memory_stats()
         print("\n記憶體統計:")
-        print(f"  當前記憶體使用: {stats['current_memory_mb']:.1f}MB")
-        print(f"  系統記憶體使用率: {stats['current_system_memory_percent']:.1f}%")
-        print(f"  Python物件數量: {stats['current_python_objects']:,}")
-        print(f"  註冊物件數量: {stats['registered_objects']}")
-        print(f"  峰值記憶體使用: {stats['peak_memory_mb']:.1f}MB")
+        print(f"  當前記憶體使用: {stats.current_memory_mb:.1f}MB")
+        print(f"  系統記憶體使用率: {stats.current_system_memory_percent:.1f}%")
+        print(f"  Python物件數量: {stats.current_python_objects:,}")
+        print(f"  註冊物件數量: {stats.registered_objects}")
+        print(f"  峰值記憶體使用: {stats.peak_memory_mb:.1f}MB")
         
         # 執行清理
         print("\n執行記憶體清理...")
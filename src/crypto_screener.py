@@ -5,23 +5,83 @@
 整合加密貨幣資料源和策略系統的核心協調器
 """
 
+import multiprocessing
+import os
+import numpy as np
 import pandas as pd
-import json
-import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
 from .core.crypto_adapter import CryptoAdapter
 from .core.config import config_manager
 from .strategies.turtle import TurtleStrategy
 from .strategies.bnf import BNFStrategy
 from .strategies.coiled_spring import CoiledSpringStrategy
 from .utils.report import ReportGenerator
-from .utils.logger import setup_logger
-from .models.signals import TurtleSignal, BNFSignal, CoiledSpringSignal
+from .utils.history import load_history, append_history
+from .utils.logger import setup_logger, init_worker_logging
+from .models.signals import TurtleSignal, BNFSignal, CoiledSpringSignal, format_signal_date
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
+# 股票格式 → 加密貨幣資料庫格式的欄位對應
+_STOCK_TO_CRYPTO_COLUMNS = {
+    'symbol': 'pair',
+    'Date': 'date',
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume'
+}
+
+# 加密貨幣資料庫格式的前置欄位
+_CRYPTO_FIRST_COLUMNS = ['date', 'pair', 'exchange', 'open', 'high', 'low', 'close', 'volume']
+_CRYPTO_FIRST_COLUMN_SET = frozenset(_CRYPTO_FIRST_COLUMNS)
+
+# 所有策略的技術指標欄位（策略計算的指標已經是正確的名稱）
+_EXPECTED_INDICATORS = [
+    'atr', 'high_20', 'low_10', 'high_55', 'low_20', 'volume_20', 'volume_ratio',
+    'price_change_5d', 'price_change_20d', 'rsi', 'system1_breakout', 'system2_breakout',
+    'ma25', 'deviation_rate', 'bnf_buy_signal',
+    'ema_20', 'sma_50', 'sma_100', 'sd_10', 'sd_60', 'vol_10', 'vol_60',
+    'high_60', 'low_60', 'diff_percentage_3mo', 'price_up_6mo_days',
+    'volatility_check', 'price_contract', 'ma_alignment', 'up_trend_6mo',
+    'vol_contract', 'coiled_spring_signal'
+]
+
+
+def _process_symbol(symbol: str, symbol_data: pd.DataFrame, strategies: Dict[str, Any],
+                    account_value: float) -> Tuple[str, pd.DataFrame, Dict[str, List]]:
+    """
+    處理單一交易對：計算所有策略指標並檢測信號
+    
+    定義在模組層級以便在子進程中執行（策略物件需可被pickle）
+    
+    Args:
+        symbol: 交易對符號
+        symbol_data: 該交易對的資料
+        strategies: 策略名稱 → 策略物件
+        account_value: 帳戶價值
+        
+    Returns:
+        (交易對符號, 含指標的資料, 策略名稱 → 信號列表)
+    """
+    # 確保有技術指標（各策略指標欄位互不衝突，可累加在同一份資料上）
+    for strategy in strategies.values():
+        symbol_data = strategy.calculate_indicators(symbol_data)
+    
+    # 檢測信號
+    symbol_signals = {}
+    for strategy_name, strategy in strategies.items():
+        if strategy_name == 'turtle':
+            symbol_signals[strategy_name] = strategy.detect_signals(symbol, symbol_data, account_value)
+        else:
+            symbol_signals[strategy_name] = strategy.detect_signals(symbol, symbol_data)
+    
+    return symbol, symbol_data, symbol_signals
+
 
 class CryptoMultiStrategyScreener:
     """加密貨幣多策略篩選器 - 統一管理海龜、BNF和蓄勢待發策略"""
@@ -32,20 +92,24 @@ class CryptoMultiStrategyScreener:
         self.adapter = CryptoAdapter()
         self.report_generator = ReportGenerator()
         
-        # 初始化策略
-        self.strategies = {
-            'turtle': TurtleStrategy(),
-            'bnf': BNFStrategy(),
-            'coiled_spring': CoiledSpringStrategy()
+        # 策略延遲建立：僅在第一次使用時才實例化（資料庫更新、系統測試等流程不需要策略）
+        self._strategy_factories = {
+            'turtle': TurtleStrategy,
+            'bnf': BNFStrategy,
+            'coiled_spring': CoiledSpringStrategy
         }
+        self._strategy_cache = {}
         
         # 路徑配置
         self.paths = {
             'pairs_info': config_manager.get('crypto_paths.pairs_info', 'data/crypto_pairs.csv'),
             'output_dir': config_manager.get('crypto_paths.output_dir', 'data/'),
-            'signals_history_file': config_manager.get('crypto_paths.signals_history_file', 'data/crypto_signals_history.json')
+            'signals_history_file': config_manager.get('crypto_paths.signals_history_file', 'data/crypto_signals_history.jsonl')
         }
         
+        # 並行處理設定（1 表示不使用多進程）
+        self.max_workers = config_manager.get('crypto_screening.max_workers') or os.cpu_count() or 1
+        
         # 載入歷史記錄
         self.signals_history = self.load_signals_history()
         
@@ -53,21 +117,31 @@ class CryptoMultiStrategyScreener:
     
     def register_strategy(self, name: str, strategy):
         """註冊策略"""
-        self.strategies[name] = strategy
+        self._strategy_factories[name] = type(strategy)
+        self._strategy_cache[name] = strategy
         logger.info(f"策略 {name} 已註冊")
     
+    def _get_strategy(self, name: str):
+        """取得策略物件，第一次使用時才建立"""
+        strategy = self._strategy_cache.get(name)
+        if strategy is None:
+            strategy = self._strategy_factories[name]()
+            self._strategy_cache[name] = strategy
+        return strategy
+    
+    @property
+    def strategies(self) -> Dict[str, Any]:
+        """所有策略物件（會建立尚未使用的策略）"""
+        return {name: self._get_strategy(name) for name in self._strategy_factories}
+    
     def load_signals_history(self) -> dict:
-        """載入信號歷史記錄"""
-        try:
-            file_path = pathlib.Path(self.paths['signals_history_file'])
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except Exception as e:
-            logger.error(f"載入信號歷史記錄錯誤: {str(e)}")
-            return {}
+        """
+        載入信號歷史記錄
+        
+        歷史檔案為 JSONL 格式，每行為 {日期: {策略: [信號...]}}；
+        舊版 .json 檔案會先合併，同一日期同一策略以較晚的記錄為準
+        """
+        return load_history(self.paths['signals_history_file'])
     
     def load_symbols(self) -> List[str]:
         """載入交易對代碼"""
@@ -116,7 +190,7 @@ class CryptoMultiStrategyScreener:
             各策略的信號字典
         """
         if strategy_names is None:
-            strategy_names = list(self.strategies.keys())
+            strategy_names = list(self._strategy_factories)
         
         logger.info(f"🚀 開始執行加密貨幣策略篩選: {', '.join(strategy_names)}")
         logger.info("="*60)
@@ -153,8 +227,9 @@ class CryptoMultiStrategyScreener:
             logger.info(f"📋 載入 {len(symbols)} 個交易對代碼")
             
             # 載入資料
-            end_date = datetime.today().strftime('%Y-%m-%d')
-            start_date = (datetime.today() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+            today = datetime.now().date()
+            end_date = today.isoformat()
+            start_date = (today - timedelta(days=days_back)).isoformat()
             
             all_data = self.adapter.load_stock_data(symbols, start_date, end_date)
             
@@ -162,52 +237,28 @@ class CryptoMultiStrategyScreener:
                 logger.error("無法載入任何交易對資料")
                 return {}
             
-            # 執行各策略
-            all_signals = {}
+            # 交易對代碼大量重複，轉為類別型態以節省記憶體並加快分組
+            all_data['symbol'] = all_data['symbol'].astype('category')
             
+            # 建立交易對 → 列位置索引（只建立一次，各策略共用）
+            symbol_rows = self._build_symbol_row_index(all_data)
+            
+            # 篩選出存在的策略
+            active_strategies = {}
             for strategy_name in strategy_names:
-                if strategy_name not in self.strategies:
+                if strategy_name not in self._strategy_factories:
                     logger.warning(f"策略 {strategy_name} 不存在")
                     continue
-                
-                strategy = self.strategies[strategy_name]
-                signals = []
-                
-                logger.info(f"🔍 執行 {strategy_name} 策略...")
-                
-                for symbol in all_data['symbol'].unique():
-                    symbol_data = all_data[all_data['symbol'] == symbol].copy()
-                    # 不要將Date設為索引，保持為普通欄位
-                    # symbol_data = symbol_data.set_index('Date', drop=False)
-                    
-                    # 確保有技術指標
-                    symbol_data = strategy.calculate_indicators(symbol_data)
-                    
-                    # 檢測信號
-                    if strategy_name == 'turtle':
-                        s_signals = strategy.detect_signals(symbol, symbol_data, account_value)
-                    else:
-                        s_signals = strategy.detect_signals(symbol, symbol_data)
-                    
-                    # 將計算的指標和信號標記保存回資料庫
-                    try:
-                        # 轉換回加密貨幣格式
-                        crypto_data = self._convert_stock_to_crypto_format(symbol_data, symbol)
-                        self.adapter.db_manager.save_crypto_data(crypto_data)
-                        logger.debug(f"✓ {symbol}: 指標和信號標記已保存到資料庫")
-                    except Exception as e:
-                        logger.warning(f"⚠️ {symbol}: 保存指標和信號標記到資料庫失敗 - {str(e)}")
-                    
-                    signals.extend(s_signals)
-                
-                # 排序信號
-                signals.sort(key=lambda x: x.total_score, reverse=True)
-                all_signals[strategy_name] = signals
-                
-                logger.info(f"✅ {strategy_name} 策略完成: {len(signals)} 個信號")
+                active_strategies[strategy_name] = self._get_strategy(strategy_name)
+            
+            logger.info(f"🔍 執行 {', '.join(active_strategies)} 策略...")
             
-            # 生成報告
-            if any(all_signals.values()):
+            # 階段一：逐交易對計算指標與信號；階段二：一次保存資料庫並排序信號
+            symbol_results = self._collect_phase(all_data, symbol_rows, active_strategies, account_value)
+            all_signals = self._persist_phase(symbol_results, active_strategies)
+            
+            # 生成報告（有任何信號時）
+            if sum(map(len, all_signals.values())):
                 self._generate_reports(all_signals, end_date)
                 self._update_history(all_signals, end_date)
             
@@ -225,6 +276,148 @@ class CryptoMultiStrategyScreener:
             traceback.print_exc()
             return {}
     
+    def _collect_phase(self, all_data: pd.DataFrame, symbol_rows: Dict[str, np.ndarray],
+                       strategies: Dict[str, Any], account_value: float) -> Iterator[Tuple]:
+        """
+        收集階段：逐一產生各交易對的計算結果
+        
+        Args:
+            all_data: 所有交易對的資料
+            symbol_rows: 交易對 → 列位置索引
+            strategies: 要執行的策略
+            account_value: 帳戶價值
+            
+        Yields:
+            (交易對符號, 加密貨幣格式的指標資料, 策略名稱 → 信號列表)
+        """
+        # 以交易對為單位並行處理：每個交易對只計算一次所有策略的指標
+        for symbol, symbol_data, symbol_signals in self._run_symbol_tasks(
+                all_data, symbol_rows, strategies, account_value):
+            # 轉換回加密貨幣格式，稍後批次保存
+            crypto_data = self._convert_stock_to_crypto_format(symbol_data, symbol)
+            del symbol_data
+            yield symbol, crypto_data, symbol_signals
+    
+    def _persist_phase(self, symbol_results: Iterable[Tuple], strategy_names: Iterable[str]) -> Dict[str, List]:
+        """
+        保存階段：合併所有交易對的指標資料一次寫入資料庫，並排序各策略信號
+        
+        Args:
+            symbol_results: _collect_phase 產生的結果
+            strategy_names: 執行的策略名稱
+            
+        Returns:
+            各策略排序後的信號字典
+        """
+        all_signals = {strategy_name: [] for strategy_name in strategy_names}
+        enriched_frames = []
+        
+        for symbol, crypto_data, symbol_signals in symbol_results:
+            for strategy_name, s_signals in symbol_signals.items():
+                all_signals[strategy_name].extend(s_signals)
+            enriched_frames.append(crypto_data)
+        
+        # 將計算的指標和信號標記一次保存回資料庫
+        if enriched_frames:
+            try:
+                frame_count = len(enriched_frames)
+                enriched_data = pd.concat(enriched_frames, ignore_index=True)
+                del enriched_frames
+                self.adapter.db_manager.save_crypto_data(enriched_data)
+                logger.debug(f"✓ {frame_count} 個交易對: 指標和信號標記已保存到資料庫")
+            except Exception as e:
+                logger.warning(f"⚠️ 保存指標和信號標記到資料庫失敗 - {str(e)}")
+        
+        for strategy_name, signals in all_signals.items():
+            # 排序信號
+            signals = self._sort_signals_by_score(signals)
+            all_signals[strategy_name] = signals
+            
+            logger.info(f"✅ {strategy_name} 策略完成: {len(signals)} 個信號")
+        
+        return all_signals
+    
+    def _run_symbol_tasks(self, all_data: pd.DataFrame, symbol_rows: Dict[str, np.ndarray],
+                          strategies: Dict[str, Any], account_value: float) -> Iterable[Tuple]:
+        """
+        對每個交易對執行 _process_symbol，交易對數量足夠時使用多進程
+        
+        Args:
+            all_data: 所有交易對的資料
+            symbol_rows: 交易對 → 列位置索引
+            strategies: 要執行的策略
+            account_value: 帳戶價值
+            
+        Returns:
+            _process_symbol 的結果（順序與 symbol_rows 相同）
+        """
+        symbols = list(symbol_rows)
+        workers = min(self.max_workers, len(symbols))
+        
+        # take() 已產生獨立的新資料（且不帶 SettingWithCopy 標記），策略可直接就地新增指標欄位，
+        # 不需要再額外 copy()；不要將Date設為索引，保持為普通欄位
+        if workers > 1:
+            try:
+                chunks = (all_data.take(symbol_rows[symbol]) for symbol in symbols)
+                chunksize = max(1, len(symbols) // (workers * 4))
+                # 以 spawn 啟動子進程：本進程已有日誌與快取背景執行緒，fork 可能在持有鎖時複製而死結
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=init_worker_logging) as executor:
+                    return list(executor.map(
+                        _process_symbol, symbols, chunks,
+                        [strategies] * len(symbols), [account_value] * len(symbols),
+                        chunksize=chunksize
+                    ))
+            except Exception as e:
+                logger.warning(f"⚠️ 多進程篩選失敗，改為單進程執行 - {str(e)}")
+        
+        # 單進程時逐一產生結果，處理完的交易對資料可即時釋放
+        return (
+            _process_symbol(symbol, all_data.take(symbol_rows[symbol]), strategies, account_value)
+            for symbol in symbols
+        )
+    
+    @staticmethod
+    def _sort_signals_by_score(signals: List) -> List:
+        """
+        依總評分由高到低排序信號
+        
+        以 numpy 穩定排序評分陣列取代逐元素 lambda 比較，
+        同分信號保持原本順序（與 list.sort(reverse=True) 一致）。
+        
+        Args:
+            signals: 信號列表
+            
+        Returns:
+            排序後的信號列表
+        """
+        if len(signals) < 2:
+            return signals
+        
+        scores = np.fromiter((s.total_score for s in signals), dtype=np.float64, count=len(signals))
+        order = np.argsort(-scores, kind='stable')
+        return [signals[i] for i in order]
+    
+    @staticmethod
+    def _build_symbol_row_index(all_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        建立交易對到列位置的索引
+        
+        以 pd.factorize 單次雜湊取代每個交易對一次的整欄比較（類別型態欄位直接使用其代碼），
+        之後可直接用 .take 取出各交易對的資料。
+        
+        Args:
+            all_data: 所有交易對的資料
+            
+        Returns:
+            交易對 → 列位置陣列 的字典（依首次出現順序）
+        """
+        codes, uniques = pd.factorize(all_data['symbol'].values)
+        order = np.argsort(codes, kind='stable')
+        order = order[codes[order] >= 0]  # 排除缺失的交易對代碼
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        return dict(zip(uniques, np.split(order, boundaries)))
+    
     def _convert_stock_to_crypto_format(self, stock_data: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """
         將股票格式的資料轉換回加密貨幣格式
@@ -237,53 +430,19 @@ class CryptoMultiStrategyScreener:
             加密貨幣格式的資料
         """
         try:
-            # 複製資料
-            crypto_data = stock_data.copy()
-            
-            # 將 'symbol' 欄位轉換回 'pair'
-            if 'symbol' in crypto_data.columns:
-                crypto_data['pair'] = crypto_data['symbol']
-                crypto_data = crypto_data.drop('symbol', axis=1)
+            # 一次完成欄位改名（symbol→pair、Date→date、OHLCV轉小寫）
+            crypto_data = stock_data.rename(columns=_STOCK_TO_CRYPTO_COLUMNS)
             
             # 添加 exchange 欄位
             crypto_data['exchange'] = 'binance'
             
-            # 確保日期欄位名稱正確
-            if 'Date' in crypto_data.columns:
-                crypto_data['date'] = crypto_data['Date']
-                crypto_data = crypto_data.drop('Date', axis=1)
-            
-            # 轉換欄位名稱為小寫以符合資料庫格式
-            column_mapping = {
-                'Open': 'open',
-                'High': 'high', 
-                'Low': 'low',
-                'Close': 'close',
-                'Volume': 'volume'
-            }
-            crypto_data = crypto_data.rename(columns=column_mapping)
-            
-            # 確保技術指標欄位名稱正確（策略計算的指標已經是正確的名稱）
-            # 但需要確保所有指標欄位都存在
-            expected_indicators = [
-                'atr', 'high_20', 'low_10', 'high_55', 'low_20', 'volume_20', 'volume_ratio',
-                'price_change_5d', 'price_change_20d', 'rsi', 'system1_breakout', 'system2_breakout',
-                'ma25', 'deviation_rate', 'bnf_buy_signal',
-                'ema_20', 'sma_50', 'sma_100', 'sd_10', 'sd_60', 'vol_10', 'vol_60',
-                'high_60', 'low_60', 'diff_percentage_3mo', 'price_up_6mo_days',
-                'volatility_check', 'price_contract', 'ma_alignment', 'up_trend_6mo',
-                'vol_contract', 'coiled_spring_signal'
-            ]
-            
-            # 確保所有指標欄位都存在，不存在的用NaN填充
-            for indicator in expected_indicators:
-                if indicator not in crypto_data.columns:
-                    crypto_data[indicator] = None
-            
-            # 重新排序欄位
-            first_columns = ['date', 'pair', 'exchange', 'open', 'high', 'low', 'close', 'volume']
-            other_columns = [col for col in crypto_data.columns if col not in first_columns]
-            crypto_data = crypto_data[first_columns + other_columns]
+            # 重新排序欄位，缺少的指標欄位由 reindex 一次補上（NaN）
+            existing_columns = set(crypto_data.columns)
+            other_columns = [col for col in crypto_data.columns if col not in _CRYPTO_FIRST_COLUMN_SET]
+            missing_indicators = [col for col in _EXPECTED_INDICATORS if col not in existing_columns]
+            crypto_data = crypto_data.reindex(
+                columns=_CRYPTO_FIRST_COLUMNS + other_columns + missing_indicators
+            )
             
             return crypto_data
             
@@ -294,21 +453,21 @@ class CryptoMultiStrategyScreener:
     def _generate_reports(self, all_signals: Dict[str, List], date: str):
         """生成報告"""
         try:
-            # 生成各策略的CSV報告
-            for strategy_name, signals in all_signals.items():
-                if signals:
-                    self.report_generator.generate_csv_report(signals, f"crypto_{strategy_name}", date)
+            # 同一批報告與歷史記錄使用相同日期
+            with self.report_generator.batch():
+                # 生成各策略的CSV報告（各策略同時寫出）
+                self.report_generator.generate_csv_reports(all_signals, date, prefix='crypto_')
             
-            # 生成綜合摘要報告
-            self.report_generator.generate_summary_report(all_signals, f"crypto_summary_{date}")
+                # 生成綜合摘要報告
+                self.report_generator.generate_summary_report(all_signals, f"crypto_summary_{date}")
             
-            # 保存信號歷史
-            all_signals_list = []
-            for signals in all_signals.values():
-                all_signals_list.extend(signals)
+                # 保存信號歷史
+                all_signals_list = []
+                for signals in all_signals.values():
+                    all_signals_list.extend(signals)
             
-            if all_signals_list:
-                self.report_generator.save_signal_history(all_signals_list, f"crypto_signals_{date}")
+                if all_signals_list:
+                    self.report_generator.save_signal_history(all_signals_list, f"crypto_signals_{date}")
             
             logger.info("📊 加密貨幣報告生成完成")
             
@@ -316,27 +475,24 @@ class CryptoMultiStrategyScreener:
             logger.error(f"生成加密貨幣報告錯誤: {e}")
     
     def _update_history(self, all_signals: Dict[str, List], date: str):
-        """更新歷史記錄"""
+        """更新歷史記錄（僅附加本次日期的記錄，不重寫整個檔案）"""
         try:
-            if date not in self.signals_history:
-                self.signals_history[date] = {}
-            
+            day_record = {}
             for strategy_name, signals in all_signals.items():
                 if signals:
-                    self.signals_history[date][strategy_name] = [
+                    day_record[strategy_name] = [
                         {
                             'symbol': s.symbol,
                             'signal_type': getattr(s, 'signal_type', strategy_name),
-                            'signal_date': s.signal_date,
+                            'signal_date': format_signal_date(s.signal_date),
                             'price': s.price,
                             'total_score': s.total_score
                         }
                         for s in signals
                     ]
             
-            # 保存歷史記錄
-            with open(self.paths['signals_history_file'], 'w', encoding='utf-8') as f:
-                json.dump(self.signals_history, f, ensure_ascii=False, indent=2)
+            self.signals_history.setdefault(date, {}).update(day_record)
+            append_history(self.paths['signals_history_file'], date, day_record)
             
         except Exception as e:
             logger.error(f"更新加密貨幣歷史記錄錯誤: {e}")
@@ -354,8 +510,9 @@ class CryptoMultiStrategyScreener:
             logger.info(f"{strategy_name.upper()} 策略: {signal_count} 個信號")
             
             if signals:
-                avg_score = sum(s.total_score for s in signals) / len(signals)
-                high_quality = len([s for s in signals if s.total_score >= 70])
+                scores = np.fromiter((s.total_score for s in signals), dtype=np.float64, count=signal_count)
+                avg_score = scores.mean()
+                high_quality = int(np.count_nonzero(scores >= 70))
                 logger.info(f"  平均評分: {avg_score:.1f}")
                 logger.info(f"  高品質信號: {high_quality}")
                 
@@ -374,8 +531,8 @@ class CryptoMultiStrategyScreener:
     def get_strategy_info(self) -> Dict[str, Any]:
         """獲取策略資訊"""
         strategy_info = {}
-        for name, strategy in self.strategies.items():
-            strategy_info[name] = strategy.get_strategy_info()
+        for name in self._strategy_factories:
+            strategy_info[name] = self._get_strategy(name).get_strategy_info()
         return strategy_info
     
     def test_system(self) -> Dict[str, bool]:
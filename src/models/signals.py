@@ -5,16 +5,64 @@
 包含所有交易策略的信號資料類別
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 
-@dataclass
-class TurtleSignal:
+# 信號類型、策略類型、市場條件統一由 enums 模組定義，此處重新匯出
+from .enums import SignalType, StrategyType, MarketCondition
+
+# signal_date 以 epoch 奈秒（pandas Timestamp.value）儲存，便於整數比較與排序；
+# 0 為有效日期（1970-01-01），缺失日期（NaT）的 Timestamp.value 為 int64 最小值
+_EPOCH_DATE = date(1970, 1, 1)
+_NS_PER_DAY = 86_400 * 1_000_000_000
+NAT_SIGNAL_DATE = int(np.iinfo(np.int64).min)
+
+
+@lru_cache(maxsize=1024)
+def format_signal_date(signal_date: int) -> str:
+    """
+    將 epoch 奈秒的信號日期格式化為 YYYY-MM-DD 字串（僅在輸出時使用）
+    
+    同一次篩選的信號多半落在同一個交易日，快取後每個日期只格式化一次；
+    缺失日期輸出空字串（與 pandas 輸出 NaT 一致）
+    """
+    if signal_date == NAT_SIGNAL_DATE:
+        return ''
+    return (_EPOCH_DATE + timedelta(days=signal_date // _NS_PER_DAY)).isoformat()
+
+
+class _FrozenSlots:
+    """
+    手寫 __slots__ 的凍結信號基類（dataclass(slots=True) 需要 Python 3.10+）
+    
+    凍結的 dataclass 禁止 setattr，pickle 依預設還原 __slots__ 時會失敗；
+    信號需在進程池間傳遞，因此以欄位值序列保存狀態並以 object.__setattr__ 還原
+    """
+    __slots__ = ()
+    
+    def __getstate__(self):
+        return [getattr(self, f.name) for f in fields(self)]
+    
+    def __setstate__(self, state):
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+
+@dataclass(frozen=True)
+class TurtleSignal(_FrozenSlots):
     """海龜交易信號"""
+    __slots__ = ('symbol', 'signal_type', 'signal_date', 'price', 'atr', 'unit_size',
+                 'stop_loss_price', 'breakout_high', 'days_in_breakout', 'current_price',
+                 'volume', 'volume_ratio', 'price_change_pct', 'momentum_5d', 'total_score',
+                 'breakout_score', 'volume_score', 'momentum_score')
     symbol: str
     signal_type: str  # 'system1_entry', 'system2_entry'
-    signal_date: str
+    signal_date: int  # epoch 奈秒
     price: float
     atr: float
     unit_size: int
@@ -32,11 +80,13 @@ class TurtleSignal:
     momentum_score: float
 
 
-@dataclass
-class BNFSignal:
+@dataclass(frozen=True)
+class BNFSignal(_FrozenSlots):
     """BNF策略買入信號"""
+    __slots__ = ('symbol', 'signal_date', 'price', 'ma25', 'deviation_rate', 'volume',
+                 'volume_ratio', 'deviation_score', 'volume_score', 'total_score')
     symbol: str
-    signal_date: str
+    signal_date: int  # epoch 奈秒
     price: float
     ma25: float
     deviation_rate: float
@@ -47,11 +97,14 @@ class BNFSignal:
     total_score: float
 
 
-@dataclass
-class CoiledSpringSignal:
+@dataclass(frozen=True)
+class CoiledSpringSignal(_FrozenSlots):
     """蓄勢待發策略信號"""
+    __slots__ = ('symbol', 'signal_date', 'price', 'volatility_10d', 'volatility_60d',
+                 'ma_20_ema', 'ma_50_sma', 'ma_100_sma', 'volume_ratio', 'up_trend_strength',
+                 'total_score', 'volatility_score', 'trend_score', 'volume_score')
     symbol: str
-    signal_date: str
+    signal_date: int  # epoch 奈秒
     price: float
     volatility_10d: float
     volatility_60d: float
@@ -66,27 +119,37 @@ class CoiledSpringSignal:
     volume_score: float
 
 
-# 信號類型枚舉
-class SignalType:
-    """信號類型定義"""
-    TURTLE_SYSTEM1_ENTRY = "system1_entry"
-    TURTLE_SYSTEM2_ENTRY = "system2_entry"
-    BNF_BUY = "bnf_buy"
-    COILED_SPRING = "coiled_spring"
-
-
-# 策略類型枚舉
-class StrategyType:
-    """策略類型定義"""
-    TURTLE = "turtle"
-    BNF = "bnf"
-    COILED_SPRING = "coiled_spring"
-
-
-# 市場條件枚舉
-class MarketCondition:
-    """市場條件定義"""
-    BULLISH = "bullish"
-    BEARISH = "bearish"
-    SIDEWAYS = "sideways"
-    VOLATILE = "volatile"
+@dataclass
+class SignalBatch:
+    """
+    同一類別信號的欄位式批次（每個欄位一個陣列）
+    
+    報告輸出等整批處理以欄位陣列運算，不必逐筆讀取信號物件的屬性
+    """
+    __slots__ = ('signal_class', 'columns')
+    signal_class: type
+    columns: Dict[str, np.ndarray]
+    
+    @classmethod
+    def from_objects(cls, signals: List, dtypes: Optional[Dict[str, Any]] = None) -> 'SignalBatch':
+        """
+        由信號物件列表建立批次（所有信號須為同一類別）
+        
+        以 attrgetter 一次取出每筆信號的所有欄位，再依欄位轉置為陣列；
+        dtypes 指定的欄位直接以該型別建立，不逐值推斷型別
+        """
+        if not signals:
+            raise ValueError("信號列表為空，無法建立批次")
+        signal_class = type(signals[0])
+        if any(type(signal) is not signal_class for signal in signals):
+            raise ValueError("批次中的信號必須為同一類別")
+        
+        names = [f.name for f in fields(signal_class)]
+        rows = list(map(attrgetter(*names), signals))
+        dtypes = dtypes or {}
+        columns = {name: np.array(values, dtype=dtypes.get(name))
+                   for name, values in zip(names, zip(*rows))}
+        return cls(signal_class=signal_class, columns=columns)
+    
+    def __len__(self) -> int:
+        return len(self.columns['symbol'])
@@ -5,10 +5,15 @@
 統一管理海龜、BNF和蓄勢待發策略的核心協調器
 """
 
+import multiprocessing
+import os
+import numpy as np
 import pandas as pd
-import json
-import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import repeat
+from operator import attrgetter
 from typing import Dict, List, Any, Optional, Tuple
 from .core.database import DatabaseManager
 from .core.fetcher import StockDataFetcher
@@ -17,13 +22,51 @@ from .strategies.turtle import TurtleStrategy
 from .strategies.bnf import BNFStrategy
 from .strategies.coiled_spring import CoiledSpringStrategy
 from .utils.report import ReportGenerator
-from .utils.logger import setup_logger
-from .models.signals import TurtleSignal, BNFSignal, CoiledSpringSignal
+from .utils.history import load_history, append_history
+from .utils.logger import setup_logger, init_worker_logging
+from .models.signals import TurtleSignal, BNFSignal, CoiledSpringSignal, format_signal_date
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _read_symbols(path: str, mtime: float) -> Tuple[str, ...]:
+    """讀取股票代碼清單（以檔案修改時間作為緩存鍵，檔案更新後自動重新讀取）"""
+    symbol_info = pd.read_csv(path, usecols=['Symbol'], dtype={'Symbol': str})
+    return tuple(symbol_info['Symbol'].tolist())
+
+
+def _screen_symbol(symbol: str, stock_data: pd.DataFrame, strategy_name: str, strategy,
+                   account_value: float, indicators_ready: bool = False) -> List:
+    """
+    對單一股票執行單一策略：計算指標並檢測信號
+    
+    定義在模組層級以便在子進程中執行（策略物件需可被pickle）
+    
+    Args:
+        symbol: 股票代碼
+        stock_data: 該股票的資料
+        strategy_name: 策略名稱
+        strategy: 策略物件
+        account_value: 帳戶價值
+        indicators_ready: 指標是否已由 calculate_indicators_bulk 整批計算
+        
+    Returns:
+        信號列表
+    """
+    # 確保有技術指標（可直接由原始價格檢測的策略跳過）
+    if not indicators_ready and not strategy.detects_from_raw_prices:
+        # 資料載入時已以 Date 為索引；各策略共用同一份分組資料，
+        # calculate_indicators 會就地新增指標欄位，僅在此路徑複製
+        stock_data = strategy.calculate_indicators(stock_data.copy())
+    
+    # 檢測信號
+    if strategy_name == 'turtle':
+        return strategy.detect_signals(symbol, stock_data, account_value)
+    return strategy.detect_signals(symbol, stock_data)
+
+
 class MultiStrategyScreener:
     """多策略篩選器 - 統一管理海龜、BNF和蓄勢待發策略"""
     
@@ -45,9 +88,13 @@ class MultiStrategyScreener:
         self.paths = {
             'symbol_info': config_manager.get('paths.symbol_info', 'data/us_stock_symbols.csv'),
             'output_dir': config_manager.get('paths.output_dir', 'data/'),
-            'signals_history_file': config_manager.get('paths.signals_history_file', 'data/multi_signals_history.json')
+            'signals_history_file': config_manager.get('paths.signals_history_file', 'data/multi_signals_history.jsonl')
         }
         
+        # 並行處理設定（1 表示不使用多進程）
+        self.max_workers = config_manager.get('screening.max_workers') or os.cpu_count() or 1
+        self._pool = None
+        
         # 載入歷史記錄
         self.signals_history = self.load_signals_history()
         
@@ -59,24 +106,19 @@ class MultiStrategyScreener:
         logger.info(f"策略 {name} 已註冊")
     
     def load_signals_history(self) -> dict:
-        """載入信號歷史記錄"""
-        try:
-            file_path = pathlib.Path(self.paths['signals_history_file'])
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except Exception as e:
-            logger.error(f"載入信號歷史記錄錯誤: {str(e)}")
-            return {}
+        """
+        載入信號歷史記錄
+        
+        歷史檔案為 JSONL 格式，每行為 {日期: {策略: [信號...]}}；
+        舊版 .json 檔案會先合併，同一日期同一策略以較晚的記錄為準
+        """
+        return load_history(self.paths['signals_history_file'])
     
     def load_symbols(self) -> List[str]:
         """載入股票代碼 (與原始版本一致)"""
         try:
-            symbol_info = pd.read_csv(self.paths['symbol_info'])
-            symbols = symbol_info['Symbol'].tolist()
-            return symbols
+            path = self.paths['symbol_info']
+            return list(_read_symbols(path, os.path.getmtime(path)))
             
         except Exception as e:
             logger.error(f"載入股票代碼錯誤: {str(e)}")
@@ -111,21 +153,24 @@ class MultiStrategyScreener:
                 logger.error("無法抓取任何股票數據")
                 return False
             
-            # 4. 計算技術指標並保存
+            # 4. 計算技術指標，收集後一次保存（單一交易）
             updated_symbols = []
-            for symbol in all_prices['symbol'].unique():
-                stock_data = all_prices[all_prices['symbol'] == symbol].copy()
-                stock_data = stock_data.set_index('Date', drop=False)
-                
+            updated_frames = []
+            # 資料載入時已以 Date 為索引，分組後的資料直接沿用
+            for symbol, stock_data in all_prices.groupby('symbol', sort=False, observed=True):
                 # 計算所有策略的指標
                 for strategy_name, strategy in self.strategies.items():
                     stock_data = strategy.calculate_indicators(stock_data)
                 
-                # 保存更新的資料到資料庫
                 if not stock_data.empty:
-                    self.db_manager.save_stock_data(stock_data)
+                    updated_frames.append(stock_data)
                     updated_symbols.append(symbol)
             
+            # 保存更新的資料到資料庫
+            if updated_frames:
+                self.db_manager.save_stock_data(pd.concat(updated_frames, ignore_index=True))
+                del updated_frames
+            
             logger.info(f"💾 已更新 {len(updated_symbols)} 支股票的技術指標")
             
             # 5. 清理舊資料
@@ -168,10 +213,19 @@ class MultiStrategyScreener:
         logger.info("="*60)
         
         try:
+            # 載入股票清單（更新與篩選共用同一份清單）
+            symbols = self.load_symbols()
+            
+            if not symbols:
+                logger.error("無法載入股票代碼")
+                return {}
+            
+            logger.info(f"📋 載入 {len(symbols)} 支股票代碼")
+            
             # 檢查是否需要更新資料
             if force_update:
                 logger.info("🔄 強制更新資料...")
-                update_success = self.update_database_only()
+                update_success = self.update_database_only(symbols)
                 if not update_success:
                     logger.error("❌ 資料更新失敗，無法產生信號")
                     return {}
@@ -185,20 +239,11 @@ class MultiStrategyScreener:
                     
                     if days_diff > 1:
                         logger.info(f"📅 資料已過期 {days_diff} 天，建議更新")
-                        update_success = self.update_database_only()
+                        update_success = self.update_database_only(symbols)
                         if not update_success:
                             logger.error("❌ 資料更新失敗")
                             return {}
             
-            # 載入股票清單
-            symbols = self.load_symbols()
-            
-            if not symbols:
-                logger.error("無法載入股票代碼")
-                return {}
-            
-            logger.info(f"📋 載入 {len(symbols)} 支股票代碼")
-            
             # 載入資料
             end_date = datetime.today().strftime('%Y-%m-%d')
             start_date = (datetime.today() - timedelta(days=days_back)).strftime('%Y-%m-%d')
@@ -209,39 +254,26 @@ class MultiStrategyScreener:
                 logger.error("無法載入任何股票資料")
                 return {}
             
-            # 執行各策略
-            all_signals = {}
+            # 依股票代碼一次分組，各策略共用
+            symbol_groups = dict(tuple(all_data.groupby('symbol', sort=False, observed=True)))
             
+            # 篩選出存在的策略
+            active_strategies = []
             for strategy_name in strategy_names:
                 if strategy_name not in self.strategies:
                     logger.warning(f"策略 {strategy_name} 不存在")
                     continue
-                
-                strategy = self.strategies[strategy_name]
-                signals = []
-                
-                logger.info(f"🔍 執行 {strategy_name} 策略...")
-                
-                for symbol in all_data['symbol'].unique():
-                    stock_data = all_data[all_data['symbol'] == symbol].copy()
-                    stock_data = stock_data.set_index('Date', drop=False)
-                    
-                    # 確保有技術指標
-                    stock_data = strategy.calculate_indicators(stock_data)
-                    
-                    # 檢測信號
-                    if strategy_name == 'turtle':
-                        s_signals = strategy.detect_signals(symbol, stock_data, account_value)
-                    else:
-                        s_signals = strategy.detect_signals(symbol, stock_data)
-                    
-                    signals.extend(s_signals)
-                
-                # 排序信號
-                signals.sort(key=lambda x: x.total_score, reverse=True)
-                all_signals[strategy_name] = signals
-                
-                logger.info(f"✅ {strategy_name} 策略完成: {len(signals)} 個信號")
+                active_strategies.append(strategy_name)
+            
+            # 各策略依序執行，需要多進程的策略共用同一個進程池（第一次使用時才建立）
+            all_signals = {}
+            try:
+                for strategy_name in active_strategies:
+                    all_signals[strategy_name] = self._run_one_strategy(
+                        strategy_name, all_data, symbol_groups, account_value
+                    )
+            finally:
+                self._shutdown_pool()
             
             # 生成報告
             if any(all_signals.values()):
@@ -262,24 +294,124 @@ class MultiStrategyScreener:
             traceback.print_exc()
             return {}
     
+    def _run_one_strategy(self, strategy_name: str, all_data: pd.DataFrame,
+                          symbol_groups: Dict[str, pd.DataFrame], account_value: float) -> List:
+        """
+        執行單一策略並依評分排序信號
+        
+        Args:
+            strategy_name: 策略名稱
+            all_data: 所有股票的資料
+            symbol_groups: 股票代碼 → 該股票的資料
+            account_value: 帳戶價值
+            
+        Returns:
+            排序後的信號列表
+        """
+        strategy = self.strategies[strategy_name]
+        
+        logger.info(f"🔍 執行 {strategy_name} 策略...")
+        
+        # 支援整批計算的策略先一次計算所有股票的指標，逐股票時只檢測信號
+        if hasattr(strategy, 'calculate_indicators_bulk'):
+            # 整批計算需要唯一的列索引（各股票的日期索引會重複）
+            strategy_data = strategy.calculate_indicators_bulk(all_data.reset_index(drop=True))
+            if hasattr(strategy, 'detect_signals_bulk'):
+                # 也支援整批檢測時，一次檢查所有股票的最後一根K線
+                signals = strategy.detect_signals_bulk(strategy_data, account_value)
+            else:
+                strategy_groups = dict(tuple(strategy_data.groupby('symbol', sort=False, observed=True)))
+                signals = self._screen_strategy(strategy_name, strategy, strategy_groups,
+                                                account_value, indicators_ready=True)
+                del strategy_groups
+            del strategy_data
+        elif hasattr(strategy, 'detect_signals_bulk'):
+            # 只需最後一天指標的策略直接由原始價格整批檢測
+            signals = strategy.detect_signals_bulk(all_data, account_value)
+        else:
+            signals = self._screen_strategy(strategy_name, strategy, symbol_groups, account_value)
+        
+        # 排序信號
+        signals.sort(key=attrgetter('total_score'), reverse=True)
+        
+        logger.info(f"✅ {strategy_name} 策略完成: {len(signals)} 個信號")
+        return signals
+    
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """
+        篩選共用的進程池（第一次使用時建立，run_screening 結束時關閉）
+        
+        以 spawn 啟動子進程：本進程已有日誌與快取背景執行緒，fork 可能在持有鎖時複製而死結
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=init_worker_logging)
+        return self._pool
+    
+    def _shutdown_pool(self):
+        """關閉共用的進程池"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def _screen_strategy(self, strategy_name: str, strategy, symbol_groups: Dict[str, pd.DataFrame],
+                         account_value: float, indicators_ready: bool = False) -> List:
+        """
+        對所有股票執行單一策略，股票數量足夠時使用共用的進程池
+        
+        Args:
+            strategy_name: 策略名稱
+            strategy: 策略物件
+            symbol_groups: 股票代碼 → 該股票的資料
+            account_value: 帳戶價值
+            indicators_ready: 指標是否已整批計算
+            
+        Returns:
+            信號列表（依股票順序）
+        """
+        symbols = list(symbol_groups)
+        workers = min(self.max_workers, len(symbols))
+        
+        if workers > 1:
+            try:
+                # 依工作進程數分批傳送，攤銷pickle成本
+                chunksize = max(1, len(symbols) // (workers * 4))
+                results = self._process_pool().map(
+                    _screen_symbol, symbols, symbol_groups.values(),
+                    repeat(strategy_name), repeat(strategy), repeat(account_value),
+                    repeat(indicators_ready), chunksize=chunksize
+                )
+                return [signal for s_signals in results for signal in s_signals]
+            except Exception as e:
+                logger.warning(f"⚠️ 多進程篩選失敗，改為單進程執行 - {str(e)}")
+                # 進程池可能已損壞，下一個策略重新建立
+                self._shutdown_pool()
+        
+        signals = []
+        for symbol, stock_data in symbol_groups.items():
+            signals.extend(_screen_symbol(symbol, stock_data, strategy_name, strategy,
+                                          account_value, indicators_ready))
+        return signals
+    
     def _generate_reports(self, all_signals: Dict[str, List], date: str):
         """生成報告"""
         try:
-            # 生成各策略的CSV報告
-            for strategy_name, signals in all_signals.items():
-                if signals:
-                    self.report_generator.generate_csv_report(signals, strategy_name, date)
+            # 同一批報告與歷史記錄使用相同日期
+            with self.report_generator.batch():
+                # 生成各策略的CSV報告（各策略同時寫出）
+                self.report_generator.generate_csv_reports(all_signals, date)
             
-            # 生成綜合摘要報告
-            self.report_generator.generate_summary_report(all_signals, date)
+                # 生成綜合摘要報告
+                self.report_generator.generate_summary_report(all_signals, date)
             
-            # 保存信號歷史
-            all_signals_list = []
-            for signals in all_signals.values():
-                all_signals_list.extend(signals)
+                # 保存信號歷史
+                all_signals_list = []
+                for signals in all_signals.values():
+                    all_signals_list.extend(signals)
             
-            if all_signals_list:
-                self.report_generator.save_signal_history(all_signals_list)
+                if all_signals_list:
+                    self.report_generator.save_signal_history(all_signals_list)
             
             logger.info("📊 報告生成完成")
             
@@ -287,27 +419,24 @@ class MultiStrategyScreener:
             logger.error(f"生成報告錯誤: {e}")
     
     def _update_history(self, all_signals: Dict[str, List], date: str):
-        """更新歷史記錄"""
+        """更新歷史記錄（僅附加本次日期的記錄，不重寫整個檔案）"""
         try:
-            if date not in self.signals_history:
-                self.signals_history[date] = {}
-            
+            day_record = {}
             for strategy_name, signals in all_signals.items():
                 if signals:
-                    self.signals_history[date][strategy_name] = [
+                    day_record[strategy_name] = [
                         {
                             'symbol': s.symbol,
                             'signal_type': getattr(s, 'signal_type', strategy_name),
-                            'signal_date': s.signal_date,
+                            'signal_date': format_signal_date(s.signal_date),
                             'price': s.price,
                             'total_score': s.total_score
                         }
                         for s in signals
                     ]
             
-            # 保存歷史記錄
-            with open(self.paths['signals_history_file'], 'w', encoding='utf-8') as f:
-                json.dump(self.signals_history, f, ensure_ascii=False, indent=2)
+            self.signals_history.setdefault(date, {}).update(day_record)
+            append_history(self.paths['signals_history_file'], date, day_record)
             
         except Exception as e:
             logger.error(f"更新歷史記錄錯誤: {e}")
@@ -325,8 +454,7 @@ class MultiStrategyScreener:
             logger.info(f"{strategy_name.upper()} 策略: {signal_count} 個信號")
             
             if signals:
-                avg_score = sum(s.total_score for s in signals) / len(signals)
-                high_quality = len([s for s in signals if s.total_score >= 70])
+                avg_score, high_quality = self._score_stats(signals)
                 logger.info(f"  平均評分: {avg_score:.1f}")
                 logger.info(f"  高品質信號: {high_quality}")
                 
@@ -338,6 +466,20 @@ class MultiStrategyScreener:
         logger.info("-" * 40)
         logger.info(f"總信號數量: {total_signals}")
     
+    @staticmethod
+    def _score_stats(signals: List) -> Tuple[float, int]:
+        """
+        計算信號的平均評分與高品質信號數量（評分 >= 70）
+        
+        Args:
+            signals: 信號列表（不可為空）
+            
+        Returns:
+            (平均評分, 高品質信號數量)
+        """
+        scores = np.fromiter((s.total_score for s in signals), dtype=np.float64, count=len(signals))
+        return float(scores.mean()), int(np.count_nonzero(scores >= 70))
+    
     def get_database_status(self) -> Dict[str, Any]:
         """獲取資料庫狀態"""
         try:
@@ -6,7 +6,9 @@
 """
 
 from abc import ABC, abstractmethod
+from operator import attrgetter
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 from ..core.config import config_manager
 from ..utils.logger import setup_logger
@@ -18,12 +20,22 @@ logger = setup_logger(__name__)
 class BaseStrategy(ABC):
     """策略基類 - 所有交易策略的抽象基類"""
     
+    # detect_signals 是否可直接由原始價格計算所需數值（為 True 時呼叫端不需先計算完整指標）
+    detects_from_raw_prices = False
+    
     def __init__(self, config: Dict[str, Any] = None):
         """初始化策略"""
         self.config = config or self.get_default_config()
         self.name = self.__class__.__name__
+        self._bind_config_params()
         logger.info(f"初始化策略: {self.name}")
     
+    def _bind_config_params(self):
+        """將信號檢測常用的配置值綁定為屬性，避免逐股票查詢字典（配置更新時重新綁定）"""
+        self._min_price = float(self.config.get('min_price', 10))
+        self._min_volume = float(self.config.get('min_volume', 500000))
+        self._min_periods = int(self.config.get('min_periods', 50))
+    
     @abstractmethod
     def get_default_config(self) -> Dict[str, Any]:
         """返回策略預設配置"""
@@ -31,9 +43,31 @@ class BaseStrategy(ABC):
     
     @abstractmethod
     def calculate_indicators(self, stock_data: pd.DataFrame) -> pd.DataFrame:
-        """計算策略所需技術指標"""
+        """
+        計算策略所需技術指標
+        
+        直接在傳入的資料上新增指標欄位並回傳，呼叫端需傳入可修改的獨立資料
+        """
         pass
     
+    @property
+    def required_indicator_columns(self) -> List[str]:
+        """檢測信號所需的指標欄位（子類別覆寫）"""
+        return []
+    
+    def has_indicators(self, stock_data: pd.DataFrame) -> bool:
+        """
+        資料是否已包含完整的策略指標（例如由資料庫載入）
+        
+        所需欄位皆存在且最後一筆皆非缺失值時，不需重新計算
+        """
+        columns = self.required_indicator_columns
+        if not columns or stock_data.empty:
+            return False
+        if not set(columns).issubset(stock_data.columns):
+            return False
+        return not stock_data[columns].iloc[-1].isna().any()
+    
     @abstractmethod
     def detect_signals(self, symbol: str, stock_data: pd.DataFrame) -> List:
         """檢測交易信號"""
@@ -51,9 +85,8 @@ class BaseStrategy(ABC):
             return False
         
         # 檢查資料長度
-        min_periods = self.config.get('min_periods', 50)
-        if len(stock_data) < min_periods:
-            logger.warning(f"資料長度不足: {len(stock_data)} < {min_periods}")
+        if len(stock_data) < self._min_periods:
+            logger.warning(f"資料長度不足: {len(stock_data)} < {self._min_periods}")
             return False
         
         return True
@@ -63,17 +96,13 @@ class BaseStrategy(ABC):
         if stock_data.empty:
             return stock_data
         
-        # 基本過濾條件
-        min_price = self.config.get('min_price', 10)
-        min_volume = self.config.get('min_volume', 500000)
-        
         # 過濾低價股
         if 'Close' in stock_data.columns:
-            stock_data = stock_data[stock_data['Close'] >= min_price]
+            stock_data = stock_data[stock_data['Close'] >= self._min_price]
         
         # 過濾低成交量
         if 'Volume' in stock_data.columns:
-            stock_data = stock_data[stock_data['Volume'] >= min_volume]
+            stock_data = stock_data[stock_data['Volume'] >= self._min_volume]
         
         return stock_data
     
@@ -84,6 +113,7 @@ class BaseStrategy(ABC):
     def update_config(self, new_config: Dict[str, Any]):
         """更新策略配置"""
         self.config.update(new_config)
+        self._bind_config_params()
         logger.info(f"策略 {self.name} 配置已更新")
     
     def get_strategy_info(self) -> Dict[str, Any]:
@@ -111,9 +141,10 @@ class BaseStrategy(ABC):
             }
         
         total_signals = len(signals)
-        scores = [getattr(signal, 'total_score', 0) for signal in signals if hasattr(signal, 'total_score')]
-        avg_score = sum(scores) / len(scores) if scores else 0
-        high_quality_signals = len([s for s in scores if s >= 0.7])
+        # 所有信號類別皆以必填欄位定義 total_score，以 attrgetter 一次取出為陣列
+        scores = np.fromiter(map(attrgetter('total_score'), signals), dtype=np.float64, count=total_signals)
+        avg_score = float(scores.mean())
+        high_quality_signals = int(np.count_nonzero(scores >= 70))
         
         return {
             'total_signals': total_signals,
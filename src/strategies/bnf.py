@@ -5,8 +5,9 @@ BNF策略模組
 基於25日移動平均乖離率的買入策略
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from .base import BaseStrategy
 from ..models.signals import BNFSignal
 from ..utils.logger import setup_logger
@@ -15,6 +16,33 @@ from ..utils.logger import setup_logger
 logger = setup_logger(__name__)
 
 
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    以累積和計算固定視窗的簡單移動平均
+    
+    結果與 rolling(window).mean() 相同：前 window-1 筆及視窗內含 NaN 時為 NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+    
+    nan_mask = np.isnan(values)
+    value_sums = np.concatenate(([0.0], np.cumsum(np.where(nan_mask, 0.0, values))))
+    nan_counts = np.concatenate(([0], np.cumsum(nan_mask)))
+    window_sums = value_sums[window:] - value_sums[:-window]
+    has_nan = (nan_counts[window:] - nan_counts[:-window]) > 0
+    result[window - 1:] = np.where(has_nan, np.nan, window_sums / window)
+    return result
+
+
+# 評分門檻（由小到大）與對應分數，分數陣列比門檻多一個元素
+_DEVIATION_BINS = np.array([-0.25, -0.23, -0.21, -0.20])
+_DEVIATION_SCORES = np.array([60, 50, 40, 30, 0])
+_VOLUME_BINS = np.array([1.0, 1.2, 1.5, 2.0])
+_VOLUME_SCORES = np.array([5, 10, 20, 30, 40])
+
+
 class BNFStrategy(BaseStrategy):
     """BNF策略分析器 - 只檢測買入信號"""
     
@@ -35,21 +63,36 @@ class BNFStrategy(BaseStrategy):
                 'min_periods': 30
             }
     
+    @property
+    def required_indicator_columns(self) -> List[str]:
+        """檢測信號所需的指標欄位"""
+        return ['ma25', 'deviation_rate', 'volume_ratio']
+    
+    def _bind_config_params(self):
+        """綁定BNF信號檢測常用的配置值"""
+        super()._bind_config_params()
+        self._ma_period = int(self.config['ma_period'])
+        self._deviation_threshold = float(self.config['deviation_threshold'])
+    
     def calculate_indicators(self, stock_data: pd.DataFrame) -> pd.DataFrame:
         """計算BNF指標"""
+        # 資料已包含完整指標（例如資料庫已保存）時不重新計算
+        if self.has_indicators(stock_data):
+            return stock_data
+        
         try:
             # 計算25日移動平均
-            stock_data['ma25'] = stock_data['Close'].rolling(window=self.config['ma_period']).mean()
+            stock_data['ma25'] = _rolling_mean(stock_data['Close'].to_numpy(), self._ma_period)
             
             # 計算乖離率
             stock_data['deviation_rate'] = (stock_data['Close'] - stock_data['ma25']) / stock_data['ma25']
             
             # 標記買入信號
-            stock_data['bnf_buy_signal'] = stock_data['deviation_rate'] <= self.config['deviation_threshold']
+            stock_data['bnf_buy_signal'] = stock_data['deviation_rate'] <= self._deviation_threshold
             
             # 計算成交量比率（如果沒有）
             if 'volume_ratio' not in stock_data.columns:
-                stock_data['volume_20'] = stock_data['Volume'].rolling(window=20).mean()
+                stock_data['volume_20'] = _rolling_mean(stock_data['Volume'].to_numpy(), 20)
                 stock_data['volume_ratio'] = stock_data['Volume'] / stock_data['volume_20']
             
             return stock_data
@@ -58,6 +101,36 @@ class BNFStrategy(BaseStrategy):
             logger.error(f"計算BNF指標錯誤: {str(e)}")
             return stock_data
     
+    def calculate_indicators_bulk(self, all_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        一次計算所有股票的BNF指標
+        
+        依 symbol 分組做滾動計算，取代逐股票呼叫 calculate_indicators；
+        資料需依股票代碼、日期排序，且索引不可重複。
+        """
+        try:
+            grouped = all_data.groupby('symbol', sort=False, observed=True)
+            
+            # 計算25日移動平均
+            all_data['ma25'] = grouped['Close'].rolling(window=self._ma_period).mean().droplevel(0)
+            
+            # 計算乖離率
+            all_data['deviation_rate'] = (all_data['Close'] - all_data['ma25']) / all_data['ma25']
+            
+            # 標記買入信號
+            all_data['bnf_buy_signal'] = all_data['deviation_rate'] <= self._deviation_threshold
+            
+            # 計算成交量比率（如果沒有）
+            if 'volume_ratio' not in all_data.columns:
+                all_data['volume_20'] = grouped['Volume'].rolling(window=20).mean().droplevel(0)
+                all_data['volume_ratio'] = all_data['Volume'] / all_data['volume_20']
+            
+            return all_data
+            
+        except Exception as e:
+            logger.error(f"批次計算BNF指標錯誤: {str(e)}")
+            return all_data
+    
     def detect_signals(self, symbol: str, stock_data: pd.DataFrame) -> List[BNFSignal]:
         """檢測BNF買入信號"""
         signals = []
@@ -66,22 +139,22 @@ class BNFStrategy(BaseStrategy):
             if not self.validate_data(stock_data):
                 return signals
             
-            if len(stock_data) < self.config['ma_period']:
+            if len(stock_data) < self._ma_period:
                 return signals
             
             # 檢查最後一天
             last_row = stock_data.iloc[-1]
             
             # 基本篩選
-            if last_row['Close'] < self.config['min_price']:
+            if last_row['Close'] < self._min_price:
                 return signals
-            if last_row['Volume'] < self.config['min_volume']:
+            if last_row['Volume'] < self._min_volume:
                 return signals
             if pd.isna(last_row.get('ma25')) or pd.isna(last_row.get('deviation_rate')):
                 return signals
             
             # 檢查買入條件
-            if last_row['deviation_rate'] <= self.config['deviation_threshold']:
+            if last_row['deviation_rate'] <= self._deviation_threshold:
                 # 計算成交量比率
                 volume_ratio = last_row.get('volume_ratio', 1.0)
                 if pd.isna(volume_ratio) and 'volume_20' in stock_data.columns:
@@ -89,19 +162,21 @@ class BNFStrategy(BaseStrategy):
                     volume_ratio = last_row['Volume'] / volume_20 if volume_20 > 0 else 1.0
                 
                 # 計算評分
-                scores = self._calculate_signal_score(last_row['deviation_rate'], volume_ratio)
+                deviation_score, volume_score, total_score = self._calculate_signal_score(
+                    last_row['deviation_rate'], volume_ratio
+                )
                 
                 signal = BNFSignal(
                     symbol=symbol,
-                    signal_date=last_row['Date'].strftime('%Y-%m-%d'),
+                    signal_date=pd.Timestamp(last_row['Date']).value,
                     price=last_row['Close'],
                     ma25=last_row['ma25'],
                     deviation_rate=last_row['deviation_rate'],
                     volume=last_row['Volume'],
                     volume_ratio=volume_ratio,
-                    deviation_score=scores['deviation_score'],
-                    volume_score=scores['volume_score'],
-                    total_score=scores['total_score']
+                    deviation_score=deviation_score,
+                    volume_score=volume_score,
+                    total_score=total_score
                 )
                 
                 signals.append(signal)
@@ -116,41 +191,112 @@ class BNFStrategy(BaseStrategy):
             logger.error(f"檢測BNF信號錯誤 {symbol}: {str(e)}")
             return signals
     
-    def _calculate_signal_score(self, deviation_rate: float, volume_ratio: float) -> dict:
-        """計算BNF信號評分"""
-        scores = {
-            'deviation_score': 0,
-            'volume_score': 0,
-            'total_score': 0
-        }
+    def detect_signals_bulk(self, all_data: pd.DataFrame,
+                            account_value: float = 100000) -> List[BNFSignal]:
+        """
+        一次檢測所有股票的BNF買入信號
+        
+        取各股票最後一根K線套用與 detect_signals 相同的篩選條件，
+        資料需已由 calculate_indicators_bulk 計算指標。
+        """
+        signals = []
+        
+        try:
+            required_columns = ['symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume',
+                                'ma25', 'deviation_rate']
+            if all_data.empty or not set(required_columns).issubset(all_data.columns):
+                return signals
+            
+            grouped = all_data.groupby('symbol', sort=False, observed=True)
+            last = grouped.tail(1)
+            row_counts = grouped['Close'].transform('size').loc[last.index]
+            
+            # 與 detect_signals 相同的條件：資料長度、價格、成交量、指標有效、乖離門檻
+            # 直接以 numpy 陣列運算，不經過 pandas 的逐元素缺失值判斷
+            min_rows = max(self._min_periods, self._ma_period)
+            ma25 = last['ma25'].to_numpy(dtype=float)
+            deviation = last['deviation_rate'].to_numpy(dtype=float)
+            valid = ~(np.isnan(ma25) | np.isnan(deviation))
+            mask = (
+                (row_counts.to_numpy() >= min_rows)
+                & ~(last['Close'].to_numpy(dtype=float) < self._min_price)
+                & ~(last['Volume'].to_numpy(dtype=float) < self._min_volume)
+                & valid
+                & (deviation <= self._deviation_threshold)
+            )
+            hits = last[mask]
+            if hits.empty:
+                return signals
+            
+            # 成交量比率缺失時以20日均量補算
+            if 'volume_ratio' in hits.columns:
+                volume_ratio = hits['volume_ratio'].astype(float)
+            else:
+                volume_ratio = pd.Series(1.0, index=hits.index)
+            if 'volume_20' in hits.columns:
+                fallback = (hits['Volume'] / hits['volume_20']).where(hits['volume_20'] > 0, 1.0)
+                volume_ratio = volume_ratio.fillna(fallback)
+            
+            deviation_scores, volume_scores, total_scores = self._score_vectorized(
+                hits['deviation_rate'].to_numpy(dtype=float), volume_ratio.to_numpy(dtype=float)
+            )
+            signal_dates = hits['Date'].to_numpy(dtype='datetime64[ns]').view('int64')
+            
+            for (symbol, signal_date, price, ma25, deviation_rate, volume, ratio,
+                 deviation_score, volume_score, total_score) in zip(
+                    hits['symbol'].astype(str).tolist(), signal_dates.tolist(),
+                    hits['Close'].tolist(), hits['ma25'].tolist(), hits['deviation_rate'].tolist(),
+                    hits['Volume'].tolist(), volume_ratio.tolist(), deviation_scores.tolist(),
+                    volume_scores.tolist(), total_scores.tolist()):
+                signals.append(BNFSignal(
+                    symbol=symbol,
+                    signal_date=signal_date,
+                    price=price,
+                    ma25=ma25,
+                    deviation_rate=deviation_rate,
+                    volume=volume,
+                    volume_ratio=ratio,
+                    deviation_score=deviation_score,
+                    volume_score=volume_score,
+                    total_score=total_score
+                ))
+                self.log_signal_detection(symbol, 1)
+            
+            return signals
+            
+        except Exception as e:
+            logger.error(f"批次檢測BNF信號錯誤: {str(e)}")
+            return signals
+    
+    def _calculate_signal_score(self, deviation_rate: float, volume_ratio: float) -> Tuple[int, int, int]:
+        """
+        計算BNF信號評分
         
-        # 乖離程度評分 (60分)
-        if deviation_rate <= -0.25:
-            scores['deviation_score'] = 60
-        elif deviation_rate <= -0.23:
-            scores['deviation_score'] = 50
-        elif deviation_rate <= -0.21:
-            scores['deviation_score'] = 40
-        elif deviation_rate <= -0.20:
-            scores['deviation_score'] = 30
-        else:
-            scores['deviation_score'] = 0
+        Returns:
+            (乖離評分, 成交量評分, 總評分)
+        """
+        deviation_scores, volume_scores, total_scores = self._score_vectorized(
+            np.array([deviation_rate], dtype=np.float64), np.array([volume_ratio], dtype=np.float64)
+        )
+        return int(deviation_scores[0]), int(volume_scores[0]), int(total_scores[0])
+    
+    @staticmethod
+    def _score_vectorized(deviation_rates: np.ndarray, volume_ratios: np.ndarray):
+        """
+        以門檻陣列批次計算BNF信號評分
         
-        # 成交量評分 (40分)
-        if volume_ratio >= 2.0:
-            scores['volume_score'] = 40
-        elif volume_ratio >= 1.5:
-            scores['volume_score'] = 30
-        elif volume_ratio >= 1.2:
-            scores['volume_score'] = 20
-        elif volume_ratio >= 1.0:
-            scores['volume_score'] = 10
-        else:
-            scores['volume_score'] = 5
+        Returns:
+            (乖離評分陣列, 成交量評分陣列, 總評分陣列)
+        """
+        # 乖離程度評分 (60分)：乖離率 <= 門檻時取得對應分數，缺失值為0分
+        deviation_scores = _DEVIATION_SCORES[np.searchsorted(_DEVIATION_BINS, deviation_rates, side='left')]
+        deviation_scores = np.where(np.isnan(deviation_rates), 0, deviation_scores)
         
-        scores['total_score'] = scores['deviation_score'] + scores['volume_score']
+        # 成交量評分 (40分)：成交量比率 >= 門檻時取得對應分數，缺失值為5分
+        volume_scores = _VOLUME_SCORES[np.searchsorted(_VOLUME_BINS, volume_ratios, side='right')]
+        volume_scores = np.where(np.isnan(volume_ratios), 5, volume_scores)
         
-        return scores
+        return deviation_scores, volume_scores, deviation_scores + volume_scores
     
     def get_strategy_description(self) -> str:
         """獲取策略描述"""
@@ -5,20 +5,56 @@
 尋找整理後準備突破的股票
 """
 
+import numpy as np
 import pandas as pd
-import talib
-from typing import List
+from typing import List, Tuple
 from .base import BaseStrategy
 from ..models.signals import CoiledSpringSignal
+from ..utils.jit_indicators import (
+    NUMBA_AVAILABLE, sma, ema, rolling_std, rolling_max, rolling_min, panel_tail_stats
+)
 from ..utils.logger import setup_logger
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
+# 末端EMA的暖身長度（約10倍週期，與全序列計算的差異可忽略）
+_EMA_WARMUP_BARS = 200
+
+# 檢測信號時由最後一根K線一次取出的欄位（順序即解包順序）
+_SIGNAL_ROW_COLUMNS = [
+    'Close', 'Volume', 'ema_20', 'sma_50', 'sma_100', 'sd_10', 'sd_60', 'vol_10', 'vol_60',
+    'price_up_6mo_days', 'volatility_check', 'price_contract', 'ma_alignment', 'up_trend_6mo',
+    'vol_contract'
+]
+
+# 評分門檻（由小到大）與對應分數，分數陣列比門檻多一個元素
+_VOLATILITY_BINS = np.array([0.01, 0.02, 0.03, 0.05])
+_VOLATILITY_SCORES = np.array([40, 30, 20, 10, 0])
+_TREND_BINS = np.array([0.5, 0.55, 0.6])
+_TREND_SCORES = np.array([0, 5, 10, 15])
+_VOLUME_BINS = np.array([0.4, 0.5, 0.6, 0.7])
+_VOLUME_SCORES = np.array([20, 15, 10, 5, 0])
+_HISTORY_BINS = np.array([0.3, 0.4])
+_HISTORY_SCORES = np.array([0, 5, 10])
+
+
+def _tail_mean(values: np.ndarray, window: int) -> float:
+    """最後 window 筆的平均（資料不足時回傳 NaN）"""
+    return values[-window:].mean() if len(values) >= window else np.nan
+
+
+def _tail_std(values: np.ndarray, window: int) -> float:
+    """最後 window 筆的樣本標準差（與 pandas rolling().std() 一致，ddof=1）"""
+    return values[-window:].std(ddof=1) if len(values) >= window else np.nan
+
 
 class CoiledSpringStrategy(BaseStrategy):
     """蓄勢待發策略分析器 - 尋找整理後準備突破的股票"""
     
+    # detect_signals 只需最後一天的指標，可直接由原始價格計算
+    detects_from_raw_prices = True
+    
     def get_default_config(self) -> dict:
         """從配置檔案載入預設配置"""
         from ..core.config import config_manager
@@ -40,41 +76,66 @@ class CoiledSpringStrategy(BaseStrategy):
                 'min_periods': 120
             }
     
+    @property
+    def required_indicator_columns(self) -> List[str]:
+        """檢測信號所需的指標欄位"""
+        return [
+            'ema_20', 'sma_50', 'sma_100', 'sd_10', 'sd_60', 'vol_10', 'vol_60',
+            'price_up_6mo_days', 'high_60', 'low_60', 'diff_percentage_3mo', 'ma_alignment'
+        ]
+    
+    def _bind_config_params(self):
+        """綁定常用配置值"""
+        super()._bind_config_params()
+        self._trend_period = int(self.config['trend_period'])
+        self._volatility_threshold = float(self.config['volatility_threshold'])
+        self._volatility_contract_ratio = float(self.config['volatility_contract_ratio'])
+        self._volume_contract_ratio = float(self.config['volume_contract_ratio'])
+        self._trend_days_threshold = float(self.config['trend_days_threshold'])
+    
     def calculate_indicators(self, stock_data: pd.DataFrame) -> pd.DataFrame:
         """計算蓄勢待發策略需要的技術指標"""
+        # 資料已包含完整指標（例如資料庫已保存）時不重新計算
+        if self.has_indicators(stock_data):
+            return stock_data
+        
         try:
+            close = stock_data['Close'].to_numpy(dtype=np.float64)
+            volume = stock_data['Volume'].to_numpy(dtype=np.float64)
+            
             # 1. 計算移動平均線
-            stock_data['ema_20'] = talib.EMA(stock_data['Close'], timeperiod=20)
-            stock_data['sma_50'] = talib.SMA(stock_data['Close'], timeperiod=50)
-            stock_data['sma_100'] = talib.SMA(stock_data['Close'], timeperiod=100)
+            stock_data['ema_20'] = ema(close, 20)
+            stock_data['sma_50'] = sma(close, 50)
+            stock_data['sma_100'] = sma(close, 100)
             
             # 2. 計算波動性指標
-            stock_data['sd_10'] = stock_data['Close'].rolling(window=10).std()
-            stock_data['sd_60'] = stock_data['Close'].rolling(window=60).std()
+            stock_data['sd_10'] = rolling_std(close, 10)
+            stock_data['sd_60'] = rolling_std(close, 60)
             
             # 3. 計算成交量指標
-            stock_data['vol_10'] = stock_data['Volume'].rolling(window=10).mean()
-            stock_data['vol_60'] = stock_data['Volume'].rolling(window=60).mean()
+            stock_data['vol_10'] = sma(volume, 10)
+            stock_data['vol_60'] = sma(volume, 60)
             
             # 4. 計算趨勢強度
-            stock_data['price_up'] = stock_data['Close'] > stock_data['Close'].shift(1)
-            stock_data['price_up_6mo_days'] = stock_data['price_up'].rolling(
-                window=self.config['trend_period'], min_periods=self.config['trend_period']
-            ).sum()
+            # 以累積和相減取得視窗內上漲天數：cumsum[i] - cumsum[i-w] == sum(price_up[i-w+1:i+1])
+            # 上漲旗標直接寫入預先配置的陣列，不另外保存為欄位
+            price_up = np.zeros(len(close), dtype=bool)
+            np.greater(close[1:], close[:-1], out=price_up[1:])
+            stock_data['price_up_6mo_days'] = self._window_count(price_up, self._trend_period)
             
             # 5. 計算3個月波動性
-            stock_data['high_60'] = stock_data['High'].rolling(window=60).max()
-            stock_data['low_60'] = stock_data['Low'].rolling(window=60).min()
+            stock_data['high_60'] = rolling_max(stock_data['High'].to_numpy(dtype=np.float64), 60)
+            stock_data['low_60'] = rolling_min(stock_data['Low'].to_numpy(dtype=np.float64), 60)
             stock_data['diff_percentage_3mo'] = (
                 (stock_data['high_60'] - stock_data['low_60']) / stock_data['high_60']
             )
             
             # 6. 計算篩選條件
             # 條件1：3個月波動大於30%
-            stock_data['volatility_check'] = stock_data['diff_percentage_3mo'] > self.config['volatility_threshold']
+            stock_data['volatility_check'] = stock_data['diff_percentage_3mo'] > self._volatility_threshold
             
             # 條件2：價格整理（波動收縮）
-            stock_data['price_contract'] = stock_data['sd_10'] < (stock_data['sd_60'] * self.config['volatility_contract_ratio'])
+            stock_data['price_contract'] = stock_data['sd_10'] < (stock_data['sd_60'] * self._volatility_contract_ratio)
             
             # 條件3：均線排列（多頭格局）
             stock_data['ma_alignment'] = (
@@ -83,10 +144,10 @@ class CoiledSpringStrategy(BaseStrategy):
             )
             
             # 條件4：6個月上漲趨勢確認
-            stock_data['up_trend_6mo'] = stock_data['price_up_6mo_days'] > self.config['trend_days_threshold']
+            stock_data['up_trend_6mo'] = stock_data['price_up_6mo_days'] > self._trend_days_threshold
             
             # 條件5：成交量萎縮
-            stock_data['vol_contract'] = stock_data['vol_10'] < (stock_data['vol_60'] * self.config['volume_contract_ratio'])
+            stock_data['vol_contract'] = stock_data['vol_10'] < (stock_data['vol_60'] * self._volume_contract_ratio)
             
             return stock_data
             
@@ -94,6 +155,76 @@ class CoiledSpringStrategy(BaseStrategy):
             logger.error(f"計算蓄勢待發指標錯誤: {str(e)}")
             return stock_data
     
+    @staticmethod
+    def _window_count(flags: np.ndarray, window: int) -> np.ndarray:
+        """滾動視窗內為 True 的筆數（前 window-1 筆為 NaN）"""
+        result = np.full(len(flags), np.nan)
+        if len(flags) >= window:
+            cumulative = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+            result[window - 1:] = cumulative[window:] - cumulative[:-window]
+        return result
+    
+    def _compute_last_row(self, stock_data: pd.DataFrame) -> dict:
+        """
+        只計算最後一天的指標與篩選條件
+        
+        結果與 calculate_indicators 最後一列相同，但只對尾端視窗做 NumPy 聚合，
+        不產生整段歷史的指標欄位
+        """
+        close = stock_data['Close'].to_numpy(dtype=np.float64)
+        high = stock_data['High'].to_numpy(dtype=np.float64)
+        low = stock_data['Low'].to_numpy(dtype=np.float64)
+        volume = stock_data['Volume'].to_numpy(dtype=np.float64)
+        trend_period = self._trend_period
+        
+        # 1. 移動平均線（EMA 只取尾端暖身區間計算）
+        ema_20 = ema(close[-_EMA_WARMUP_BARS:], 20)[-1] if len(close) >= 20 else np.nan
+        sma_50 = _tail_mean(close, 50)
+        sma_100 = _tail_mean(close, 100)
+        
+        # 2. 波動性與成交量
+        sd_10 = _tail_std(close, 10)
+        sd_60 = _tail_std(close, 60)
+        vol_10 = _tail_mean(volume, 10)
+        vol_60 = _tail_mean(volume, 60)
+        
+        # 3. 趨勢強度（第一天沒有前一日收盤，視為未上漲）
+        if len(close) > trend_period:
+            price_up_6mo_days = float(np.count_nonzero(close[-trend_period:] > close[-(trend_period + 1):-1]))
+        elif len(close) == trend_period:
+            price_up_6mo_days = float(np.count_nonzero(close[1:] > close[:-1]))
+        else:
+            price_up_6mo_days = np.nan
+        
+        # 4. 3個月波動性
+        high_60 = high[-60:].max() if len(high) >= 60 else np.nan
+        low_60 = low[-60:].min() if len(low) >= 60 else np.nan
+        diff_percentage_3mo = (high_60 - low_60) / high_60
+        
+        ma_alignment = bool(ema_20 > sma_50 and sma_50 > sma_100)
+        
+        return {
+            'Date': stock_data['Date'].iloc[-1],
+            'Close': close[-1],
+            'Volume': volume[-1],
+            'ema_20': ema_20,
+            'sma_50': sma_50,
+            'sma_100': sma_100,
+            'sd_10': sd_10,
+            'sd_60': sd_60,
+            'vol_10': vol_10,
+            'vol_60': vol_60,
+            'price_up_6mo_days': price_up_6mo_days,
+            'high_60': high_60,
+            'low_60': low_60,
+            'diff_percentage_3mo': diff_percentage_3mo,
+            'volatility_check': bool(diff_percentage_3mo > self._volatility_threshold),
+            'price_contract': bool(sd_10 < sd_60 * self._volatility_contract_ratio),
+            'ma_alignment': ma_alignment,
+            'up_trend_6mo': bool(price_up_6mo_days > self._trend_days_threshold),
+            'vol_contract': bool(vol_10 < vol_60 * self._volume_contract_ratio)
+        }
+    
     def detect_signals(self, symbol: str, stock_data: pd.DataFrame) -> List[CoiledSpringSignal]:
         """檢測蓄勢待發信號"""
         signals = []
@@ -103,60 +234,57 @@ class CoiledSpringStrategy(BaseStrategy):
                 return signals
             
             # 確保有足夠的數據
-            if len(stock_data) < self.config['trend_period']:
+            if len(stock_data) < self._trend_period:
                 return signals
             
-            # 計算指標
-            stock_data = self.calculate_indicators(stock_data)
+            # 只檢查當天（最後一天）；已有完整指標時直接取用，否則只計算最後一天的數值
+            # 所需數值一次取出為純量，缺少的條件欄位視為不成立
+            if self.has_indicators(stock_data):
+                last = stock_data.iloc[-1]
+                signal_date = last['Date']
+                values = last.reindex(_SIGNAL_ROW_COLUMNS, fill_value=0).to_numpy(dtype=np.float64)
+            else:
+                row = self._compute_last_row(stock_data)
+                signal_date = row['Date']
+                values = [row[col] for col in _SIGNAL_ROW_COLUMNS]
+            
+            (close, volume, ema_20, sma_50, sma_100, sd_10, sd_60, vol_10, vol_60, price_up_6mo_days,
+             volatility_check, price_contract, ma_alignment, up_trend_6mo, vol_contract) = values
             
-            # 只檢查當天（最後一天）
-            if len(stock_data) > 0:
-                i = len(stock_data) - 1
-                row = stock_data.iloc[i]
+            # 基本篩選條件
+            if (close < self._min_price or 
+                volume < self._min_volume or
+                np.isnan(ema_20) or np.isnan(sma_50) or np.isnan(sma_100)):
+                return signals
+            
+            # 檢查五大條件
+            if volatility_check and price_contract and ma_alignment and up_trend_6mo and vol_contract:
+                # 計算評分
+                up_trend_strength = price_up_6mo_days / self._trend_period
+                volume_ratio = vol_10 / vol_60 if vol_60 > 0 else 1.0
+                
+                volatility_score, trend_score, volume_score, total_score = self._calculate_signal_score(
+                    sd_10, sd_60, ma_alignment, up_trend_strength, volume_ratio
+                )
                 
-                # 基本篩選條件
-                if (row['Close'] < self.config['min_price'] or 
-                    row['Volume'] < self.config['min_volume'] or
-                    pd.isna(row['ema_20']) or pd.isna(row['sma_50']) or pd.isna(row['sma_100'])):
-                    return signals
+                signal = CoiledSpringSignal(
+                    symbol=symbol,
+                    signal_date=pd.Timestamp(signal_date).value,
+                    price=close,
+                    volatility_10d=sd_10,
+                    volatility_60d=sd_60,
+                    ma_20_ema=ema_20,
+                    ma_50_sma=sma_50,
+                    ma_100_sma=sma_100,
+                    volume_ratio=volume_ratio,
+                    up_trend_strength=up_trend_strength,
+                    total_score=total_score,
+                    volatility_score=volatility_score,
+                    trend_score=trend_score,
+                    volume_score=volume_score
+                )
                 
-                # 檢查五大條件
-                if (row.get('volatility_check', False) and
-                    row.get('price_contract', False) and
-                    row.get('ma_alignment', False) and
-                    row.get('up_trend_6mo', False) and
-                    row.get('vol_contract', False)):
-                    
-                    # 計算評分
-                    up_trend_strength = row['price_up_6mo_days'] / self.config['trend_period']
-                    volume_ratio = row['vol_10'] / row['vol_60'] if row['vol_60'] > 0 else 1.0
-                    
-                    scores = self._calculate_signal_score(
-                        row['sd_10'], row['sd_60'], 
-                        row['ma_alignment'], up_trend_strength, volume_ratio
-                    )
-                    
-                    signal = CoiledSpringSignal(
-                        symbol=symbol,
-                        signal_date=row['Date'].strftime('%Y-%m-%d'),
-                        price=row['Close'],
-                        volatility_10d=row['sd_10'],
-                        volatility_60d=row['sd_60'],
-                        ma_20_ema=row['ema_20'],
-                        ma_50_sma=row['sma_50'],
-                        ma_100_sma=row['sma_100'],
-                        volume_ratio=volume_ratio,
-                        up_trend_strength=up_trend_strength,
-                        total_score=scores['total_score'],
-                        volatility_score=scores['volatility_score'],
-                        trend_score=scores['trend_score'],
-                        volume_score=scores['volume_score']
-                    )
-                    
-                    signals.append(signal)
-                    
-                    # 標記信號到資料中
-                    stock_data.loc[stock_data.index[i], 'coiled_spring_signal'] = 1
+                signals.append(signal)
             
             self.log_signal_detection(symbol, len(signals))
             return signals
@@ -165,65 +293,213 @@ class CoiledSpringStrategy(BaseStrategy):
             logger.error(f"檢測蓄勢待發信號錯誤 {symbol}: {str(e)}")
             return signals
     
+    def detect_signals_bulk(self, all_data: pd.DataFrame,
+                            account_value: float = 100000) -> List[CoiledSpringSignal]:
+        """
+        一次檢測所有股票的蓄勢待發信號
+        
+        將各股票最後 max(_EMA_WARMUP_BARS, trend_period + 1) 根K線排成 (股票數, K線數) 的面板
+        （不足者左側補 NaN；上漲天數需要 trend_period + 1 根收盤價），
+        沿股票軸一次計算最後一天的指標與五大條件，只為觸發的股票建立信號物件。
+        條件與 detect_signals 相同。
+        
+        只用於平均的成交量面板以 float32 保存以減半記憶體與頻寬，並以 float64 累加；
+        收盤價需逐日比較漲跌，最高價與最低價需取區間極值，三者保留 float64，
+        避免高價股相鄰價格在 float32 下捨入為相同值。信號價格與成交量取自原始 float64 資料。
+        """
+        signals = []
+        
+        try:
+            required_columns = ['symbol', 'Date', 'High', 'Low', 'Close', 'Volume']
+            if all_data.empty or not set(required_columns).issubset(all_data.columns):
+                return signals
+            
+            # 1. 建立面板：各股票的列位置由分組序號與倒數序號決定，不需逐股票迴圈
+            grouped = all_data.groupby('symbol', sort=False, observed=True)
+            group_ids = grouped.ngroup().to_numpy()
+            from_end = grouped.cumcount(ascending=False).to_numpy()
+            row_counts = np.bincount(group_ids)
+            n_symbols = len(row_counts)
+            trend_period = self._trend_period
+            bars = max(_EMA_WARMUP_BARS, trend_period + 1)
+            
+            keep = from_end < bars
+            rows = group_ids[keep]
+            cols = bars - 1 - from_end[keep]
+            
+            def to_panel(column: str, dtype) -> np.ndarray:
+                panel = np.full((n_symbols, bars), np.nan, dtype=dtype)
+                panel[rows, cols] = all_data[column].to_numpy(dtype=dtype)[keep]
+                return panel
+            
+            close = to_panel('Close', np.float64)
+            high = to_panel('High', np.float64)
+            low = to_panel('Low', np.float64)
+            volume = to_panel('Volume', np.float32)
+            
+            is_last = from_end == 0
+            symbols = np.empty(n_symbols, dtype=object)
+            symbols[group_ids[is_last]] = all_data['symbol'].astype(str).to_numpy()[is_last]
+            signal_dates = np.empty(n_symbols, dtype=np.int64)
+            signal_dates[group_ids[is_last]] = (
+                all_data['Date'].to_numpy(dtype='datetime64[ns]').view('int64')[is_last]
+            )
+            last_close = np.empty(n_symbols)
+            last_close[group_ids[is_last]] = all_data['Close'].to_numpy(dtype=np.float64)[is_last]
+            last_volume = np.empty(n_symbols)
+            last_volume[group_ids[is_last]] = all_data['Volume'].to_numpy(dtype=np.float64)[is_last]
+            
+            # 2. 最後一天的指標（尾端視窗含 NaN 即代表資料不足，結果為 NaN）
+            if NUMBA_AVAILABLE:
+                # 已安裝 numba：各股票平行掃描一次，不持有 GIL
+                (ema_20, sma_50, sma_100, sd_10, sd_60, vol_10, vol_60,
+                 price_up_6mo_days, high_60, low_60) = panel_tail_stats(
+                    close, high, low, volume, np.minimum(row_counts, bars), 20, trend_period
+                )
+            else:
+                ema_20 = self._panel_ema(close, np.minimum(row_counts, bars), 20)
+                sma_50 = close[:, -50:].mean(axis=1, dtype=np.float64)
+                sma_100 = close[:, -100:].mean(axis=1, dtype=np.float64)
+                sd_10 = close[:, -10:].std(axis=1, ddof=1, dtype=np.float64)
+                sd_60 = close[:, -60:].std(axis=1, ddof=1, dtype=np.float64)
+                vol_10 = volume[:, -10:].mean(axis=1, dtype=np.float64)
+                vol_60 = volume[:, -60:].mean(axis=1, dtype=np.float64)
+                price_up_6mo_days = np.count_nonzero(
+                    np.diff(close[:, -(trend_period + 1):], axis=1) > 0, axis=1
+                ).astype(np.float64)
+                high_60 = high[:, -60:].max(axis=1)
+                low_60 = low[:, -60:].min(axis=1)
+            diff_percentage_3mo = (high_60 - low_60) / high_60
+            
+            # 3. 基本篩選與五大條件
+            ma_alignment = (ema_20 > sma_50) & (sma_50 > sma_100)
+            with np.errstate(invalid='ignore'):
+                mask = (
+                    (row_counts >= max(self._min_periods, trend_period))
+                    & ~(last_close < self._min_price)
+                    & ~(last_volume < self._min_volume)
+                    & ~(np.isnan(ema_20) | np.isnan(sma_50) | np.isnan(sma_100))
+                    & (diff_percentage_3mo > self._volatility_threshold)
+                    & (sd_10 < sd_60 * self._volatility_contract_ratio)
+                    & ma_alignment
+                    & (price_up_6mo_days > self._trend_days_threshold)
+                    & (vol_10 < vol_60 * self._volume_contract_ratio)
+                )
+            hits = np.flatnonzero(mask)
+            if len(hits) == 0:
+                return signals
+            
+            # 4. 只為觸發的股票評分並建立信號
+            up_trend_strength = price_up_6mo_days[hits] / trend_period
+            volume_ratio = np.where(vol_60[hits] > 0, vol_10[hits] / vol_60[hits], 1.0)
+            volatility_scores, trend_scores, volume_scores, total_scores = self._score_vectorized(
+                sd_10[hits], sd_60[hits], ma_alignment[hits], up_trend_strength, volume_ratio
+            )
+            
+            for (symbol, signal_date, price, volatility_10d, volatility_60d, ma_20, ma_50, ma_100,
+                 ratio, strength, total_score, volatility_score, trend_score, volume_score) in zip(
+                    symbols[hits].tolist(), signal_dates[hits].tolist(), last_close[hits].tolist(),
+                    sd_10[hits].tolist(), sd_60[hits].tolist(), ema_20[hits].tolist(),
+                    sma_50[hits].tolist(), sma_100[hits].tolist(), volume_ratio.tolist(),
+                    up_trend_strength.tolist(), total_scores.tolist(), volatility_scores.tolist(),
+                    trend_scores.tolist(), volume_scores.tolist()):
+                signals.append(CoiledSpringSignal(
+                    symbol=symbol,
+                    signal_date=signal_date,
+                    price=price,
+                    volatility_10d=volatility_10d,
+                    volatility_60d=volatility_60d,
+                    ma_20_ema=ma_20,
+                    ma_50_sma=ma_50,
+                    ma_100_sma=ma_100,
+                    volume_ratio=ratio,
+                    up_trend_strength=strength,
+                    total_score=total_score,
+                    volatility_score=volatility_score,
+                    trend_score=trend_score,
+                    volume_score=volume_score
+                ))
+                self.log_signal_detection(symbol, 1)
+            
+            return signals
+            
+        except Exception as e:
+            logger.error(f"批次檢測蓄勢待發信號錯誤: {str(e)}")
+            return signals
+    
+    @staticmethod
+    def _panel_ema(close: np.ndarray, lengths: np.ndarray, period: int) -> np.ndarray:
+        """
+        面板各列最後一天的EMA（與 talib.EMA 相同，以各列前 period 筆的平均為起始值）
+        
+        Args:
+            close: (股票數, K線數) 收盤價面板，資料靠右對齊
+            lengths: 各列的有效K線數
+            period: EMA週期
+        """
+        n_symbols, bars = close.shape
+        starts = bars - lengths
+        seed_cols = starts + period - 1
+        
+        # 以累積和取得各列起始區間的平均
+        cumulative = np.cumsum(np.nan_to_num(close), axis=1, dtype=np.float64)
+        valid = seed_cols < bars
+        seed_idx = np.minimum(seed_cols, bars - 1)
+        seed_sum = cumulative[np.arange(n_symbols), seed_idx]
+        seed_sum -= np.where(starts > 0, cumulative[np.arange(n_symbols), np.maximum(starts - 1, 0)], 0.0)
+        ema = np.where(valid, seed_sum / period, np.nan)
+        
+        # 沿時間軸遞推，每一步同時更新所有股票
+        k = 2.0 / (period + 1)
+        for col in range(int(seed_idx.min()) + 1 if n_symbols else bars, bars):
+            update = col > seed_cols
+            ema = np.where(update, ema + (close[:, col] - ema) * k, ema)
+        return ema
+    
     def _calculate_signal_score(self, volatility_10d: float, volatility_60d: float, 
                                ma_alignment: bool, up_trend_strength: float, 
-                               volume_ratio: float) -> dict:
-        """計算信號強度評分（100分制）"""
-        scores = {
-            'volatility_score': 0,
-            'trend_score': 0,
-            'volume_score': 0,
-            'total_score': 0
-        }
+                               volume_ratio: float) -> Tuple[int, int, int, int]:
+        """
+        計算信號強度評分（100分制）
         
-        # 1. 波動性分數（40分）- 當前波動性越小越好
-        if volatility_10d <= 0.01:
-            scores['volatility_score'] = 40
-        elif volatility_10d <= 0.02:
-            scores['volatility_score'] = 30
-        elif volatility_10d <= 0.03:
-            scores['volatility_score'] = 20
-        elif volatility_10d <= 0.05:
-            scores['volatility_score'] = 10
-        else:
-            scores['volatility_score'] = 0
-        
-        # 2. 趨勢分數（30分）- 均線排列和趨勢強度
-        trend_score = 0
-        if ma_alignment:
-            trend_score += 15  # 均線排列良好
-        
-        if up_trend_strength > 0.6:  # 超過60%天數上漲
-            trend_score += 15
-        elif up_trend_strength > 0.55:
-            trend_score += 10
-        elif up_trend_strength > 0.5:
-            trend_score += 5
-        
-        scores['trend_score'] = trend_score
-        
-        # 3. 成交量分數（20分）- 成交量萎縮程度
-        if volume_ratio <= 0.4:
-            scores['volume_score'] = 20
-        elif volume_ratio <= 0.5:
-            scores['volume_score'] = 15
-        elif volume_ratio <= 0.6:
-            scores['volume_score'] = 10
-        elif volume_ratio <= 0.7:
-            scores['volume_score'] = 5
-        else:
-            scores['volume_score'] = 0
+        Returns:
+            (波動評分, 趨勢評分, 成交量評分, 總評分)
+        """
+        volatility_scores, trend_scores, volume_scores, total_scores = self._score_vectorized(
+            np.array([volatility_10d], dtype=np.float64), np.array([volatility_60d], dtype=np.float64),
+            np.array([bool(ma_alignment)]), np.array([up_trend_strength], dtype=np.float64),
+            np.array([volume_ratio], dtype=np.float64)
+        )
+        return (int(volatility_scores[0]), int(trend_scores[0]),
+                int(volume_scores[0]), int(total_scores[0]))
+    
+    @staticmethod
+    def _score_vectorized(volatility_10d: np.ndarray, volatility_60d: np.ndarray,
+                          ma_alignment: np.ndarray, up_trend_strength: np.ndarray,
+                          volume_ratio: np.ndarray):
+        """
+        以門檻陣列批次計算蓄勢待發信號評分
+        
+        Returns:
+            (波動性評分陣列, 趨勢評分陣列, 成交量評分陣列, 總評分陣列)
+        """
+        # 1. 波動性分數（40分）：當前波動性 <= 門檻時取得對應分數，缺失值為0分
+        volatility_scores = _VOLATILITY_SCORES[np.searchsorted(_VOLATILITY_BINS, volatility_10d, side='left')]
+        
+        # 2. 趨勢分數（30分）：均線排列15分，上漲天數比例 > 門檻時取得對應分數
+        trend_scores = _TREND_SCORES[np.searchsorted(_TREND_BINS, up_trend_strength, side='left')]
+        trend_scores = np.where(np.isnan(up_trend_strength), 0, trend_scores)
+        trend_scores = trend_scores + np.where(ma_alignment, 15, 0)
         
-        # 4. 歷史波動分數（10分）- 過去波動性證明
-        if volatility_60d > 0.4:
-            scores['total_score'] = 10
-        elif volatility_60d > 0.3:
-            scores['total_score'] = 5
+        # 3. 成交量分數（20分）：成交量比率 <= 門檻時取得對應分數，缺失值為0分
+        volume_scores = _VOLUME_SCORES[np.searchsorted(_VOLUME_BINS, volume_ratio, side='left')]
         
-        # 計算總分
-        scores['total_score'] += scores['volatility_score'] + scores['trend_score'] + scores['volume_score']
+        # 4. 歷史波動分數（10分）：過去波動性 > 門檻時取得對應分數
+        history_scores = _HISTORY_SCORES[np.searchsorted(_HISTORY_BINS, volatility_60d, side='left')]
+        history_scores = np.where(np.isnan(volatility_60d), 0, history_scores)
         
-        return scores
+        total_scores = history_scores + volatility_scores + trend_scores + volume_scores
+        return volatility_scores, trend_scores, volume_scores, total_scores
     
     def get_strategy_description(self) -> str:
         """獲取策略描述"""
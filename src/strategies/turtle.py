@@ -5,16 +5,32 @@
 基於經典海龜交易法則的突破策略
 """
 
+import numpy as np
 import pandas as pd
 import talib
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from .base import BaseStrategy
 from ..models.signals import TurtleSignal
+from ..utils.jit_indicators import turtle_indicators, turtle_last_values
 from ..utils.logger import setup_logger
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
+# 檢測信號時由最後一根K線一次取出的欄位（順序即解包順序）
+_SIGNAL_ROW_COLUMNS = [
+    'Close', 'Volume', 'atr', 'high_20', 'high_55', 'volume_ratio',
+    'price_change_5d', 'price_change_20d', 'system1_breakout', 'system2_breakout'
+]
+
+# 評分門檻（由小到大）與對應分數，分數陣列比門檻多一個元素
+_BREAKOUT_BINS = np.array([0.0, 2.0, 5.0, 10.0])
+_BREAKOUT_SCORES = np.array([5, 40, 30, 15, 5])
+_VOLUME_BINS = np.array([1.2, 1.5, 2.0])
+_VOLUME_SCORES = np.array([12, 20, 28, 35])
+_MOMENTUM_BINS = np.array([0.0, 0.01, 0.03, 0.05])
+_MOMENTUM_SCORES = np.array([0, 8, 15, 20, 25])
+
 
 class TurtleStrategy(BaseStrategy):
     """海龜交易策略分析器"""
@@ -46,37 +62,50 @@ class TurtleStrategy(BaseStrategy):
                 'min_periods': 60
             }
     
+    @property
+    def required_indicator_columns(self) -> List[str]:
+        """檢測信號所需的指標欄位"""
+        return [
+            'atr', 'high_20', 'low_10', 'high_55', 'low_20', 'volume_ratio',
+            'price_change_5d', 'price_change_20d', 'rsi', 'system1_breakout', 'system2_breakout'
+        ]
+    
+    def _bind_config_params(self):
+        """綁定常用配置值"""
+        super()._bind_config_params()
+        self._atr_period = int(self.config['atr_period'])
+        self._atr_ema = self.config['atr_method'] == 'ema'
+        self._system1_entry = int(self.config['system1_entry'])
+        self._system1_exit = int(self.config['system1_exit'])
+        self._system2_entry = int(self.config['system2_entry'])
+        self._system2_exit = int(self.config['system2_exit'])
+        self._lookback_days = int(self.config['lookback_days'])
+        self._stop_loss_atr = float(self.config['stop_loss_atr'])
+    
     def calculate_indicators(self, stock_data: pd.DataFrame) -> pd.DataFrame:
         """計算海龜策略指標"""
+        # 資料已包含完整指標（例如資料庫已保存）時不重新計算
+        if self.has_indicators(stock_data):
+            return stock_data
+        
         try:
-            # 計算ATR
-            high = stock_data['High']
-            low = stock_data['Low']
-            close = stock_data['Close']
-            
-            tr = talib.TRANGE(high, low, close)
-            
-            if self.config['atr_method'] == 'ema':
-                stock_data['atr'] = talib.EMA(tr, timeperiod=self.config['atr_period'])
-            else:
-                stock_data['atr'] = talib.SMA(tr, timeperiod=self.config['atr_period'])
-            
-            # 計算突破點
-            stock_data['high_20'] = stock_data['High'].rolling(window=self.config['system1_entry']).max()
-            stock_data['low_10'] = stock_data['Low'].rolling(window=self.config['system1_exit']).min()
-            stock_data['high_55'] = stock_data['High'].rolling(window=self.config['system2_entry']).max()
-            stock_data['low_20'] = stock_data['Low'].rolling(window=self.config['system2_exit']).min()
-            
-            # 成交量分析
-            stock_data['volume_20'] = stock_data['Volume'].rolling(window=20).mean()
-            stock_data['volume_ratio'] = stock_data['Volume'] / stock_data['volume_20']
-            
-            # 價格動能
-            stock_data['price_change_5d'] = (stock_data['Close'] - stock_data['Close'].shift(5)) / stock_data['Close'].shift(5)
-            stock_data['price_change_20d'] = (stock_data['Close'] - stock_data['Close'].shift(20)) / stock_data['Close'].shift(20)
+            # 一次取出價格陣列，所有滾動指標以單次融合掃描計算
+            close = stock_data['Close'].to_numpy(dtype=np.float64)
+            (stock_data['atr'], stock_data['high_20'], stock_data['low_10'],
+             stock_data['high_55'], stock_data['low_20'], stock_data['volume_20'],
+             stock_data['volume_ratio'], stock_data['price_change_5d'],
+             stock_data['price_change_20d']) = turtle_indicators(
+                stock_data['High'].to_numpy(dtype=np.float64),
+                stock_data['Low'].to_numpy(dtype=np.float64),
+                close,
+                stock_data['Volume'].to_numpy(dtype=np.float64),
+                self._atr_period, self._atr_ema,
+                self._system1_entry, self._system1_exit,
+                self._system2_entry, self._system2_exit
+            )
             
             # RSI
-            stock_data['rsi'] = talib.RSI(stock_data['Close'], timeperiod=14)
+            stock_data['rsi'] = talib.RSI(close, timeperiod=14)
             
             # 檢測突破
             stock_data['system1_breakout'] = stock_data['Close'] > stock_data['high_20']
@@ -96,146 +125,201 @@ class TurtleStrategy(BaseStrategy):
             if not self.validate_data(stock_data):
                 return signals
             
-            if len(stock_data) < self.config['lookback_days']:
+            if len(stock_data) < self._lookback_days:
                 return signals
             
-            # 只檢查最後一天
-            if len(stock_data) > 0:
-                i = len(stock_data) - 1
-                row = stock_data.iloc[i]
-                
-                # 基本篩選
-                if row['Close'] < self.config['min_price']:
-                    return signals
-                if row['Volume'] < self.config['min_volume']:
-                    return signals
-                if pd.isna(row.get('atr')) or row['atr'] <= 0:
-                    return signals
-                
-                # 檢測系統一突破
-                if row.get('system1_breakout'):
-                    signal = self._create_turtle_signal(
-                        symbol, row, 'system1_entry', 
-                        self.config['system1_entry'], account_value
-                    )
-                    if signal:
-                        signals.append(signal)
-                        # 標記信號到資料中
-                        stock_data.loc[stock_data.index[i], 'system1_breakout'] = 1
-                
-                # 檢測系統二突破
-                if row.get('system2_breakout'):
+            # 只檢查最後一天；所需數值一次取出為純量，後續不再逐欄位查詢 Series
+            signal_date = stock_data['Date'].iloc[-1]
+            values = stock_data[_SIGNAL_ROW_COLUMNS].iloc[-1].to_numpy(dtype=np.float64)
+            
+            (close, volume, atr, high_20, high_55, volume_ratio,
+             change_5d, change_20d, system1_breakout, system2_breakout) = values
+            
+            # 基本篩選
+            if close < self._min_price:
+                return signals
+            if volume < self._min_volume:
+                return signals
+            if np.isnan(atr) or atr <= 0:
+                return signals
+            
+            # 檢測系統一、系統二突破
+            for breakout, signal_type, days, breakout_high in (
+                    (system1_breakout, 'system1_entry', self._system1_entry, high_20),
+                    (system2_breakout, 'system2_entry', self._system2_entry, high_55)):
+                if not breakout:
+                    continue
+                signal = self._create_turtle_signal(
+                    symbol, signal_type, days, account_value, signal_date, close, volume,
+                    atr, breakout_high, volume_ratio, change_5d, change_20d
+                )
+                if signal:
+                    signals.append(signal)
+            
+            self.log_signal_detection(symbol, len(signals))
+            return signals
+            
+        except Exception as e:
+            logger.error(f"檢測海龜信號錯誤 {symbol}: {str(e)}")
+            return signals
+    
+    def detect_signals_bulk(self, all_data: pd.DataFrame,
+                            account_value: float = 100000) -> List[TurtleSignal]:
+        """
+        一次檢測所有股票的海龜信號
+        
+        各股票資料依股票連續排列成扁平陣列，由 turtle_last_values 計算最後一天的指標
+        （已安裝 numba 時平行計算），只為觸發突破的股票建立信號物件。條件與 detect_signals 相同。
+        """
+        signals = []
+        
+        try:
+            required_columns = ['symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+            if all_data.empty or not set(required_columns).issubset(all_data.columns):
+                return signals
+            
+            # 1. 依股票穩定排序（保留各股票內的日期順序），offsets 標示各股票的起訖位置
+            group_ids = all_data.groupby('symbol', sort=False, observed=True).ngroup().to_numpy()
+            order = np.argsort(group_ids, kind='stable')
+            row_counts = np.bincount(group_ids)
+            offsets = np.concatenate(([0], np.cumsum(row_counts)))
+            last_rows = offsets[1:] - 1
+            
+            def column(name: str) -> np.ndarray:
+                return all_data[name].to_numpy(dtype=np.float64)[order]
+            
+            close = column('Close')
+            volume = column('Volume')
+            atr, high_20, high_55, volume_ratio, change_5d, change_20d = turtle_last_values(
+                column('High'), column('Low'), close, volume, offsets,
+                self._atr_period, self._atr_ema,
+                self._system1_entry, self._system1_exit,
+                self._system2_entry, self._system2_exit
+            )
+            
+            symbols = all_data['symbol'].astype(str).to_numpy()[order][last_rows]
+            signal_dates = all_data['Date'].to_numpy(dtype='datetime64[ns]')[order][last_rows]
+            last_close = close[last_rows]
+            last_volume = volume[last_rows]
+            
+            # 2. 基本篩選與突破條件
+            with np.errstate(invalid='ignore'):
+                system1_breakout = last_close > high_20
+                system2_breakout = last_close > high_55
+                mask = (
+                    (row_counts >= max(self._min_periods, self._lookback_days))
+                    & ~(last_close < self._min_price)
+                    & ~(last_volume < self._min_volume)
+                    & (atr > 0)
+                    & (system1_breakout | system2_breakout)
+                )
+            
+            # 3. 只為觸發的股票建立信號
+            for s in np.flatnonzero(mask).tolist():
+                symbol = symbols[s]
+                symbol_signals = []
+                for breakout, signal_type, days, breakout_high in (
+                        (system1_breakout[s], 'system1_entry', self._system1_entry, high_20[s]),
+                        (system2_breakout[s], 'system2_entry', self._system2_entry, high_55[s])):
+                    if not breakout:
+                        continue
                     signal = self._create_turtle_signal(
-                        symbol, row, 'system2_entry',
-                        self.config['system2_entry'], account_value
+                        symbol, signal_type, days, account_value, signal_dates[s],
+                        float(last_close[s]), float(last_volume[s]), float(atr[s]),
+                        float(breakout_high), float(volume_ratio[s]),
+                        float(change_5d[s]), float(change_20d[s])
                     )
                     if signal:
-                        signals.append(signal)
-                        # 標記信號到資料中
-                        stock_data.loc[stock_data.index[i], 'system2_breakout'] = 1
+                        symbol_signals.append(signal)
+                signals.extend(symbol_signals)
+                self.log_signal_detection(symbol, len(symbol_signals))
             
-            self.log_signal_detection(symbol, len(signals))
             return signals
             
         except Exception as e:
-            logger.error(f"檢測海龜信號錯誤 {symbol}: {str(e)}")
+            logger.error(f"整批檢測海龜信號錯誤: {str(e)}")
             return signals
     
-    def _create_turtle_signal(self, symbol: str, row: pd.Series, signal_type: str, 
-                            days: int, account_value: float) -> Optional[TurtleSignal]:
+    def _create_turtle_signal(self, symbol: str, signal_type: str, days: int, account_value: float,
+                              signal_date, close: float, volume: float, atr: float,
+                              breakout_high: float, volume_ratio: float, change_5d: float,
+                              change_20d: float) -> Optional[TurtleSignal]:
         """創建海龜信號"""
         try:
             # 計算倉位大小
-            unit_size = int(account_value * 0.01 / row['atr']) if row['atr'] > 0 else 0
+            unit_size = int(account_value * 0.01 / atr) if atr > 0 else 0
             
             # 計算停損價格
-            stop_loss = row['Close'] - (self.config['stop_loss_atr'] * row['atr'])
-            
-            # 獲取突破價格
-            if signal_type == 'system1_entry':
-                breakout_high = row.get('high_20', row['Close'])
-            else:
-                breakout_high = row.get('high_55', row['Close'])
+            stop_loss = close - (self._stop_loss_atr * atr)
             
             # 計算評分
-            signal_data = {
-                'price_above_breakout_pct': (row['Close'] - breakout_high) / breakout_high * 100 if breakout_high > 0 else 0,
-                'volume_ratio': row.get('volume_ratio', 1.0),
-                'momentum_5d': row.get('price_change_5d', 0)
-            }
-            scores = self._calculate_signal_score(signal_data)
+            price_above_pct = (close - breakout_high) / breakout_high * 100 if breakout_high > 0 else 0
+            breakout_score, volume_score, momentum_score, total_score = self._calculate_signal_score(
+                price_above_pct, volume_ratio, change_5d
+            )
             
             return TurtleSignal(
                 symbol=symbol,
                 signal_type=signal_type,
-                signal_date=row['Date'].strftime('%Y-%m-%d'),
-                price=row['Close'],
-                atr=row['atr'],
+                signal_date=pd.Timestamp(signal_date).value,
+                price=close,
+                atr=atr,
                 unit_size=unit_size,
                 stop_loss_price=stop_loss,
                 breakout_high=breakout_high,
                 days_in_breakout=days,
-                current_price=row['Close'],
-                volume=row['Volume'],
-                volume_ratio=row.get('volume_ratio', 1.0),
-                price_change_pct=row.get('price_change_20d', 0) * 100,
-                momentum_5d=row.get('price_change_5d', 0),
-                total_score=scores['total_score'],
-                breakout_score=scores['breakout_score'],
-                volume_score=scores['volume_score'],
-                momentum_score=scores['momentum_score']
+                current_price=close,
+                volume=volume,
+                volume_ratio=volume_ratio,
+                price_change_pct=change_20d * 100,
+                momentum_5d=change_5d,
+                total_score=total_score,
+                breakout_score=breakout_score,
+                volume_score=volume_score,
+                momentum_score=momentum_score
             )
         except Exception as e:
             logger.error(f"創建海龜信號錯誤: {str(e)}")
             return None
     
-    def _calculate_signal_score(self, signal_data: dict) -> dict:
-        """計算信號評分"""
-        scores = {
-            'breakout_score': 0,
-            'volume_score': 0,
-            'momentum_score': 0,
-            'total_score': 0
-        }
+    def _calculate_signal_score(self, price_above_pct: float, volume_ratio: float,
+                                momentum_5d: float) -> Tuple[int, int, int, int]:
+        """
+        計算信號評分
         
-        # 突破強度評分 (40分)
-        price_above = signal_data.get('price_above_breakout_pct', 0)
-        if 0 < price_above <= 2:
-            scores['breakout_score'] = 40
-        elif 2 < price_above <= 5:
-            scores['breakout_score'] = 30
-        elif 5 < price_above <= 10:
-            scores['breakout_score'] = 15
-        else:
-            scores['breakout_score'] = 5
+        Returns:
+            (突破評分, 成交量評分, 動能評分, 總評分)
+        """
+        breakout_scores, volume_scores, momentum_scores, total_scores = self._score_vectorized(
+            np.array([price_above_pct], dtype=np.float64),
+            np.array([volume_ratio], dtype=np.float64),
+            np.array([momentum_5d], dtype=np.float64)
+        )
+        return (int(breakout_scores[0]), int(volume_scores[0]),
+                int(momentum_scores[0]), int(total_scores[0]))
+    
+    @staticmethod
+    def _score_vectorized(price_above_pct: np.ndarray, volume_ratios: np.ndarray,
+                          momentum_5d: np.ndarray):
+        """
+        以門檻陣列批次計算海龜信號評分
         
-        # 成交量評分 (35分)
-        volume_ratio = signal_data.get('volume_ratio', 1.0)
-        if volume_ratio >= 2.0:
-            scores['volume_score'] = 35
-        elif volume_ratio >= 1.5:
-            scores['volume_score'] = 28
-        elif volume_ratio >= 1.2:
-            scores['volume_score'] = 20
-        else:
-            scores['volume_score'] = 12
+        Returns:
+            (突破評分陣列, 成交量評分陣列, 動能評分陣列, 總評分陣列)
+        """
+        # 突破強度評分 (40分)：突破幅度落在 (0,2]、(2,5]、(5,10] 區間取得對應分數，其餘5分
+        breakout_scores = _BREAKOUT_SCORES[np.searchsorted(_BREAKOUT_BINS, price_above_pct, side='left')]
         
-        # 動能評分 (25分)
-        momentum = signal_data.get('momentum_5d', 0)
-        if momentum > 0.05:
-            scores['momentum_score'] = 25
-        elif momentum > 0.03:
-            scores['momentum_score'] = 20
-        elif momentum > 0.01:
-            scores['momentum_score'] = 15
-        elif momentum > 0:
-            scores['momentum_score'] = 8
-        else:
-            scores['momentum_score'] = 0
+        # 成交量評分 (35分)：成交量比率 >= 門檻時取得對應分數，缺失值為12分
+        volume_scores = _VOLUME_SCORES[np.searchsorted(_VOLUME_BINS, volume_ratios, side='right')]
+        volume_scores = np.where(np.isnan(volume_ratios), 12, volume_scores)
         
-        scores['total_score'] = scores['breakout_score'] + scores['volume_score'] + scores['momentum_score']
+        # 動能評分 (25分)：5日動能 > 門檻時取得對應分數，缺失值為0分
+        momentum_scores = _MOMENTUM_SCORES[np.searchsorted(_MOMENTUM_BINS, momentum_5d, side='left')]
+        momentum_scores = np.where(np.isnan(momentum_5d), 0, momentum_scores)
         
-        return scores
+        total_scores = breakout_scores + volume_scores + momentum_scores
+        return breakout_scores, volume_scores, momentum_scores, total_scores
     
     def get_strategy_description(self) -> str:
         """獲取策略描述"""
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+信號歷史記錄模組
+篩選器與報告共用的 JSONL 歷史檔案讀寫
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+from ..utils.logger import setup_logger, ensure_dir
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 建立日誌器
+logger = setup_logger(__name__)
+
+
+def history_paths(history_file: Union[str, Path]) -> Tuple[Path, Optional[Path]]:
+    """
+    歷史檔案路徑
+
+    設定中仍為 .json 的路徑一律改寫為 .jsonl，不會把 JSONL 附加到舊版檔案中
+
+    Args:
+        history_file: 設定的歷史檔案路徑
+
+    Returns:
+        (JSONL 歷史檔案, 舊版 JSON 歷史檔案或 None)
+    """
+    path = Path(history_file)
+    if path.suffix == '.json':
+        path = path.with_suffix('.jsonl')
+    legacy_path = path.with_suffix('.json')
+    return path, (legacy_path if legacy_path != path else None)
+
+
+def _merge_day(history: Dict[str, Any], date: str, day_record: Dict[str, Any], days: Optional[int]):
+    """合併一天的記錄：同一日期同一策略以較晚的記錄為準；指定 days 時只保留最近 days 個日期"""
+    if days is not None and date not in history:
+        # 視窗已滿且日期早於視窗內最舊日期時直接略過，否則擠出最舊日期
+        if days <= 0 or (len(history) >= days and date < min(history)):
+            return
+        if len(history) >= days:
+            del history[min(history)]
+    history.setdefault(date, {}).update(day_record)
+
+
+def load_history(history_file: Union[str, Path], days: Optional[int] = None) -> Dict[str, Any]:
+    """
+    載入信號歷史記錄
+
+    先合併舊版 JSON 檔案（若存在），再依序合併 JSONL 各行；
+    同一日期同一策略以較晚寫入的記錄為準（重跑同一天會取代先前的結果）
+
+    Args:
+        history_file: 歷史檔案路徑
+        days: 只保留最近的日期數，None 表示全部
+
+    Returns:
+        歷史記錄字典 {日期: {策略: [信號...]}}
+    """
+    path, legacy_path = history_paths(history_file)
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+    history = {}
+
+    try:
+        if legacy_path is not None and legacy_path.exists():
+            with open(legacy_path, 'rb') as f:
+                legacy = loads(f.read())
+            for date in sorted(legacy):
+                _merge_day(history, date, legacy[date], days)
+
+        if path.exists():
+            with open(path, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    for date, day_record in loads(line).items():
+                        _merge_day(history, date, day_record, days)
+        return history
+    except Exception as e:
+        logger.error(f"載入信號歷史記錄錯誤: {e}")
+        return {}
+
+
+def _ends_with_line(path: Path, line: bytes) -> bool:
+    """檢查檔案最後一行是否與 line 完全相同（只讀取檔案尾端）"""
+    if not path.exists():
+        return False
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size < len(line):
+            return False
+        # 多讀一個位元組確認是完整的一行（前一個字元為換行或位於檔案開頭）
+        start = max(size - len(line) - 1, 0)
+        f.seek(start)
+        tail = f.read()
+    return tail == line if start == 0 and size == len(line) else tail == b'\n' + line
+
+
+def append_history(history_file: Union[str, Path], date: str, day_record: Dict[str, Any]) -> Path:
+    """
+    附加一天的信號記錄
+
+    每次只附加一行 {日期: {策略: [信號...]}}，不重寫既有記錄；
+    最後一行與本次內容相同時不重複附加
+
+    Args:
+        history_file: 歷史檔案路徑
+        date: 記錄日期
+        day_record: {策略: [信號字典...]}
+
+    Returns:
+        實際寫入的 JSONL 檔案路徑
+    """
+    path, _ = history_paths(history_file)
+
+    # 有 orjson 時使用較快的編碼器
+    if ORJSON_AVAILABLE:
+        line = orjson.dumps({date: day_record}, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        line = json.dumps({date: day_record}, ensure_ascii=False).encode('utf-8')
+    line += b'\n'
+
+    if _ends_with_line(path, line):
+        logger.info(f"信號歷史記錄未變更，略過寫入: {path}")
+        return path
+
+    ensure_dir(str(path.parent))
+    with open(path, 'ab') as f:
+        f.write(line)
+    return path
@@ -9,12 +9,29 @@ import pandas as pd
 import numpy as np
 import talib
 from typing import Optional, Union, List
+from ..utils.jit_indicators import rolling_log_return_std
 from ..utils.logger import setup_logger
 
 # 建立日誌器
 logger = setup_logger(__name__)
 
 
+def _rolling_hilo(values: np.ndarray, period: int):
+    """
+    以同一個滑動視窗檢視一次取得滾動最高值與最低值
+    
+    Returns:
+        (滾動最高值, 滾動最低值)，前 period-1 筆為 NaN
+    """
+    high = np.full(len(values), np.nan)
+    low = np.full(len(values), np.nan)
+    if len(values) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        high[period - 1:] = windows.max(axis=-1)
+        low[period - 1:] = windows.min(axis=-1)
+    return high, low
+
+
 def calculate_atr(data: pd.DataFrame, period: int = 20, method: str = 'sma') -> pd.Series:
     """
     計算ATR (Average True Range) 指標
@@ -174,15 +191,40 @@ def detect_breakout(data: pd.DataFrame, period: int, price_col: str = 'Close') -
         突破信號序列 (True/False)
     """
     try:
-        price = data[price_col]
-        high_period = price.rolling(window=period).max()
-        breakout = price > high_period.shift(1)
-        return breakout
+        price = data[price_col].to_numpy(dtype=np.float64)
+        high_period, _ = _rolling_hilo(price, period)
+        
+        # 與前一天為止的最高值比較（前 period 筆無比較基準，視為未突破）
+        previous_high = np.concatenate(([np.nan], high_period[:-1]))
+        with np.errstate(invalid='ignore'):
+            breakout = price > previous_high
+        return pd.Series(breakout, index=data.index)
     except Exception as e:
         logger.error(f"檢測突破錯誤: {e}")
         return pd.Series(index=data.index, dtype=bool)
 
 
+def detect_breakout_last(price: np.ndarray, period: int) -> bool:
+    """
+    只檢查最後一天是否突破前 period 天的最高值
+    
+    結果與 detect_breakout(...).iloc[-1] 相同，但只掃描尾端 period 筆，不建立整段序列
+    
+    Args:
+        price: 價格陣列
+        period: 突破週期
+    
+    Returns:
+        最後一天是否突破（資料不足或視窗含缺失值時為 False）
+    """
+    price = np.asarray(price, dtype=np.float64)
+    if period < 1 or len(price) < period + 1:
+        return False
+    # 視窗含 NaN 時 max 為 NaN，比較結果為 False
+    with np.errstate(invalid='ignore'):
+        return bool(price[-1] > price[-period - 1:-1].max())
+
+
 def calculate_volume_ratio(data: pd.DataFrame, short_period: int = 10, 
                           long_period: int = 20) -> pd.Series:
     """
@@ -230,9 +272,9 @@ def calculate_volatility(data: pd.DataFrame, period: int = 20,
             high = data['High']
             low = data['Low']
             return ((high - low) / price).rolling(window=period).mean()
-        else:  # std
-            returns = price.pct_change()
-            return returns.rolling(window=period).std()
+        else:  # std：對數報酬率的滾動標準差
+            return pd.Series(rolling_log_return_std(price.to_numpy(dtype=np.float64), period),
+                             index=data.index)
     except Exception as e:
         logger.error(f"計算波動性錯誤: {e}")
         return pd.Series(index=data.index, dtype=float)
@@ -304,12 +346,12 @@ def calculate_price_position(data: pd.DataFrame, period: int = 20,
         價格位置序列 (0-1之間)
     """
     try:
-        price = data[price_col]
-        high_period = price.rolling(window=period).max()
-        low_period = price.rolling(window=period).min()
+        price = data[price_col].to_numpy(dtype=np.float64)
+        high_period, low_period = _rolling_hilo(price, period)
         
-        position = (price - low_period) / (high_period - low_period)
-        return position
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position = (price - low_period) / (high_period - low_period)
+        return pd.Series(position, index=data.index)
     except Exception as e:
         logger.error(f"計算價格位置錯誤: {e}")
         return pd.Series(index=data.index, dtype=float)
@@ -329,10 +371,16 @@ def calculate_trend_strength(data: pd.DataFrame, period: int = 20,
         趨勢強度序列 (上漲天數比例)
     """
     try:
-        price = data[price_col]
-        price_up = (price > price.shift(1)).astype(int)
-        trend_strength = price_up.rolling(window=period).mean()
-        return trend_strength
+        price = data[price_col].to_numpy(dtype=np.float64)
+        price_up = np.zeros(len(price), dtype=bool)
+        np.greater(price[1:], price[:-1], out=price_up[1:])
+        
+        # 視窗內上漲天數 = 累積和相減，再除以週期
+        trend_strength = np.full(len(price), np.nan)
+        if len(price) >= period:
+            cumulative = np.concatenate(([0], np.cumsum(price_up, dtype=np.int64)))
+            trend_strength[period - 1:] = (cumulative[period:] - cumulative[:-period]) / period
+        return pd.Series(trend_strength, index=data.index)
     except Exception as e:
         logger.error(f"計算趨勢強度錯誤: {e}")
         return pd.Series(index=data.index, dtype=float)
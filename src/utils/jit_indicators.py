@@ -0,0 +1,772 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JIT技術指標模組
+以 NumPy 陣列為輸入的滾動指標，已安裝 numba 時以 @njit 編譯為單次線性掃描，
+未安裝時使用等價的 NumPy 向量化實作；多股票面板另提供以 prange 平行、
+釋放 GIL 的逐列掃描
+
+NaN 處理與 pandas rolling（min_periods=window）一致：視窗內含 NaN 時結果為 NaN
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# ---------------------------------------------------------------------------
+# numba 實作
+# ---------------------------------------------------------------------------
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _rolling_mean_jit(a, window):
+        n = len(a)
+        out = np.full(n, np.nan)
+        total = 0.0
+        nan_count = 0
+        for i in range(n):
+            value = a[i]
+            if np.isnan(value):
+                nan_count += 1
+            else:
+                total += value
+            if i >= window:
+                old = a[i - window]
+                if np.isnan(old):
+                    nan_count -= 1
+                else:
+                    total -= old
+            if i >= window - 1 and nan_count == 0:
+                out[i] = total / window
+        return out
+
+    @njit(cache=True)
+    def _rolling_std_jit(a, window):
+        # Welford 滾動變異數：視窗滑動時以同一公式加入新值、移除舊值，避免平方和相減的精度損失
+        n = len(a)
+        out = np.full(n, np.nan)
+        if window < 2:
+            return out
+        mean = 0.0
+        m2 = 0.0
+        nan_count = 0
+        valid = False
+        for i in range(n):
+            if np.isnan(a[i]):
+                nan_count += 1
+            if i >= window and np.isnan(a[i - window]):
+                nan_count -= 1
+            if i < window - 1:
+                continue
+            if nan_count > 0:
+                valid = False
+                continue
+            if not valid:
+                # 視窗內首次無缺失值：直接以兩次掃描初始化
+                mean = 0.0
+                for j in range(i - window + 1, i + 1):
+                    mean += a[j]
+                mean /= window
+                m2 = 0.0
+                for j in range(i - window + 1, i + 1):
+                    m2 += (a[j] - mean) * (a[j] - mean)
+                valid = True
+            else:
+                new = a[i]
+                old = a[i - window]
+                new_mean = mean + (new - old) / window
+                m2 += (new - old) * (new - new_mean + old - mean)
+                mean = new_mean
+                if m2 < 0.0:
+                    m2 = 0.0
+            out[i] = np.sqrt(m2 / (window - 1))
+        return out
+
+    @njit(cache=True, error_model='numpy')
+    def _rolling_log_return_std_jit(close, window):
+        # 對數報酬率在迴圈內即時計算並以 Welford 更新，不另外配置報酬率陣列
+        n = len(close)
+        out = np.full(n, np.nan)
+        if window < 2:
+            return out
+        mean = 0.0
+        m2 = 0.0
+        old = 0.0
+        nan_count = 0
+        valid = False
+        for i in range(1, n):
+            new = np.log(close[i] / close[i - 1])
+            if np.isnan(new):
+                nan_count += 1
+            if i > window:
+                old = np.log(close[i - window] / close[i - window - 1])
+                if np.isnan(old):
+                    nan_count -= 1
+            if i < window:
+                continue
+            if nan_count > 0:
+                valid = False
+                continue
+            if not valid:
+                mean = 0.0
+                for j in range(i - window + 1, i + 1):
+                    mean += np.log(close[j] / close[j - 1])
+                mean /= window
+                m2 = 0.0
+                for j in range(i - window + 1, i + 1):
+                    d = np.log(close[j] / close[j - 1]) - mean
+                    m2 += d * d
+                valid = True
+            else:
+                new_mean = mean + (new - old) / window
+                m2 += (new - old) * (new - new_mean + old - mean)
+                mean = new_mean
+                if m2 < 0.0:
+                    m2 = 0.0
+            out[i] = np.sqrt(m2 / (window - 1))
+        return out
+
+    @njit(cache=True)
+    def _push_extreme(values, queue, head, tail, i, window, is_max):
+        # 單調佇列（以陣列作環狀緩衝區）加入第 i 筆並移除視窗外的索引，佇列頭即視窗極值
+        value = values[i]
+        if not np.isnan(value):
+            if is_max:
+                while tail > head and values[queue[tail - 1]] <= value:
+                    tail -= 1
+            else:
+                while tail > head and values[queue[tail - 1]] >= value:
+                    tail -= 1
+            queue[tail] = i
+            tail += 1
+        while tail > head and queue[head] <= i - window:
+            head += 1
+        return head, tail
+
+    @njit(cache=True)
+    def _nan_delta(values, i, window):
+        # 視窗滑動一步後，視窗內 NaN 個數的變化量
+        delta = 1 if np.isnan(values[i]) else 0
+        if i >= window and np.isnan(values[i - window]):
+            delta -= 1
+        return delta
+
+    @njit(cache=True)
+    def _rolling_extreme_jit(a, window, is_max):
+        # 單調佇列單次掃描，每筆最多進出佇列一次，與視窗長度無關為 O(N)
+        n = len(a)
+        out = np.full(n, np.nan)
+        queue = np.empty(n, dtype=np.int64)
+        head = 0
+        tail = 0
+        nan_count = 0
+        for i in range(n):
+            head, tail = _push_extreme(a, queue, head, tail, i, window, is_max)
+            nan_count += _nan_delta(a, i, window)
+            if i >= window - 1 and nan_count == 0:
+                out[i] = a[queue[head]]
+        return out
+
+    @njit(cache=True)
+    def _rolling_max_jit(a, window):
+        return _rolling_extreme_jit(a, window, True)
+
+    @njit(cache=True)
+    def _rolling_min_jit(a, window):
+        return _rolling_extreme_jit(a, window, False)
+
+    @njit(cache=True)
+    def _ema_jit(a, period):
+        n = len(a)
+        out = np.full(n, np.nan)
+        # 與 talib 相同：略過開頭的 NaN，以前 period 筆的簡單平均作為起始值
+        start = 0
+        while start < n and np.isnan(a[start]):
+            start += 1
+        seed_end = start + period - 1
+        if seed_end >= n:
+            return out
+        total = 0.0
+        for i in range(start, seed_end + 1):
+            total += a[i]
+        prev = total / period
+        out[seed_end] = prev
+        k = 2.0 / (period + 1)
+        for i in range(seed_end + 1, n):
+            prev = (a[i] - prev) * k + prev
+            out[i] = prev
+        return out
+
+    @njit(cache=True, error_model='numpy')
+    def _turtle_indicators_jit(high, low, close, volume, atr_period, atr_ema,
+                               entry1, exit1, entry2, exit2):
+        # 單次掃描同時維護真實波幅/ATR、四個唐奇安佇列、成交量均量與價格變化，
+        # 每個輸入陣列只讀取一遍
+        n = len(close)
+        atr = np.full(n, np.nan)
+        high_1 = np.full(n, np.nan)
+        low_1 = np.full(n, np.nan)
+        high_2 = np.full(n, np.nan)
+        low_2 = np.full(n, np.nan)
+        volume_20 = np.full(n, np.nan)
+        volume_ratio = np.full(n, np.nan)
+        change_5d = np.full(n, np.nan)
+        change_20d = np.full(n, np.nan)
+
+        queues = np.empty((4, n), dtype=np.int64)
+        heads = np.zeros(4, dtype=np.int64)
+        tails = np.zeros(4, dtype=np.int64)
+        nans = np.zeros(4, dtype=np.int64)
+
+        # ATR：SMA 版以環狀緩衝區保存最近 atr_period 筆真實波幅（第一筆以 NaN 計）
+        trs = np.full(atr_period, np.nan)
+        tr_total = 0.0
+        tr_nan = atr_period
+        # EMA 版與 talib 相同：略過開頭的 NaN，以前 atr_period 筆平均為起始值
+        ema_seen = 0
+        ema_total = 0.0
+        ema_prev = np.nan
+        k = 2.0 / (atr_period + 1)
+
+        vol_total = 0.0
+        vol_nan = 0
+
+        for i in range(n):
+            c = close[i]
+            tr = np.nan
+            if i > 0:
+                prev_close = close[i - 1]
+                tr = high[i] - low[i]
+                up = abs(high[i] - prev_close)
+                down = abs(low[i] - prev_close)
+                if up > tr:
+                    tr = up
+                if down > tr:
+                    tr = down
+
+            if atr_ema:
+                if ema_seen < atr_period:
+                    if ema_seen > 0 or not np.isnan(tr):
+                        ema_total += tr
+                        ema_seen += 1
+                        if ema_seen == atr_period:
+                            ema_prev = ema_total / atr_period
+                            atr[i] = ema_prev
+                else:
+                    ema_prev = (tr - ema_prev) * k + ema_prev
+                    atr[i] = ema_prev
+            else:
+                slot = i % atr_period
+                old = trs[slot]
+                if np.isnan(old):
+                    tr_nan -= 1
+                else:
+                    tr_total -= old
+                if np.isnan(tr):
+                    tr_nan += 1
+                else:
+                    tr_total += tr
+                trs[slot] = tr
+                if i >= atr_period - 1 and tr_nan == 0:
+                    atr[i] = tr_total / atr_period
+
+            heads[0], tails[0] = _push_extreme(high, queues[0], heads[0], tails[0], i, entry1, True)
+            heads[1], tails[1] = _push_extreme(low, queues[1], heads[1], tails[1], i, exit1, False)
+            heads[2], tails[2] = _push_extreme(high, queues[2], heads[2], tails[2], i, entry2, True)
+            heads[3], tails[3] = _push_extreme(low, queues[3], heads[3], tails[3], i, exit2, False)
+            nans[0] += _nan_delta(high, i, entry1)
+            nans[1] += _nan_delta(low, i, exit1)
+            nans[2] += _nan_delta(high, i, entry2)
+            nans[3] += _nan_delta(low, i, exit2)
+            if i >= entry1 - 1 and nans[0] == 0:
+                high_1[i] = high[queues[0, heads[0]]]
+            if i >= exit1 - 1 and nans[1] == 0:
+                low_1[i] = low[queues[1, heads[1]]]
+            if i >= entry2 - 1 and nans[2] == 0:
+                high_2[i] = high[queues[2, heads[2]]]
+            if i >= exit2 - 1 and nans[3] == 0:
+                low_2[i] = low[queues[3, heads[3]]]
+
+            v = volume[i]
+            if np.isnan(v):
+                vol_nan += 1
+            else:
+                vol_total += v
+            if i >= 20:
+                old = volume[i - 20]
+                if np.isnan(old):
+                    vol_nan -= 1
+                else:
+                    vol_total -= old
+            if i >= 19 and vol_nan == 0:
+                volume_20[i] = vol_total / 20
+                volume_ratio[i] = v / volume_20[i]
+
+            if i >= 5:
+                change_5d[i] = (c - close[i - 5]) / close[i - 5]
+            if i >= 20:
+                change_20d[i] = (c - close[i - 20]) / close[i - 20]
+
+        return (atr, high_1, low_1, high_2, low_2, volume_20, volume_ratio,
+                change_5d, change_20d)
+
+    @njit(cache=True, parallel=True, nogil=True)
+    def _turtle_last_values_jit(high, low, close, volume, offsets, atr_period, atr_ema,
+                                entry1, exit1, entry2, exit2):
+        # 各股票資料在扁平陣列中連續存放，offsets[s]:offsets[s+1] 為第 s 檔；
+        # 以 prange 分配到多個執行緒，每檔執行一次融合掃描並保留最後一天的值
+        n_symbols = len(offsets) - 1
+        out = np.full((6, n_symbols), np.nan)
+        for s in prange(n_symbols):
+            start = offsets[s]
+            end = offsets[s + 1]
+            if end <= start:
+                continue
+            (atr, high_1, low_1, high_2, low_2, volume_20, volume_ratio,
+             change_5d, change_20d) = _turtle_indicators_jit(
+                high[start:end], low[start:end], close[start:end], volume[start:end],
+                atr_period, atr_ema, entry1, exit1, entry2, exit2
+            )
+            out[0, s] = atr[-1]
+            out[1, s] = high_1[-1]
+            out[2, s] = high_2[-1]
+            out[3, s] = volume_ratio[-1]
+            out[4, s] = change_5d[-1]
+            out[5, s] = change_20d[-1]
+        return out
+
+    @njit(cache=True)
+    def _tail_mean_row(row, window):
+        bars = len(row)
+        total = 0.0
+        for j in range(bars - window, bars):
+            total += row[j]
+        return total / window
+
+    @njit(cache=True)
+    def _tail_std_row(row, window):
+        bars = len(row)
+        mean = _tail_mean_row(row, window)
+        m2 = 0.0
+        for j in range(bars - window, bars):
+            m2 += (row[j] - mean) * (row[j] - mean)
+        return np.sqrt(m2 / (window - 1))
+
+    @njit(cache=True, parallel=True, nogil=True)
+    def _panel_tail_stats_jit(close, high, low, volume, lengths, ema_period, trend_period):
+        # 各列互不相依，以 prange 分配到多個執行緒；迴圈內不觸及 Python 物件，全程不持有 GIL
+        n_symbols, bars = close.shape
+        out = np.full((10, n_symbols), np.nan)
+        k = 2.0 / (ema_period + 1)
+        for s in prange(n_symbols):
+            row = close[s]
+            start = bars - lengths[s]
+
+            # EMA：與面板版本相同，起始區間內的缺失值視為 0
+            seed_end = start + ema_period - 1
+            if seed_end < bars:
+                total = 0.0
+                for j in range(start, seed_end + 1):
+                    if not np.isnan(row[j]):
+                        total += row[j]
+                prev = total / ema_period
+                for j in range(seed_end + 1, bars):
+                    prev = (row[j] - prev) * k + prev
+                out[0, s] = prev
+
+            out[1, s] = _tail_mean_row(row, 50)
+            out[2, s] = _tail_mean_row(row, 100)
+            out[3, s] = _tail_std_row(row, 10)
+            out[4, s] = _tail_std_row(row, 60)
+            out[5, s] = _tail_mean_row(volume[s], 10)
+            out[6, s] = _tail_mean_row(volume[s], 60)
+
+            up_days = 0
+            for j in range(max(1, bars - trend_period), bars):
+                if row[j] > row[j - 1]:
+                    up_days += 1
+            out[7, s] = up_days
+
+            # 與 ndarray.max / min 相同：視窗內含 NaN 時結果為 NaN
+            hi = high[s, bars - 60]
+            lo = low[s, bars - 60]
+            for j in range(bars - 59, bars):
+                if high[s, j] > hi or np.isnan(high[s, j]):
+                    hi = high[s, j]
+                if low[s, j] < lo or np.isnan(low[s, j]):
+                    lo = low[s, j]
+            out[8, s] = hi
+            out[9, s] = lo
+        return out
+
+    @njit(cache=True, error_model='numpy')
+    def _consistency_counts_jit(open_, high, low, close, volume):
+        # 單次掃描同時累計價格邏輯、價格跳躍與成交量 Welford 平均/變異數，第二次掃描只計算離群數
+        n = len(close)
+        high_bad = 0
+        low_bad = 0
+        jumps = 0
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            o = open_[i]
+            c = close[i]
+            # 與 np.fmax / np.fmin 相同：一方為 NaN 時取另一方
+            if np.isnan(o):
+                upper = c
+                lower = c
+            elif np.isnan(c):
+                upper = o
+                lower = o
+            else:
+                upper = max(o, c)
+                lower = min(o, c)
+            if not high[i] >= upper:
+                high_bad += 1
+            if not low[i] <= lower:
+                low_bad += 1
+            if i > 0 and abs((c - close[i - 1]) / close[i - 1]) > 0.2:
+                jumps += 1
+            v = volume[i]
+            if not np.isnan(v):
+                count += 1
+                delta = v - mean
+                mean += delta / count
+                m2 += delta * (v - mean)
+        outliers = 0
+        if count >= 2:
+            limit = 3.0 * np.sqrt(m2 / (count - 1))
+            for i in range(n):
+                if abs(volume[i] - mean) > limit:
+                    outliers += 1
+        return high_bad, low_bad, jumps, outliers
+
+
+# ---------------------------------------------------------------------------
+# NumPy 實作（未安裝 numba 時使用）
+# ---------------------------------------------------------------------------
+
+def _rolling_mean_np(a: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        out[window - 1:] = sliding_window_view(a, window).mean(axis=1)
+    return out
+
+
+def _rolling_std_np(a: np.ndarray, window: int) -> np.ndarray:
+    # 每個視窗以兩次掃描計算（先求平均再求離差），數值穩定
+    out = np.full(len(a), np.nan)
+    if window >= 2 and len(a) >= window:
+        out[window - 1:] = sliding_window_view(a, window).std(axis=1, ddof=1)
+    return out
+
+
+def _rolling_log_return_std_np(close: np.ndarray, window: int) -> np.ndarray:
+    returns = np.full(len(close), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(close[1:] / close[:-1])
+    return _rolling_std_np(returns, window)
+
+
+def _rolling_max_np(a: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        out[window - 1:] = sliding_window_view(a, window).max(axis=1)
+    return out
+
+
+def _rolling_min_np(a: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        out[window - 1:] = sliding_window_view(a, window).min(axis=1)
+    return out
+
+
+def _donchian_np(high: np.ndarray, low: np.ndarray, window_high: int, window_low: int):
+    return _rolling_max_np(high, window_high), _rolling_min_np(low, window_low)
+
+
+def _ema_np(a: np.ndarray, period: int) -> np.ndarray:
+    import talib
+    return talib.EMA(a, timeperiod=period)
+
+
+def _true_range_np(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        prev_close = close[:-1]
+        out[1:] = np.maximum.reduce([
+            high[1:] - low[1:],
+            np.abs(high[1:] - prev_close),
+            np.abs(low[1:] - prev_close)
+        ])
+    return out
+
+
+def _turtle_indicators_np(high, low, close, volume, atr_period, atr_ema,
+                          entry1, exit1, entry2, exit2):
+    tr = _true_range_np(high, low, close)
+    atr = _ema_np(tr, atr_period) if atr_ema else _rolling_mean_np(tr, atr_period)
+    high_1, low_1 = _donchian_np(high, low, entry1, exit1)
+    high_2, low_2 = _donchian_np(high, low, entry2, exit2)
+    volume_20 = _rolling_mean_np(volume, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume / volume_20
+        change_5d = np.full(len(close), np.nan)
+        change_5d[5:] = (close[5:] - close[:-5]) / close[:-5]
+        change_20d = np.full(len(close), np.nan)
+        change_20d[20:] = (close[20:] - close[:-20]) / close[:-20]
+    return (atr, high_1, low_1, high_2, low_2, volume_20, volume_ratio,
+            change_5d, change_20d)
+
+
+def _turtle_last_values_np(high, low, close, volume, offsets, atr_period, atr_ema,
+                           entry1, exit1, entry2, exit2):
+    # 逐股票執行 NumPy 版本並保留最後一天的值
+    n_symbols = len(offsets) - 1
+    out = np.full((6, n_symbols), np.nan)
+    for s in range(n_symbols):
+        start, end = offsets[s], offsets[s + 1]
+        if end <= start:
+            continue
+        (atr, high_1, _, high_2, _, _, volume_ratio, change_5d, change_20d) = _turtle_indicators_np(
+            high[start:end], low[start:end], close[start:end], volume[start:end],
+            atr_period, atr_ema, entry1, exit1, entry2, exit2
+        )
+        out[:, s] = (atr[-1], high_1[-1], high_2[-1], volume_ratio[-1], change_5d[-1], change_20d[-1])
+    return out
+
+
+def _consistency_counts_np(open_, high, low, close, volume):
+    high_bad = int(np.count_nonzero(~(high >= np.fmax(open_, close))))
+    low_bad = int(np.count_nonzero(~(low <= np.fmin(open_, close))))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jumps = int(np.count_nonzero(np.abs(np.diff(close) / close[:-1]) > 0.2))
+        volume_std = np.nanstd(volume, ddof=1) if np.count_nonzero(~np.isnan(volume)) >= 2 else np.nan
+        outliers = int(np.count_nonzero(np.abs(volume - np.nanmean(volume)) > 3 * volume_std))
+    return high_bad, low_bad, jumps, outliers
+
+
+# ---------------------------------------------------------------------------
+# 公開介面
+# ---------------------------------------------------------------------------
+
+if NUMBA_AVAILABLE:
+    _rolling_mean, _rolling_max, _rolling_min = _rolling_mean_jit, _rolling_max_jit, _rolling_min_jit
+    _ema, _rolling_std = _ema_jit, _rolling_std_jit
+    _rolling_log_return_std = _rolling_log_return_std_jit
+    _turtle_indicators = _turtle_indicators_jit
+    _turtle_last_values = _turtle_last_values_jit
+    _consistency_counts = _consistency_counts_jit
+else:
+    _rolling_mean, _rolling_max, _rolling_min = _rolling_mean_np, _rolling_max_np, _rolling_min_np
+    _ema, _rolling_std = _ema_np, _rolling_std_np
+    _rolling_log_return_std = _rolling_log_return_std_np
+    _turtle_indicators = _turtle_indicators_np
+    _turtle_last_values = _turtle_last_values_np
+    _consistency_counts = _consistency_counts_np
+
+
+def sma(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    簡單移動平均
+
+    Args:
+        a: float64 陣列
+        window: 視窗長度
+
+    Returns:
+        與輸入等長的陣列，前 window-1 筆為 NaN
+    """
+    return _rolling_mean(np.asarray(a, dtype=np.float64), int(window))
+
+
+def ema(a: np.ndarray, period: int) -> np.ndarray:
+    """
+    指數移動平均（與 talib.EMA 相同，以前 period 筆的簡單平均為起始值）
+
+    Args:
+        a: float64 陣列
+        period: 週期
+
+    Returns:
+        與輸入等長的陣列
+    """
+    return _ema(np.asarray(a, dtype=np.float64), int(period))
+
+
+def rolling_std(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    滾動樣本標準差（ddof=1，與 pandas rolling().std() 一致）
+
+    以 Welford 演算法更新，價格絕對值大而波動小時不會因相減抵銷而失準
+
+    Args:
+        a: float64 陣列
+        window: 視窗長度
+
+    Returns:
+        與輸入等長的陣列，前 window-1 筆為 NaN
+    """
+    return _rolling_std(np.asarray(a, dtype=np.float64), int(window))
+
+
+def rolling_log_return_std(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    對數報酬率的滾動樣本標準差（ddof=1）
+
+    對數報酬率可加且對價格尺度不敏感；numba 版本在同一次掃描中計算報酬率與變異數
+
+    Args:
+        close: 收盤價陣列
+        window: 視窗長度（報酬率筆數）
+
+    Returns:
+        與輸入等長的陣列，前 window 筆為 NaN
+    """
+    return _rolling_log_return_std(np.asarray(close, dtype=np.float64), int(window))
+
+
+def rolling_max(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    滾動最大值
+
+    Args:
+        a: float64 陣列
+        window: 視窗長度
+
+    Returns:
+        與輸入等長的陣列，前 window-1 筆為 NaN
+    """
+    return _rolling_max(np.asarray(a, dtype=np.float64), int(window))
+
+
+def rolling_min(a: np.ndarray, window: int) -> np.ndarray:
+    """
+    滾動最小值
+
+    Args:
+        a: float64 陣列
+        window: 視窗長度
+
+    Returns:
+        與輸入等長的陣列，前 window-1 筆為 NaN
+    """
+    return _rolling_min(np.asarray(a, dtype=np.float64), int(window))
+
+
+def turtle_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                      atr_period: int, atr_ema: bool, entry1: int, exit1: int,
+                      entry2: int, exit2: int):
+    """
+    海龜策略指標（numba 版本將所有滾動狀態融合為單次掃描）
+
+    Args:
+        high: 最高價陣列
+        low: 最低價陣列
+        close: 收盤價陣列
+        volume: 成交量陣列
+        atr_period: ATR週期
+        atr_ema: True 時 ATR 以 EMA 平滑，否則為 SMA
+        entry1: 系統一突破週期
+        exit1: 系統一出場週期
+        entry2: 系統二突破週期
+        exit2: 系統二出場週期
+
+    Returns:
+        (atr, 系統一高點, 系統一低點, 系統二高點, 系統二低點,
+         volume_20, volume_ratio, price_change_5d, price_change_20d)
+    """
+    return _turtle_indicators(np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64),
+                              np.asarray(close, dtype=np.float64), np.asarray(volume, dtype=np.float64),
+                              int(atr_period), bool(atr_ema), int(entry1), int(exit1),
+                              int(entry2), int(exit2))
+
+
+def turtle_last_values(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                       offsets: np.ndarray, atr_period: int, atr_ema: bool, entry1: int,
+                       exit1: int, entry2: int, exit2: int):
+    """
+    多股票最後一天的海龜指標
+
+    已安裝 numba 時各股票以 prange 平行執行融合掃描並釋放 GIL，否則逐股票以 NumPy 計算；
+    使用完整歷史，EMA 版 ATR 與逐股票計算結果相同
+
+    Args:
+        high: 所有股票依股票連續排列的最高價
+        low: 最低價
+        close: 收盤價
+        volume: 成交量
+        offsets: 長度為股票數+1 的起始位置，第 s 檔為 offsets[s]:offsets[s+1]
+        atr_period: ATR週期
+        atr_ema: True 時 ATR 以 EMA 平滑，否則為 SMA
+        entry1: 系統一突破週期
+        exit1: 系統一出場週期
+        entry2: 系統二突破週期
+        exit2: 系統二出場週期
+
+    Returns:
+        (atr, 系統一高點, 系統二高點, volume_ratio, price_change_5d, price_change_20d)
+    """
+    return tuple(_turtle_last_values(
+        np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64),
+        np.asarray(close, dtype=np.float64), np.asarray(volume, dtype=np.float64),
+        np.asarray(offsets, dtype=np.int64), int(atr_period), bool(atr_ema),
+        int(entry1), int(exit1), int(entry2), int(exit2)
+    ))
+
+
+def panel_tail_stats(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray,
+                     lengths: np.ndarray, ema_period: int, trend_period: int):
+    """
+    多股票面板最後一天的蓄勢待發指標（需安裝 numba）
+
+    各列以 prange 平行掃描並釋放 GIL，單次遍歷同時完成所有尾端統計；
+    累加一律以 float64 進行，面板可為 float32
+
+    Args:
+        close: (股票數, K線數) 收盤價面板，資料靠右對齊、左側以 NaN 補齊
+        high: 最高價面板
+        low: 最低價面板
+        volume: 成交量面板
+        lengths: 各列的有效K線數（不超過面板K線數）
+        ema_period: EMA週期
+        trend_period: 上漲天數統計週期
+
+    Returns:
+        (ema, sma_50, sma_100, sd_10, sd_60, vol_10, vol_60, 上漲天數, high_60, low_60)
+    """
+    if not NUMBA_AVAILABLE:
+        raise ImportError("numba 未安裝，無法使用平行面板掃描")
+    return tuple(_panel_tail_stats_jit(close, high, low, volume,
+                                       np.asarray(lengths, dtype=np.int64),
+                                       int(ema_period), int(trend_period)))
+
+
+def consistency_counts(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       volume: np.ndarray):
+    """
+    價格資料一致性計數（已安裝 numba 時融合為單次掃描）
+
+    Args:
+        open_: 開盤價
+        high: 最高價
+        low: 最低價
+        close: 收盤價
+        volume: 成交量
+
+    Returns:
+        (High < max(Open, Close) 筆數, Low > min(Open, Close) 筆數,
+         單日漲跌幅超過 20% 次數, 成交量偏離平均超過 3 個標準差筆數)
+    """
+    return _consistency_counts(np.asarray(open_, dtype=np.float64), np.asarray(high, dtype=np.float64),
+                               np.asarray(low, dtype=np.float64), np.asarray(close, dtype=np.float64),
+                               np.asarray(volume, dtype=np.float64))
@@ -5,13 +5,202 @@
 提供統一的日誌設置和管理
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from ..core.config import config_manager
 
 
+@lru_cache(maxsize=1)
+def _logging_defaults() -> Tuple[str, str, str]:
+    """日誌預設值 (級別, 檔案, 格式)；配置只在啟動時載入一次，各模組共用同一份解析結果"""
+    logging_config = config_manager.get_logging_config()
+    return (
+        logging_config.get('level', 'INFO'),
+        logging_config.get('file', 'trading_system.log'),
+        logging_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+
+
+@lru_cache(maxsize=32)
+def ensure_dir(path: str):
+    """建立目錄（含上層目錄）；同一目錄在同一進程內只建立一次，不重複 stat"""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+
+@lru_cache(maxsize=8)
+def _level(level: str) -> int:
+    """日誌級別名稱 → 數值"""
+    return getattr(logging, level.upper())
+
+
+class _SharedFormatter(logging.Formatter):
+    """
+    多個 handler 共用的 Formatter
+    
+    同一筆記錄會由檔案與控制台 handler 各格式化一次，同一秒內的記錄也共用相同的時間字串；
+    因此快取最近一秒的 strftime 結果，只在秒數改變時重新格式化（僅用於預設 datefmt）
+    """
+    
+    def __init__(self, format_string: str):
+        super().__init__(format_string)
+        self._time_cache = (None, '')
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, formatted = self._time_cache
+        if second != cached_second:
+            formatted = time.strftime(self.default_time_format, self.converter(record.created))
+            # 以單一 tuple 指定，子進程多執行緒同時記錄時不會讀到不一致的秒數與字串
+            self._time_cache = (second, formatted)
+        if self.default_msec_format:
+            return self.default_msec_format % (formatted, record.msecs)
+        return formatted
+
+
+@lru_cache(maxsize=8)
+def _formatter(format_string: str) -> logging.Formatter:
+    """相同格式字串共用同一個 Formatter"""
+    return _SharedFormatter(format_string)
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    以大緩衝區開啟的檔案handler
+    
+    每 flush_interval 筆記錄或遇到 WARNING 以上級別才 flush，避免每筆記錄一次 write 系統呼叫；
+    關閉與程式結束時 logging.shutdown 會寫出剩餘內容。
+    只用於主進程的背景寫入；進程池子進程由 init_worker_logging 改用不緩衝的 handler
+    """
+    
+    def __init__(self, filename: str, encoding: str = 'utf-8', flush_interval: int = 256,
+                 buffer_size: int = 1 << 18):
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._pending = 0
+        super().__init__(filename, encoding=encoding)
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=getattr(self, 'errors', None))
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if self._pending >= self.flush_interval or record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        super().flush()
+        self._pending = 0
+
+
+# 背景寫入：相同 (日誌檔案, 格式) 的日誌器共用一組實際 handler 與一個 QueueListener，
+# 呼叫端只把記錄放入佇列，檔案與控制台寫入由背景執行緒完成
+_listeners: Dict[Tuple[str, str], Tuple[queue.Queue, List[logging.Handler], logging.handlers.QueueListener]] = {}
+_queued_loggers: List[logging.Logger] = []
+
+# 進程池子進程（init_worker_logging 之後）改為直接寫入的一般 handler
+_worker_process = False
+_worker_handlers: Dict[Tuple[str, str], List[logging.Handler]] = {}
+
+
+def _build_handlers(log_file: Optional[str], format_string: str, buffered: bool) -> List[logging.Handler]:
+    """建立檔案與控制台handler"""
+    formatter = _formatter(format_string)
+    handlers = []
+    
+    # 建立檔案handler
+    if log_file:
+        # 確保日誌目錄存在
+        ensure_dir(str(Path(log_file).parent))
+        
+        if buffered:
+            file_handler = _BufferedFileHandler(log_file, encoding='utf-8')
+        else:
+            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    
+    # 建立控制台handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
+    return handlers
+
+
+def _queue_handler(log_file: Optional[str], format_string: str) -> logging.handlers.QueueHandler:
+    """建立寫入 (日誌檔案, 格式) 對應佇列的 QueueHandler，首次使用時建立實際 handler 並啟動背景執行緒"""
+    key = (log_file or '', format_string)
+    if key in _listeners:
+        return logging.handlers.QueueHandler(_listeners[key][0])
+    
+    handlers = _build_handlers(log_file, format_string, buffered=True)
+    
+    # 級別由各日誌器與其 QueueHandler 過濾，共用的實際 handler 不再重複過濾
+    records = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    _listeners[key] = (records, handlers, listener)
+    return logging.handlers.QueueHandler(records)
+
+
+def _direct_handlers(log_file: Optional[str], format_string: str) -> List[logging.Handler]:
+    """子進程使用的一般 handler（相同 (日誌檔案, 格式) 共用，不緩衝）"""
+    key = (log_file or '', format_string)
+    if key not in _worker_handlers:
+        _worker_handlers[key] = _build_handlers(log_file, format_string, buffered=False)
+    return _worker_handlers[key]
+
+
+def init_worker_logging():
+    """
+    進程池的 initializer
+    
+    子進程以 os._exit 結束，不執行 atexit，背景執行緒與佇列中的記錄會遺失；
+    因此子進程不使用 QueueHandler：匯入模組時已建立的日誌器改為直接寫入的一般 handler，
+    之後由 setup_logger 建立的日誌器也直接使用一般 handler
+    """
+    global _worker_process
+    _worker_process = True
+    
+    keys_by_queue = {id(records): key for key, (records, _, _) in _listeners.items()}
+    for logger in _queued_loggers:
+        for queue_handler in list(logger.handlers):
+            key = keys_by_queue.get(id(getattr(queue_handler, 'queue', None)))
+            if key is None:
+                continue
+            logger.removeHandler(queue_handler)
+            for handler in _direct_handlers(key[0] or None, key[1]):
+                logger.addHandler(handler)
+    _queued_loggers.clear()
+    
+    # 停止本進程匯入時啟動的背景執行緒，寫出佇列中剩餘的記錄
+    for _, handlers, listener in _listeners.values():
+        atexit.unregister(listener.stop)
+        listener.stop()
+        for handler in handlers:
+            handler.close()
+    _listeners.clear()
+
+
 def setup_logger(
     name: str, 
     level: str = None, 
@@ -30,45 +219,35 @@ def setup_logger(
     Returns:
         配置好的日誌器
     """
-    # 獲取配置
-    logging_config = config_manager.get_logging_config()
-    
     # 設定預設值
+    default_level, default_file, default_format = _logging_defaults()
     if level is None:
-        level = logging_config.get('level', 'INFO')
+        level = default_level
     if log_file is None:
-        log_file = logging_config.get('file', 'trading_system.log')
+        log_file = default_file
     if format_string is None:
-        format_string = logging_config.get('format', 
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        format_string = default_format
+    level_no = _level(level)
     
     # 建立日誌器
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    logger.setLevel(level_no)
     
     # 避免重複添加handler
     if logger.handlers:
         return logger
     
-    # 建立formatter
-    formatter = logging.Formatter(format_string)
-    
-    # 建立檔案handler
-    if log_file:
-        # 確保日誌目錄存在
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(getattr(logging, level.upper()))
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+    # 進程池子進程直接寫入，不使用佇列與背景執行緒
+    if _worker_process:
+        for handler in _direct_handlers(log_file, format_string):
+            logger.addHandler(handler)
+        return logger
     
-    # 建立控制台handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, level.upper()))
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    # 以 QueueHandler 將記錄交給背景執行緒寫入檔案與控制台
+    queue_handler = _queue_handler(log_file, format_string)
+    queue_handler.setLevel(level_no)
+    logger.addHandler(queue_handler)
+    _queued_loggers.append(logger)
     
     return logger
 
@@ -94,9 +273,10 @@ def set_log_level(logger: logging.Logger, level: str):
         logger: 日誌器
         level: 日誌級別
     """
-    logger.setLevel(getattr(logging, level.upper()))
+    level_no = _level(level)
+    logger.setLevel(level_no)
     for handler in logger.handlers:
-        handler.setLevel(getattr(logging, level.upper()))
+        handler.setLevel(level_no)
 
 
 # 建立預設日誌器
@@ -5,19 +5,128 @@
 負責生成各種格式的交易信號報告
 """
 
+from collections import defaultdict
+import numpy as np
 import pandas as pd
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from ..models.signals import TurtleSignal, BNFSignal, CoiledSpringSignal
-from ..utils.logger import setup_logger
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Union
+from ..models.signals import (
+    TurtleSignal, BNFSignal, CoiledSpringSignal, SignalBatch, NAT_SIGNAL_DATE, format_signal_date
+)
+from ..utils.logger import setup_logger, ensure_dir
+from ..utils.history import load_history, append_history
 from ..core.config import config_manager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # 建立日誌器
 logger = setup_logger(__name__)
 
+# CSV報告欄位：信號類別 → (固定的 signal_type，None 表示取自信號欄位；欄位順序)
+_CSV_LAYOUTS = {
+    TurtleSignal: (None, [
+        'symbol', 'signal_type', 'signal_date', 'price', 'atr', 'unit_size', 'stop_loss_price',
+        'breakout_high', 'days_in_breakout', 'volume', 'volume_ratio', 'price_change_pct',
+        'momentum_5d', 'total_score', 'breakout_score', 'volume_score', 'momentum_score'
+    ]),
+    BNFSignal: ('bnf_buy', [
+        'symbol', 'signal_type', 'signal_date', 'price', 'ma25', 'deviation_rate', 'volume',
+        'volume_ratio', 'total_score', 'deviation_score', 'volume_score'
+    ]),
+    CoiledSpringSignal: ('coiled_spring', [
+        'symbol', 'signal_type', 'signal_date', 'price', 'volatility_10d', 'volatility_60d',
+        'ma_20_ema', 'ma_50_sma', 'ma_100_sma', 'volume_ratio', 'up_trend_strength',
+        'total_score', 'volatility_score', 'trend_score', 'volume_score'
+    ])
+}
+
+# 型別固定的欄位直接指定 dtype（成交量依資料來源可能為整數或浮點數，仍由內容推斷）
+_FLOAT_COLUMNS = [
+    'price', 'atr', 'stop_loss_price', 'breakout_high', 'volume_ratio', 'price_change_pct',
+    'momentum_5d', 'ma25', 'deviation_rate', 'volatility_10d', 'volatility_60d',
+    'ma_20_ema', 'ma_50_sma', 'ma_100_sma', 'up_trend_strength'
+]
+_INT_COLUMNS = [
+    'signal_date', 'unit_size', 'days_in_breakout', 'total_score', 'breakout_score',
+    'volume_score', 'momentum_score', 'deviation_score', 'volatility_score', 'trend_score'
+]
+_CSV_DTYPES = {
+    signal_class: {
+        col: (np.float64 if col in _FLOAT_COLUMNS else np.int64 if col in _INT_COLUMNS else object)
+        for col in columns if col not in ('volume', 'signal_type')
+    }
+    for signal_class, (_, columns) in _CSV_LAYOUTS.items()
+}
+
+# 歷史記錄與Excel報告的信號欄位（_signal_to_dict 的鍵）
+_SUMMARY_COLUMNS = ['symbol', 'signal_type', 'signal_date', 'price', 'total_score']
+
+# 摘要報告分隔線
+_RULE = "=" * 80 + "\n"
+_SUB_RULE = "-" * 40 + "\n"
+
+def _history_getter(signal_type: Optional[str]):
+    """建立歷史記錄欄位擷取函數（鍵同 _SUMMARY_COLUMNS；signal_type 為 None 時取自信號欄位）"""
+    getter = attrgetter('symbol', 'signal_date', 'price', 'total_score')
+    def extract(signal):
+        symbol, signal_date, price, total_score = getter(signal)
+        return {
+            'symbol': symbol,
+            'signal_type': signal.signal_type if signal_type is None else signal_type,
+            'signal_date': format_signal_date(signal_date),
+            'price': price,
+            'total_score': total_score
+        }
+    return extract
+
+
+# 信號類別 → (策略名稱, 歷史記錄欄位擷取函數)
+_SIGNAL_META = {
+    signal_class: (strategy_name, _history_getter(_CSV_LAYOUTS[signal_class][0]))
+    for signal_class, strategy_name in (
+        (TurtleSignal, 'turtle'), (BNFSignal, 'bnf'), (CoiledSpringSignal, 'coiled_spring')
+    )
+}
+_UNKNOWN_META = ('unknown', lambda signal: {})
+
+
+def _top_indices(scores: np.ndarray, k: int) -> List[int]:
+    """
+    評分最高的 k 個位置（同分時保留原順序，與 heapq.nlargest 相同）
+    
+    以 np.partition 取得第 k 高的門檻，只對門檻以上的候選排序
+    """
+    if len(scores) > k:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.argsort(-scores[candidates], kind='stable')[:k]
+    return candidates[order].tolist()
+
 
 class ReportGenerator:
     """報告生成器"""
@@ -31,92 +140,123 @@ class ReportGenerator:
             self.output_dir = Path(output_dir)
         
         # 確保輸出目錄存在
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(str(self.output_dir))
+        
+        # batch() 期間固定的報告日期
+        self._batch_date = None
         
         logger.info(f"報告生成器初始化完成，輸出目錄: {self.output_dir}")
     
-    def generate_csv_report(self, signals: List, strategy_name: str, date: str = None) -> str:
+    @contextmanager
+    def batch(self):
         """
-        生成CSV格式報告
+        固定一批報告的日期
+        
+        區塊內未指定日期的報告與歷史記錄都使用進入區塊時的日期，
+        跨午夜生成的檔案不會分屬不同日期
+        
+        Yields:
+            本批次的日期字串 (YYYY-MM-DD)
+        """
+        self._batch_date = datetime.now().strftime('%Y-%m-%d')
+        try:
+            yield self._batch_date
+        finally:
+            self._batch_date = None
+    
+    def _today(self) -> str:
+        """報告日期：batch() 期間為批次日期，否則為今天"""
+        return self._batch_date or datetime.now().strftime('%Y-%m-%d')
+    
+    def signals_to_dataframe(self, signals: List) -> pd.DataFrame:
+        """
+        將信號列表轉換為CSV報告用的DataFrame
+        
+        依信號類別分組後各轉換為 SignalBatch，由欄位陣列直接建立DataFrame，
+        不再逐筆組成字典。
         
         Args:
             signals: 信號列表
+        
+        Returns:
+            報告欄位順序的DataFrame
+        """
+        # 一次掃描依信號類別分組，不逐類別重複 isinstance 檢查
+        positions_by_type = defaultdict(list)
+        for i, signal in enumerate(signals):
+            positions_by_type[type(signal)].append(i)
+        
+        frames = []
+        for signal_class in _CSV_LAYOUTS:
+            positions = positions_by_type.get(signal_class)
+            if not positions:
+                continue
+            batch = SignalBatch.from_objects([signals[i] for i in positions], _CSV_DTYPES[signal_class])
+            frames.append(self.batch_to_dataframe(batch).set_axis(positions))
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        df = frames[0] if len(frames) == 1 else pd.concat(frames).sort_index()
+        return df.reset_index(drop=True)
+    
+    @staticmethod
+    def batch_to_dataframe(batch: SignalBatch) -> pd.DataFrame:
+        """
+        將信號批次轉換為CSV報告用的DataFrame（欄位陣列直接組成，日期以向量化方式格式化）
+        
+        Args:
+            batch: 信號批次
+        
+        Returns:
+            報告欄位順序的DataFrame
+        """
+        signal_type, columns = _CSV_LAYOUTS[batch.signal_class]
+        df = pd.DataFrame({col: batch.columns[col] for col in columns
+                           if col != 'signal_type' or signal_type is None})
+        if signal_type is not None:
+            df['signal_type'] = signal_type
+        df['signal_date'] = pd.to_datetime(df['signal_date']).dt.strftime('%Y-%m-%d')
+        return df[columns]
+    
+    def generate_csv_report(self, signals: Union[List, SignalBatch, pd.DataFrame], strategy_name: str,
+                            date: str = None) -> str:
+        """
+        生成CSV格式報告
+        
+        Args:
+            signals: 信號列表、信號批次，或已由 signals_to_dataframe 轉換的DataFrame
             strategy_name: 策略名稱
             date: 報告日期
         
         Returns:
             生成的檔案路徑
         """
-        if not signals:
+        if len(signals) == 0:
             logger.warning(f"沒有 {strategy_name} 信號可生成報告")
             return None
         
         if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+            date = self._today()
         
         filename = f"{strategy_name}_signals_{date}.csv"
         filepath = self.output_dir / filename
         
         try:
-            # 將信號轉換為DataFrame
-            signal_data = []
-            for signal in signals:
-                if isinstance(signal, TurtleSignal):
-                    signal_data.append({
-                        'symbol': signal.symbol,
-                        'signal_type': signal.signal_type,
-                        'signal_date': signal.signal_date,
-                        'price': signal.price,
-                        'atr': signal.atr,
-                        'unit_size': signal.unit_size,
-                        'stop_loss_price': signal.stop_loss_price,
-                        'breakout_high': signal.breakout_high,
-                        'days_in_breakout': signal.days_in_breakout,
-                        'volume': signal.volume,
-                        'volume_ratio': signal.volume_ratio,
-                        'price_change_pct': signal.price_change_pct,
-                        'momentum_5d': signal.momentum_5d,
-                        'total_score': signal.total_score,
-                        'breakout_score': signal.breakout_score,
-                        'volume_score': signal.volume_score,
-                        'momentum_score': signal.momentum_score
-                    })
-                elif isinstance(signal, BNFSignal):
-                    signal_data.append({
-                        'symbol': signal.symbol,
-                        'signal_type': 'bnf_buy',
-                        'signal_date': signal.signal_date,
-                        'price': signal.price,
-                        'ma25': signal.ma25,
-                        'deviation_rate': signal.deviation_rate,
-                        'volume': signal.volume,
-                        'volume_ratio': signal.volume_ratio,
-                        'total_score': signal.total_score,
-                        'deviation_score': signal.deviation_score,
-                        'volume_score': signal.volume_score
-                    })
-                elif isinstance(signal, CoiledSpringSignal):
-                    signal_data.append({
-                        'symbol': signal.symbol,
-                        'signal_type': 'coiled_spring',
-                        'signal_date': signal.signal_date,
-                        'price': signal.price,
-                        'volatility_10d': signal.volatility_10d,
-                        'volatility_60d': signal.volatility_60d,
-                        'ma_20_ema': signal.ma_20_ema,
-                        'ma_50_sma': signal.ma_50_sma,
-                        'ma_100_sma': signal.ma_100_sma,
-                        'volume_ratio': signal.volume_ratio,
-                        'up_trend_strength': signal.up_trend_strength,
-                        'total_score': signal.total_score,
-                        'volatility_score': signal.volatility_score,
-                        'trend_score': signal.trend_score,
-                        'volume_score': signal.volume_score
-                    })
-            
-            # 創建DataFrame並保存
-            df = pd.DataFrame(signal_data)
-            df.to_csv(filepath, index=False, encoding='utf-8')
+            # 所有輸入都經由 _write_rows 寫出，引號、浮點數與缺失值的格式一致
+            if isinstance(signals, SignalBatch):
+                # 欄位陣列直接逐列寫出，不經過DataFrame
+                self._write_batch_rows(signals, filepath)
+            elif isinstance(signals, pd.DataFrame):
+                self._write_frame_rows(signals, filepath)
+            else:
+                layout = self._single_layout(signals)
+                if layout is not None:
+                    # 單一策略的信號列表直接逐列寫出，不建立DataFrame
+                    self._write_signal_rows(signals, layout, filepath)
+                else:
+                    # 混合策略時先將信號轉換為DataFrame
+                    self._write_frame_rows(self.signals_to_dataframe(signals), filepath)
             
             logger.info(f"CSV報告已生成: {filepath} ({len(signals)} 個信號)")
             return str(filepath)
@@ -125,10 +265,107 @@ class ReportGenerator:
             logger.error(f"生成CSV報告錯誤: {e}")
             return None
     
+    def generate_csv_reports(self, all_signals: Dict[str, List], date: str = None,
+                             prefix: str = '') -> Dict[str, str]:
+        """
+        生成所有策略的CSV報告
+        
+        各策略寫入不同檔案、互不相依，以執行緒池同時寫出，檔案I/O期間不互相等待
+        
+        Args:
+            all_signals: 所有策略的信號字典
+            date: 報告日期
+            prefix: 報告名稱前綴（例如 'crypto_'）
+        
+        Returns:
+            策略名稱 → 生成的檔案路徑
+        """
+        items = [(strategy_name, signals) for strategy_name, signals in all_signals.items() if len(signals)]
+        if not items:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(items)) as executor:
+            paths = list(executor.map(
+                lambda item: self.generate_csv_report(item[1], f"{prefix}{item[0]}", date), items
+            ))
+        return {strategy_name: path for (strategy_name, _), path in zip(items, paths)}
+    
+    @staticmethod
+    def _single_layout(signals: List):
+        """所有信號同屬一個類別時回傳其 CSV 欄位配置，否則回傳 None"""
+        signal_class = type(signals[0])
+        if signal_class not in _CSV_LAYOUTS:
+            return None
+        if any(type(signal) is not signal_class for signal in signals):
+            return None
+        return _CSV_LAYOUTS[signal_class]
+    
+    @staticmethod
+    def _write_rows(columns: List[str], rows, filepath: Path):
+        """
+        以 csv.writer 寫出CSV報告（所有CSV報告共用的寫出方式）
+        
+        只在必要時加引號，浮點數以 Python 的最短表示輸出，NaN 與 None 寫為空字串，
+        換行為 '\n'（與 pandas to_csv 的預設輸出相同）
+        """
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+            writer.writerows(['' if value != value else value for value in row] for row in rows)
+    
+    @classmethod
+    def _write_signal_rows(cls, signals: List, layout, filepath: Path):
+        """
+        寫出單一類別的信號列表
+        
+        欄位以 attrgetter 一次取出，日期格式化為 YYYY-MM-DD
+        """
+        signal_type, columns = layout
+        fields = [col for col in columns if col != 'signal_type' or signal_type is None]
+        getter = attrgetter(*fields)
+        date_pos = fields.index('signal_date')
+        type_pos = columns.index('signal_type') if signal_type is not None else None
+        
+        def rows():
+            for values in map(getter, signals):
+                row = list(values)
+                row[date_pos] = format_signal_date(row[date_pos])
+                if type_pos is not None:
+                    row.insert(type_pos, signal_type)
+                yield row
+        
+        cls._write_rows(columns, rows(), filepath)
+    
+    @classmethod
+    def _write_batch_rows(cls, batch: SignalBatch, filepath: Path):
+        """寫出信號批次（日期以向量化方式格式化，各欄位以 tolist 轉為 Python 純量後逐列寫出）"""
+        signal_type, columns = _CSV_LAYOUTS[batch.signal_class]
+        data = []
+        for col in columns:
+            if col == 'signal_type' and signal_type is not None:
+                data.append([signal_type] * len(batch))
+            elif col == 'signal_date':
+                # epoch 奈秒 → 'YYYY-MM-DD'，NaT 與 format_signal_date 相同寫為空字串
+                epoch = batch.columns[col]
+                dates = epoch.astype('datetime64[ns]').astype('datetime64[D]').astype(str)
+                data.append(np.where(epoch == NAT_SIGNAL_DATE, '', dates).tolist())
+            else:
+                data.append(batch.columns[col].tolist())
+        cls._write_rows(columns, zip(*data), filepath)
+    
+    @classmethod
+    def _write_frame_rows(cls, df: pd.DataFrame, filepath: Path):
+        """寫出已轉換為報告欄位的DataFrame（缺失值先換成空字串，數值轉為 Python 純量）"""
+        values = df.astype(object).where(df.notna(), '')
+        cls._write_rows(list(df.columns), values.itertuples(index=False, name=None), filepath)
+    
     def generate_summary_report(self, all_signals: Dict[str, List], date: str = None) -> str:
         """
         生成綜合摘要報告
         
+        先計算各策略統計並保存為 summary_{date}.jsonl，再由統計結果產生文字報告；
+        之後可由 render_summary_report 直接從統計檔重新產生，不需原始信號
+        
         Args:
             all_signals: 所有策略的信號字典
             date: 報告日期
@@ -137,50 +374,24 @@ class ReportGenerator:
             生成的檔案路徑
         """
         if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+            date = self._today()
         
         filename = f"summary_report_{date}.txt"
         filepath = self.output_dir / filename
         
         try:
+            stats = self._compute_summary(all_signals, date)
+            
+            # 保存統計結果（單行 JSON）
+            if ORJSON_AVAILABLE:
+                line = orjson.dumps(stats, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                line = json.dumps(stats, ensure_ascii=False).encode('utf-8')
+            with open(self._summary_stats_path(date), 'wb') as f:
+                f.write(line + b'\n')
+            
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("=" * 80 + "\n")
-                f.write(f"多策略交易信號摘要報告 - {date}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                total_signals = 0
-                for strategy_name, signals in all_signals.items():
-                    signal_count = len(signals)
-                    total_signals += signal_count
-                    
-                    f.write(f"策略: {strategy_name}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(f"信號數量: {signal_count}\n")
-                    
-                    if signals:
-                        # 計算平均評分
-                        scores = [s.total_score for s in signals if hasattr(s, 'total_score')]
-                        avg_score = sum(scores) / len(scores) if scores else 0
-                        f.write(f"平均評分: {avg_score:.2f}\n")
-                        
-                        # 高品質信號數量
-                        high_quality = len([s for s in scores if s >= 70])
-                        f.write(f"高品質信號: {high_quality}\n")
-                        
-                        # 列出前5個信號
-                        f.write("前5個信號:\n")
-                        sorted_signals = sorted(signals, key=lambda x: getattr(x, 'total_score', 0), reverse=True)
-                        for i, signal in enumerate(sorted_signals[:5]):
-                            f.write(f"  {i+1}. {signal.symbol} - 評分: {getattr(signal, 'total_score', 0):.1f}\n")
-                    else:
-                        f.write("無信號\n")
-                    
-                    f.write("\n")
-                
-                f.write("=" * 80 + "\n")
-                f.write(f"總信號數量: {total_signals}\n")
-                f.write(f"報告生成時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 80 + "\n")
+                f.write(self._render_summary_text(stats))
             
             logger.info(f"摘要報告已生成: {filepath}")
             return str(filepath)
@@ -189,10 +400,103 @@ class ReportGenerator:
             logger.error(f"生成摘要報告錯誤: {e}")
             return None
     
+    def render_summary_report(self, date: str) -> Optional[str]:
+        """
+        由已保存的統計檔產生摘要報告文字
+        
+        Args:
+            date: 報告日期
+        
+        Returns:
+            報告文字，統計檔不存在或讀取失敗時為 None
+        """
+        stats_path = self._summary_stats_path(date)
+        try:
+            if not stats_path.exists():
+                return None
+            loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+            with open(stats_path, 'rb') as f:
+                return self._render_summary_text(loads(f.readline()))
+        except Exception as e:
+            logger.error(f"載入摘要統計錯誤: {e}")
+            return None
+    
+    def _summary_stats_path(self, date: str) -> Path:
+        return self.output_dir / f"summary_{date}.jsonl"
+    
+    @staticmethod
+    def _compute_summary(all_signals: Dict[str, List], date: str) -> Dict[str, Any]:
+        """
+        計算各策略的信號統計
+        
+        評分一次取出為陣列，平均、高品質數量與前5名皆以向量運算取得
+        
+        Returns:
+            {date, generated_at, total_signals, strategies: [{strategy, signal_count, avg_score,
+             high_quality, top: [[代碼, 評分], ...]}]}
+        """
+        strategies = []
+        total_signals = 0
+        for strategy_name, signals in all_signals.items():
+            signal_count = len(signals)
+            total_signals += signal_count
+            entry = {'strategy': strategy_name, 'signal_count': signal_count}
+            
+            if signals:
+                scores = np.fromiter((s.total_score for s in signals),
+                                     dtype=np.float64, count=signal_count)
+                entry['avg_score'] = float(scores.mean())
+                entry['high_quality'] = int(np.count_nonzero(scores >= 70))
+                entry['top'] = [[signals[index].symbol, float(scores[index])]
+                                for index in _top_indices(scores, 5)]
+            strategies.append(entry)
+        
+        return {
+            'date': date,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'total_signals': total_signals,
+            'strategies': strategies
+        }
+    
+    @staticmethod
+    def _render_summary_text(stats: Dict[str, Any]) -> str:
+        """將 _compute_summary 的統計結果排版為文字報告"""
+        parts = [_RULE, f"多策略交易信號摘要報告 - {stats['date']}\n", _RULE, "\n"]
+        
+        for entry in stats['strategies']:
+            parts.append(f"策略: {entry['strategy']}\n")
+            parts.append(_SUB_RULE)
+            parts.append(f"信號數量: {entry['signal_count']}\n")
+            
+            if entry['signal_count']:
+                parts.append(f"平均評分: {entry['avg_score']:.2f}\n")
+                parts.append(f"高品質信號: {entry['high_quality']}\n")
+                
+                # 列出前5個信號
+                parts.append("前5個信號:\n")
+                for i, (symbol, score) in enumerate(entry['top']):
+                    parts.append(f"  {i+1}. {symbol} - 評分: {score:.1f}\n")
+            else:
+                parts.append("無信號\n")
+            
+            parts.append("\n")
+        
+        parts.append(_RULE)
+        parts.append(f"總信號數量: {stats['total_signals']}\n")
+        parts.append(f"報告生成時間: {stats['generated_at']}\n")
+        parts.append(_RULE)
+        return ''.join(parts)
+    
+    def _history_file(self, history_file: str = None) -> Path:
+        """歷史檔案路徑（預設為輸出目錄下的 signals_history.jsonl）"""
+        return Path(history_file) if history_file is not None else self.output_dir / "signals_history.jsonl"
+    
     def save_signal_history(self, signals: List, history_file: str = None) -> bool:
         """
         保存信號歷史記錄
         
+        歷史檔案為 JSONL 格式，每次只附加一行 {日期: {策略: [信號...]}}，不重寫既有記錄
+        
         Args:
             signals: 信號列表
             history_file: 歷史檔案路徑
@@ -200,68 +504,40 @@ class ReportGenerator:
         Returns:
             是否成功
         """
-        if history_file is None:
-            history_file = self.output_dir / "signals_history.json"
-        else:
-            history_file = Path(history_file)
+        if not signals:
+            return True
         
         try:
-            # 載入現有歷史記錄
-            history = {}
-            if history_file.exists():
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # 添加新信號
-            current_date = datetime.now().strftime('%Y-%m-%d')
-            if current_date not in history:
-                history[current_date] = {}
-            
             # 按策略分組信號
+            day_record = {}
             for signal in signals:
-                strategy_name = self._get_strategy_name(signal)
-                if strategy_name not in history[current_date]:
-                    history[current_date][strategy_name] = []
-                
-                # 轉換信號為字典
-                signal_dict = self._signal_to_dict(signal)
-                history[current_date][strategy_name].append(signal_dict)
+                # 一次查表同時取得策略名稱與欄位擷取器
+                strategy_name, extract = _SIGNAL_META.get(type(signal), _UNKNOWN_META)
+                day_record.setdefault(strategy_name, []).append(extract(signal))
             
-            # 保存歷史記錄
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"信號歷史記錄已保存: {history_file}")
+            path = append_history(self._history_file(history_file), self._today(), day_record)
+            logger.info(f"信號歷史記錄已保存: {path}")
             return True
             
         except Exception as e:
             logger.error(f"保存信號歷史記錄錯誤: {e}")
             return False
     
-    def load_signal_history(self, history_file: str = None) -> Dict[str, Any]:
+    def load_signal_history(self, history_file: str = None, days: Optional[int] = None) -> Dict[str, Any]:
         """
         載入信號歷史記錄
         
+        與篩選器使用相同的讀取規則：先合併舊版 JSON 檔案，再依序合併 JSONL 各行，
+        同一日期同一策略以較晚的記錄為準
+        
         Args:
             history_file: 歷史檔案路徑
+            days: 只保留最近的日期數，None 表示全部
         
         Returns:
             歷史記錄字典
         """
-        if history_file is None:
-            history_file = self.output_dir / "signals_history.json"
-        else:
-            history_file = Path(history_file)
-        
-        try:
-            if history_file.exists():
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except Exception as e:
-            logger.error(f"載入信號歷史記錄錯誤: {e}")
-            return {}
+        return load_history(self._history_file(history_file), days)
     
     def generate_performance_report(self, history_file: str = None, days: int = 30) -> str:
         """
@@ -274,11 +550,8 @@ class ReportGenerator:
         Returns:
             生成的檔案路徑
         """
-        if history_file is None:
-            history_file = self.output_dir / "signals_history.json"
-        
         try:
-            history = self.load_signal_history(history_file)
+            history = self.load_signal_history(history_file, days=days)
             if not history:
                 logger.warning("沒有歷史記錄可分析")
                 return None
@@ -286,7 +559,7 @@ class ReportGenerator:
             # 分析最近N天的數據
             recent_dates = sorted(history.keys())[-days:]
             
-            filename = f"performance_report_{datetime.now().strftime('%Y-%m-%d')}.txt"
+            filename = f"performance_report_{self._today()}.txt"
             filepath = self.output_dir / filename
             
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -319,43 +592,50 @@ class ReportGenerator:
     
     def _get_strategy_name(self, signal) -> str:
         """獲取信號對應的策略名稱"""
-        if isinstance(signal, TurtleSignal):
-            return 'turtle'
-        elif isinstance(signal, BNFSignal):
-            return 'bnf'
-        elif isinstance(signal, CoiledSpringSignal):
-            return 'coiled_spring'
-        else:
-            return 'unknown'
+        return _SIGNAL_META.get(type(signal), _UNKNOWN_META)[0]
     
     def _signal_to_dict(self, signal) -> Dict[str, Any]:
-        """將信號物件轉換為字典"""
-        if isinstance(signal, TurtleSignal):
-            return {
-                'symbol': signal.symbol,
-                'signal_type': signal.signal_type,
-                'signal_date': signal.signal_date,
-                'price': signal.price,
-                'total_score': signal.total_score
-            }
-        elif isinstance(signal, BNFSignal):
-            return {
-                'symbol': signal.symbol,
-                'signal_type': 'bnf_buy',
-                'signal_date': signal.signal_date,
-                'price': signal.price,
-                'total_score': signal.total_score
-            }
-        elif isinstance(signal, CoiledSpringSignal):
-            return {
-                'symbol': signal.symbol,
-                'signal_type': 'coiled_spring',
-                'signal_date': signal.signal_date,
-                'price': signal.price,
-                'total_score': signal.total_score
-            }
-        else:
-            return {}
+        """將信號物件轉換為字典（signal_type 依 _CSV_LAYOUTS 取固定值或信號欄位）"""
+        return _SIGNAL_META.get(type(signal), _UNKNOWN_META)[1](signal)
+    
+    def export_to_parquet(self, all_signals: Dict[str, List], name: str = None) -> str:
+        """
+        導出為 Parquet 資料集（需安裝 pyarrow）
+        
+        依策略分割為 {name}/strategy={策略}/signals.parquet，欄位與CSV報告相同，以 zstd 壓縮
+        
+        Args:
+            all_signals: 所有策略的信號字典
+            name: 資料集目錄名稱，預設為 signals_{日期}
+        
+        Returns:
+            資料集目錄路徑
+        """
+        if not PYARROW_AVAILABLE:
+            logger.error("pyarrow 未安裝，無法導出 Parquet")
+            return None
+        
+        if name is None:
+            name = f"signals_{self._today()}"
+        
+        dataset_dir = self.output_dir / name
+        
+        try:
+            for strategy_name, signals in all_signals.items():
+                if not signals:
+                    continue
+                df = signals if isinstance(signals, pd.DataFrame) else self.signals_to_dataframe(signals)
+                partition_dir = dataset_dir / f"strategy={strategy_name}"
+                ensure_dir(str(partition_dir))
+                pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                               str(partition_dir / "signals.parquet"), compression='zstd')
+            
+            logger.info(f"Parquet報告已生成: {dataset_dir}")
+            return str(dataset_dir)
+            
+        except Exception as e:
+            logger.error(f"生成Parquet報告錯誤: {e}")
+            return None
     
     def export_to_excel(self, all_signals: Dict[str, List], filename: str = None) -> str:
         """
@@ -369,11 +649,21 @@ class ReportGenerator:
             生成的檔案路徑
         """
         if filename is None:
-            filename = f"trading_signals_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+            filename = f"trading_signals_{self._today()}.xlsx"
+        
+        # Parquet 資料集請改用 export_to_parquet，不以副檔名暗中切換輸出格式
+        if Path(filename).suffix == '.parquet':
+            logger.error(f"export_to_excel 不支援 Parquet 檔名: {filename}，請使用 export_to_parquet")
+            return None
         
         filepath = self.output_dir / filename
         
         try:
+            if XLSXWRITER_AVAILABLE:
+                self._write_excel_rows(all_signals, filepath)
+                logger.info(f"Excel報告已生成: {filepath}")
+                return str(filepath)
+            
             with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
                 for strategy_name, signals in all_signals.items():
                     if signals:
@@ -391,3 +681,26 @@ class ReportGenerator:
         except Exception as e:
             logger.error(f"生成Excel報告錯誤: {e}")
             return None
+    
+    def _write_excel_rows(self, all_signals: Dict[str, List], filepath: Path):
+        """
+        以 xlsxwriter 逐列寫出Excel（每個策略一個工作表）
+        
+        constant_memory 模式下每列寫完即輸出到暫存檔，記憶體用量與信號數量無關；
+        此模式只能依列順序寫入，因此直接逐列寫出，不經過 pandas（pandas 依欄寫入）
+        """
+        workbook = xlsxwriter.Workbook(str(filepath), {'constant_memory': True, 'nan_inf_to_errors': True})
+        try:
+            for strategy_name, signals in all_signals.items():
+                if not signals:
+                    continue
+                worksheet = workbook.add_worksheet(strategy_name)
+                worksheet.write_row(0, 0, _SUMMARY_COLUMNS)
+                row = 1
+                for signal in signals:
+                    record = self._signal_to_dict(signal)
+                    if record:
+                        worksheet.write_row(row, 0, [record[col] for col in _SUMMARY_COLUMNS])
+                        row += 1
+        finally:
+            workbook.close()
@@ -7,67 +7,180 @@
 
 import pandas as pd
 import numpy as np
+from operator import attrgetter
 from typing import Dict, List, Any, Tuple, Optional
+from ..models.signals import NAT_SIGNAL_DATE
+from ..utils.jit_indicators import consistency_counts
 from ..utils.logger import setup_logger
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
 # 建立日誌器
 logger = setup_logger(__name__)
 
 
-def validate_price_data(data: pd.DataFrame) -> bool:
+_OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+_OHLCV_SET = frozenset(_OHLCV_COLUMNS)
+
+
+def _ohlcv_array(data: pd.DataFrame) -> Optional[np.ndarray]:
+    """OHLCV 欄位齊全且皆為數值型別時一次取出為 (列數, 5) 的 float64 陣列，否則為 None"""
+    if not all(col in data.columns and pd.api.types.is_numeric_dtype(data[col].dtype)
+               for col in _OHLCV_COLUMNS):
+        return None
+    return data[_OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def _column_array(data: pd.DataFrame, column: str, ohlcv: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """取出欄位的 float64 陣列（已有 OHLCV 陣列時直接取其欄），欄位不存在時為 None"""
+    if ohlcv is not None and column in _OHLCV_COLUMNS:
+        return ohlcv[:, _OHLCV_COLUMNS.index(column)]
+    if column not in data.columns:
+        return None
+    return data[column].to_numpy(dtype=np.float64)
+
+
+def _validate_price_arrow(table: 'pa.Table') -> bool:
+    """
+    以 pyarrow.compute 驗證 Arrow 表格的價格資料（檢查項目與 validate_price_data 相同）
+    
+    與 NumPy 版本一致，缺失值不視為非正值；any 對全為缺失值的欄位回傳 None，視為通過
+    """
+    if table.num_rows == 0:
+        logger.warning("資料為空")
+        return False
+    
+    if not _OHLCV_SET.issubset(table.column_names):
+        missing_columns = [col for col in _OHLCV_COLUMNS if col not in table.column_names]
+        logger.warning(f"缺少必要欄位: {missing_columns}")
+        return False
+    
+    for col in _OHLCV_COLUMNS:
+        column_type = table.schema.field(col).type
+        if not (pa.types.is_integer(column_type) or pa.types.is_floating(column_type)):
+            logger.warning(f"資料類型錯誤: 欄位 {col} 為 {column_type}")
+            return False
+    
+    # 檢查價格合理性
+    if any(pc.any(pc.less_equal(table[col], 0)).as_py() for col in ['Open', 'High', 'Low', 'Close']):
+        logger.warning("價格資料包含非正值")
+        return False
+    
+    # 檢查High >= Low
+    if pc.any(pc.less(table['High'], table['Low'])).as_py():
+        logger.warning("High < Low 的資料存在")
+        return False
+    
+    # 檢查Volume >= 0
+    if pc.any(pc.less(table['Volume'], 0)).as_py():
+        logger.warning("成交量包含負值")
+        return False
+    
+    return True
+
+
+def validate_price_data(data: pd.DataFrame, ohlcv: Optional[np.ndarray] = None) -> bool:
     """
     驗證價格資料完整性
     
+    Arrow 表格與 Polars DataFrame 直接以 pyarrow.compute 檢查，不轉換為 pandas
+    
     Args:
-        data: 股票資料 DataFrame
+        data: 股票資料 DataFrame（或 pyarrow.Table / polars.DataFrame）
+        ohlcv: 已由 validate_all 取出的 OHLCV 陣列，為 None 時自行取出
     
     Returns:
         是否有效
     """
+    if POLARS_AVAILABLE and isinstance(data, pl.DataFrame):
+        data = data.to_arrow()
+    if PYARROW_AVAILABLE and isinstance(data, pa.Table):
+        return _validate_price_arrow(data)
+    
     if data.empty:
         logger.warning("資料為空")
         return False
     
     # 檢查必要欄位
-    required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-    missing_columns = [col for col in required_columns if col not in data.columns]
-    if missing_columns:
+    required_columns = _OHLCV_COLUMNS
+    # 以集合一次判斷；有缺少時才依原順序列出缺少的欄位
+    if not _OHLCV_SET.issubset(data.columns):
+        missing_columns = [col for col in required_columns if col not in data.columns]
         logger.warning(f"缺少必要欄位: {missing_columns}")
         return False
     
-    # 檢查資料類型
+    # 檢查資料類型（數值型別的欄位只檢查 dtype；其餘欄位轉換一次，結果直接用於後續檢查）
+    converted = {}
     try:
-        for col in ['Open', 'High', 'Low', 'Close']:
-            pd.to_numeric(data[col], errors='raise')
-        pd.to_numeric(data['Volume'], errors='raise')
+        for col in required_columns:
+            if not pd.api.types.is_numeric_dtype(data[col].dtype):
+                converted[col] = pd.to_numeric(data[col], errors='raise').to_numpy(dtype=np.float64)
     except (ValueError, TypeError) as e:
         logger.warning(f"資料類型錯誤: {e}")
         return False
     
+    # OHLCV 欄位一次取出為陣列，以單次 NumPy 歸約檢查
+    if ohlcv is None:
+        if converted:
+            ohlcv = np.column_stack([converted[col] if col in converted else data[col].to_numpy(dtype=np.float64)
+                                     for col in required_columns])
+        else:
+            ohlcv = data[required_columns].to_numpy(dtype=np.float64)
+    ohlc = ohlcv[:, :4]
+    
     # 檢查價格合理性
-    if (data[['Open', 'High', 'Low', 'Close']] <= 0).any().any():
+    if (ohlc <= 0).any():
         logger.warning("價格資料包含非正值")
         return False
     
     # 檢查High >= Low
-    if (data['High'] < data['Low']).any():
+    if np.any(ohlc[:, 1] < ohlc[:, 2]):
         logger.warning("High < Low 的資料存在")
         return False
     
     # 檢查Volume >= 0
-    if (data['Volume'] < 0).any():
+    if np.any(ohlcv[:, 4] < 0):
         logger.warning("成交量包含負值")
         return False
     
     return True
 
 
-def check_data_quality(data: pd.DataFrame) -> Dict[str, Any]:
+def _column_stats(values: Optional[np.ndarray]) -> Tuple[float, float, float]:
+    """欄位的 (最小值, 最大值, 平均值)，欄位不存在時為 0"""
+    if values is None:
+        return 0, 0, 0
+    return np.nanmin(values), np.nanmax(values), np.nanmean(values)
+
+
+def _is_non_decreasing(column: pd.Series) -> bool:
+    """欄位是否遞增（日期與數值欄位直接以底層陣列相鄰差判斷，其他型別交由 pandas）"""
+    values = column.to_numpy()
+    if values.dtype.kind == 'M':
+        values = values.view('i8')
+    elif values.dtype.kind not in 'iuf':
+        return column.is_monotonic_increasing
+    return bool(np.all(np.diff(values) >= 0))
+
+
+def check_data_quality(data: pd.DataFrame, ohlcv: Optional[np.ndarray] = None) -> Dict[str, Any]:
     """
     檢查資料品質
     
     Args:
         data: 股票資料 DataFrame
+        ohlcv: 已由 validate_all 取出的 OHLCV 陣列，為 None 時自行取出所需欄位
     
     Returns:
         資料品質報告
@@ -83,38 +196,40 @@ def check_data_quality(data: pd.DataFrame) -> Dict[str, Any]:
     
     try:
         # 檢查缺失值
-        for column in data.columns:
-            missing_count = data[column].isna().sum()
+        missing_counts = np.count_nonzero(data.isna().to_numpy(), axis=0)
+        for column, missing_count in zip(data.columns, missing_counts):
             if missing_count > 0:
-                quality_report['missing_values'][column] = missing_count
+                quality_report['missing_values'][column] = int(missing_count)
                 quality_report['data_issues'].append(f"欄位 {column} 有 {missing_count} 個缺失值")
         
         # 檢查重複記錄
-        duplicate_count = data.duplicated().sum()
+        duplicate_count = int(np.count_nonzero(data.duplicated().to_numpy()))
         if duplicate_count > 0:
             quality_report['data_issues'].append(f"有 {duplicate_count} 筆重複記錄")
         
         # 檢查日期順序
         if 'Date' in data.columns:
-            if not data['Date'].is_monotonic_increasing:
+            if not _is_non_decreasing(data['Date']):
                 quality_report['data_issues'].append("日期順序不正確")
         
-        # 統計資訊
+        # 統計資訊（各欄位只取出一次陣列，與 pandas 相同略過缺失值）
         if not data.empty:
+            close_stats = _column_stats(_column_array(data, 'Close', ohlcv))
+            volume_stats = _column_stats(_column_array(data, 'Volume', ohlcv))
             quality_report['statistics'] = {
                 'date_range': {
                     'start': str(data.index.min()) if hasattr(data.index, 'min') else 'N/A',
                     'end': str(data.index.max()) if hasattr(data.index, 'max') else 'N/A'
                 },
                 'price_range': {
-                    'min_close': float(data['Close'].min()) if 'Close' in data.columns else 0,
-                    'max_close': float(data['Close'].max()) if 'Close' in data.columns else 0,
-                    'avg_close': float(data['Close'].mean()) if 'Close' in data.columns else 0
+                    'min_close': float(close_stats[0]),
+                    'max_close': float(close_stats[1]),
+                    'avg_close': float(close_stats[2])
                 },
                 'volume_stats': {
-                    'min_volume': int(data['Volume'].min()) if 'Volume' in data.columns else 0,
-                    'max_volume': int(data['Volume'].max()) if 'Volume' in data.columns else 0,
-                    'avg_volume': int(data['Volume'].mean()) if 'Volume' in data.columns else 0
+                    'min_volume': int(volume_stats[0]),
+                    'max_volume': int(volume_stats[1]),
+                    'avg_volume': int(volume_stats[2])
                 }
             }
         
@@ -141,6 +256,64 @@ def check_data_quality(data: pd.DataFrame) -> Dict[str, Any]:
         return quality_report
 
 
+# validate_trading_signals 讀取的信號屬性
+_VALIDATED_ATTRIBUTES = ('symbol', 'signal_date', 'price', 'total_score', 'atr', 'deviation_rate', 'volatility_10d')
+
+
+def _signal_attributes(signals: List) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    取出各信號的驗證屬性
+    
+    依類別分組，每個類別只以 hasattr 判斷一次具備哪些屬性（同一類別的信號屬性相同），
+    再以 attrgetter 一次取出該組所有屬性；__slots__ 信號沒有 __dict__，因此不使用 vars()
+    
+    Returns:
+        屬性名稱 → (是否具備, 屬性值 object 陣列，缺少時為 None)
+    """
+    n = len(signals)
+    attributes = {name: (np.zeros(n, dtype=bool), np.full(n, None, dtype=object))
+                  for name in _VALIDATED_ATTRIBUTES}
+    
+    groups = {}
+    for i, signal in enumerate(signals):
+        groups.setdefault(type(signal), []).append(i)
+    
+    for positions in groups.values():
+        first = signals[positions[0]]
+        present = [name for name in _VALIDATED_ATTRIBUTES if hasattr(first, name)]
+        if not present:
+            continue
+        getter = attrgetter(*present)
+        rows = [getter(signals[i]) for i in positions]
+        if len(present) == 1:
+            rows = [(value,) for value in rows]
+        for name, values in zip(present, zip(*rows)):
+            has, column = attributes[name]
+            has[positions] = True
+            column[positions] = values
+    return attributes
+
+
+def _numeric_attribute(attributes: Dict[str, Tuple[np.ndarray, np.ndarray]], name: str,
+                       default: float) -> np.ndarray:
+    """數值屬性轉為 float64 陣列，缺少時以 default 代入"""
+    has, column = attributes[name]
+    return np.where(has, column, default).astype(np.float64)
+
+
+def _expand_invalid_details(signals: List, indices: np.ndarray, issue_bits: np.ndarray,
+                            issue_names: List[str]) -> List[Dict[str, Any]]:
+    """由無效信號的索引與問題位元建立 {'index', 'symbol', 'issues'} 明細列表"""
+    return [
+        {
+            'index': index,
+            'symbol': getattr(signals[index], 'symbol', 'Unknown'),
+            'issues': [name for bit, name in enumerate(issue_names) if bits >> bit & 1]
+        }
+        for index, bits in zip(indices.tolist(), issue_bits.tolist())
+    ]
+
+
 def validate_trading_signals(signals: List, signal_type: str = None) -> Dict[str, Any]:
     """
     驗證交易信號
@@ -166,73 +339,56 @@ def validate_trading_signals(signals: List, signal_type: str = None) -> Dict[str
             validation_result['issues'].append("沒有信號可驗證")
             return validation_result
         
-        valid_signals = []
-        invalid_signals = []
-        
-        for i, signal in enumerate(signals):
-            signal_valid = True
-            signal_issues = []
-            
-            # 檢查基本屬性
-            if not hasattr(signal, 'symbol') or not signal.symbol:
-                signal_issues.append("缺少股票代碼")
-                signal_valid = False
-            
-            if not hasattr(signal, 'signal_date') or not signal.signal_date:
-                signal_issues.append("缺少信號日期")
-                signal_valid = False
-            
-            if not hasattr(signal, 'price') or signal.price <= 0:
-                signal_issues.append("價格無效")
-                signal_valid = False
-            
-            if not hasattr(signal, 'total_score'):
-                signal_issues.append("缺少總評分")
-                signal_valid = False
-            elif not (0 <= signal.total_score <= 100):
-                signal_issues.append("評分超出範圍")
-                signal_valid = False
-            
-            # 根據信號類型進行特定驗證
-            if signal_type == 'turtle' or hasattr(signal, 'atr'):
-                if not hasattr(signal, 'atr') or signal.atr <= 0:
-                    signal_issues.append("ATR無效")
-                    signal_valid = False
-            
-            if signal_type == 'bnf' or hasattr(signal, 'deviation_rate'):
-                if not hasattr(signal, 'deviation_rate'):
-                    signal_issues.append("缺少乖離率")
-                    signal_valid = False
-            
-            if signal_type == 'coiled_spring' or hasattr(signal, 'volatility_10d'):
-                if not hasattr(signal, 'volatility_10d'):
-                    signal_issues.append("缺少波動性指標")
-                    signal_valid = False
-            
-            if signal_valid:
-                valid_signals.append(signal)
-            else:
-                invalid_signals.append({
-                    'index': i,
-                    'symbol': getattr(signal, 'symbol', 'Unknown'),
-                    'issues': signal_issues
-                })
-        
-        validation_result['valid_signals'] = len(valid_signals)
-        validation_result['invalid_signals'] = len(invalid_signals)
-        
-        if invalid_signals:
-            validation_result['issues'].append(f"發現 {len(invalid_signals)} 個無效信號")
-            validation_result['invalid_signal_details'] = invalid_signals
-        
-        # 統計資訊
-        if valid_signals:
-            scores = [s.total_score for s in valid_signals if hasattr(s, 'total_score')]
+        n = len(signals)
+        
+        # 各屬性一次取出為欄位陣列，缺少的屬性以無效值代入
+        attributes = _signal_attributes(signals)
+        has_score = attributes['total_score'][0]
+        scores = _numeric_attribute(attributes, 'total_score', np.nan)
+        atr = _numeric_attribute(attributes, 'atr', -1.0)
+        
+        # 依檢查順序排列的 (無效遮罩, 問題說明)
+        checks = [
+            (~np.fromiter(map(bool, attributes['symbol'][1]), dtype=bool, count=n), "缺少股票代碼"),
+            # signal_date 為 epoch 奈秒，0（1970-01-01）是有效日期，只以缺失值與 NaT 判斷
+            (pd.isna(attributes['signal_date'][1]) | (attributes['signal_date'][1] == NAT_SIGNAL_DATE),
+             "缺少信號日期"),
+            (_numeric_attribute(attributes, 'price', -1.0) <= 0, "價格無效"),
+            (~has_score, "缺少總評分"),
+            (has_score & ~((scores >= 0) & (scores <= 100)), "評分超出範圍"),
+            # 根據信號類型進行特定驗證（具備該屬性的信號一律檢查）
+            ((atr <= 0) & ((signal_type == 'turtle') | attributes['atr'][0]), "ATR無效"),
+        ]
+        if signal_type == 'bnf':
+            checks.append((~attributes['deviation_rate'][0], "缺少乖離率"))
+        if signal_type == 'coiled_spring':
+            checks.append((~attributes['volatility_10d'][0], "缺少波動性指標"))
+        
+        # 各信號的問題以位元記錄（第 k 位對應 checks[k]）
+        issue_bits = np.zeros(n, dtype=np.int64)
+        for bit, (mask, _) in enumerate(checks):
+            issue_bits |= mask.astype(np.int64) << bit
+        invalid = issue_bits != 0
+        invalid_count = int(np.count_nonzero(invalid))
+        
+        validation_result['valid_signals'] = n - invalid_count
+        validation_result['invalid_signals'] = invalid_count
+        
+        # 只在有無效信號時才展開明細
+        if invalid_count:
+            validation_result['issues'].append(f"發現 {invalid_count} 個無效信號")
+            validation_result['invalid_signal_details'] = _expand_invalid_details(
+                signals, np.flatnonzero(invalid), issue_bits[invalid], [issue for _, issue in checks]
+            )
+        
+        # 統計資訊（有效信號已確認具備 total_score）
+        valid_scores = scores[~invalid]
+        if valid_scores.size:
             validation_result['statistics'] = {
-                'avg_score': sum(scores) / len(scores) if scores else 0,
-                'min_score': min(scores) if scores else 0,
-                'max_score': max(scores) if scores else 0,
-                'high_quality_count': len([s for s in scores if s >= 70])
+                'avg_score': float(valid_scores.mean()),
+                'min_score': float(valid_scores.min()),
+                'max_score': float(valid_scores.max()),
+                'high_quality_count': int(np.count_nonzero(valid_scores >= 70))
             }
         
         if validation_result['invalid_signals'] > 0:
@@ -247,6 +403,59 @@ def validate_trading_signals(signals: List, signal_type: str = None) -> Dict[str
         return validation_result
 
 
+# 策略配置驗證規則（模組載入時建立一次，各次驗證共用）
+_REQUIRED_PARAMS = {
+    'turtle': ('atr_period', 'system1_entry', 'system2_entry', 'min_price', 'min_volume'),
+    'bnf': ('ma_period', 'deviation_threshold', 'min_price', 'min_volume'),
+    'coiled_spring': ('volatility_threshold', 'ma_periods', 'min_price', 'min_volume')
+}
+
+# (參數, 建議最小值, 建議最大值)
+_NUMERIC_RANGES = (
+    ('min_price', 0, 1000),
+    ('min_volume', 0, 10000000),
+    ('atr_period', 1, 100),
+    ('ma_period', 1, 200),
+    ('deviation_threshold', -1, 0)
+)
+_NUMERIC_MIN = np.array([min_val for _, min_val, _ in _NUMERIC_RANGES], dtype=np.float64)
+_NUMERIC_MAX = np.array([max_val for _, _, max_val in _NUMERIC_RANGES], dtype=np.float64)
+
+
+def _check_turtle_config(config: Dict[str, Any]) -> Optional[str]:
+    if 'system1_entry' in config and 'system2_entry' in config:
+        if config['system1_entry'] >= config['system2_entry']:
+            return "system1_entry 必須小於 system2_entry"
+    return None
+
+
+def _check_bnf_config(config: Dict[str, Any]) -> Optional[str]:
+    if 'deviation_threshold' in config and config['deviation_threshold'] > 0:
+        return "deviation_threshold 必須為負值"
+    return None
+
+
+def _check_coiled_spring_config(config: Dict[str, Any]) -> Optional[str]:
+    if 'ma_periods' in config:
+        if not isinstance(config['ma_periods'], list) or len(config['ma_periods']) != 3:
+            return "ma_periods 必須是包含3個元素的列表"
+    return None
+
+
+# 策略名稱 → 策略特定驗證（回傳問題說明或 None）
+_STRATEGY_CHECKS = {
+    'turtle': _check_turtle_config,
+    'bnf': _check_bnf_config,
+    'coiled_spring': _check_coiled_spring_config
+}
+
+_RECOMMENDATIONS = {
+    'turtle': "建議設定適當的風險參數",
+    'bnf': "建議根據市場條件調整乖離率閾值",
+    'coiled_spring': "建議定期檢查波動性參數"
+}
+
+
 def validate_strategy_config(config: Dict[str, Any], strategy_name: str) -> Dict[str, Any]:
     """
     驗證策略配置
@@ -273,71 +482,40 @@ def validate_strategy_config(config: Dict[str, Any], strategy_name: str) -> Dict
             return validation_result
         
         # 檢查必要參數
-        required_params = {
-            'turtle': ['atr_period', 'system1_entry', 'system2_entry', 'min_price', 'min_volume'],
-            'bnf': ['ma_period', 'deviation_threshold', 'min_price', 'min_volume'],
-            'coiled_spring': ['volatility_threshold', 'ma_periods', 'min_price', 'min_volume']
-        }
-        
-        if strategy_name in required_params:
-            missing_params = [param for param in required_params[strategy_name] 
-                            if param not in config]
+        required_params = _REQUIRED_PARAMS.get(strategy_name)
+        if required_params is not None:
+            missing_params = [param for param in required_params if param not in config]
             if missing_params:
                 validation_result['issues'].append(f"缺少必要參數: {missing_params}")
                 validation_result['is_valid'] = False
         
-        # 數值範圍驗證
-        numeric_checks = {
-            'min_price': (0, 1000),
-            'min_volume': (0, 10000000),
-            'atr_period': (1, 100),
-            'ma_period': (1, 200),
-            'deviation_threshold': (-1, 0)
-        }
-        
-        for param, (min_val, max_val) in numeric_checks.items():
+        # 數值範圍驗證：數值參數填入陣列（缺少或非數值為 NaN），一次與上下限比較
+        values = np.full(len(_NUMERIC_RANGES), np.nan)
+        for i, (param, _, _) in enumerate(_NUMERIC_RANGES):
             if param in config:
-                value = config[param]
-                if not isinstance(value, (int, float)):
+                if isinstance(config[param], (int, float)):
+                    values[i] = config[param]
+                else:
                     validation_result['issues'].append(f"參數 {param} 必須是數值")
                     validation_result['is_valid'] = False
-                elif not (min_val <= value <= max_val):
-                    validation_result['warnings'].append(
-                        f"參數 {param} 值 {value} 超出建議範圍 [{min_val}, {max_val}]"
-                    )
         
-        # 策略特定驗證
-        if strategy_name == 'turtle':
-            if 'system1_entry' in config and 'system2_entry' in config:
-                if config['system1_entry'] >= config['system2_entry']:
-                    validation_result['issues'].append(
-                        "system1_entry 必須小於 system2_entry"
-                    )
-                    validation_result['is_valid'] = False
-        
-        elif strategy_name == 'bnf':
-            if 'deviation_threshold' in config:
-                if config['deviation_threshold'] > 0:
-                    validation_result['issues'].append(
-                        "deviation_threshold 必須為負值"
-                    )
-                    validation_result['is_valid'] = False
+        for i in np.flatnonzero((values < _NUMERIC_MIN) | (values > _NUMERIC_MAX)):
+            param, min_val, max_val = _NUMERIC_RANGES[i]
+            validation_result['warnings'].append(
+                f"參數 {param} 值 {config[param]} 超出建議範圍 [{min_val}, {max_val}]"
+            )
         
-        elif strategy_name == 'coiled_spring':
-            if 'ma_periods' in config:
-                if not isinstance(config['ma_periods'], list) or len(config['ma_periods']) != 3:
-                    validation_result['issues'].append(
-                        "ma_periods 必須是包含3個元素的列表"
-                    )
-                    validation_result['is_valid'] = False
+        # 策略特定驗證
+        strategy_check = _STRATEGY_CHECKS.get(strategy_name)
+        if strategy_check is not None:
+            issue = strategy_check(config)
+            if issue:
+                validation_result['issues'].append(issue)
+                validation_result['is_valid'] = False
         
         # 生成建議
-        if strategy_name == 'turtle':
-            validation_result['recommendations'].append("建議設定適當的風險參數")
-        elif strategy_name == 'bnf':
-            validation_result['recommendations'].append("建議根據市場條件調整乖離率閾值")
-        elif strategy_name == 'coiled_spring':
-            validation_result['recommendations'].append("建議定期檢查波動性參數")
+        if strategy_name in _RECOMMENDATIONS:
+            validation_result['recommendations'].append(_RECOMMENDATIONS[strategy_name])
         
         return validation_result
         
@@ -353,6 +531,8 @@ def clean_data(data: pd.DataFrame, remove_duplicates: bool = True,
     """
     清理資料
     
+    只在實際需要修改時才建立新的DataFrame；資料不需清理時直接回傳原物件
+    
     Args:
         data: 原始資料
         remove_duplicates: 是否移除重複記錄
@@ -362,30 +542,33 @@ def clean_data(data: pd.DataFrame, remove_duplicates: bool = True,
         清理後的資料
     """
     try:
-        cleaned_data = data.copy()
+        cleaned_data = data
         
         # 移除重複記錄
         if remove_duplicates:
-            original_count = len(cleaned_data)
-            cleaned_data = cleaned_data.drop_duplicates()
-            removed_count = original_count - len(cleaned_data)
+            # 重複遮罩只計算一次；沒有重複時不再建立新的DataFrame
+            duplicated = cleaned_data.duplicated().to_numpy()
+            removed_count = int(np.count_nonzero(duplicated))
             if removed_count > 0:
+                cleaned_data = cleaned_data[~duplicated]
                 logger.info(f"移除了 {removed_count} 筆重複記錄")
         
-        # 填充缺失值
-        if fill_missing:
+        # 填充缺失值（有缺失值時才複製，避免修改呼叫端的資料或篩選出的視圖）
+        if fill_missing and cleaned_data.isna().to_numpy().any():
+            cleaned_data = cleaned_data.copy()
+            
             # 對價格欄位使用前向填充
-            price_columns = ['Open', 'High', 'Low', 'Close']
-            for col in price_columns:
-                if col in cleaned_data.columns:
-                    cleaned_data[col] = cleaned_data[col].fillna(method='ffill')
+            price_columns = [col for col in ['Open', 'High', 'Low', 'Close'] if col in cleaned_data.columns]
+            if price_columns:
+                cleaned_data[price_columns] = cleaned_data[price_columns].ffill()
             
             # 對成交量使用0填充
             if 'Volume' in cleaned_data.columns:
                 cleaned_data['Volume'] = cleaned_data['Volume'].fillna(0)
         
         # 移除包含NaN的行
-        cleaned_data = cleaned_data.dropna()
+        if cleaned_data.isna().to_numpy().any():
+            cleaned_data = cleaned_data.dropna()
         
         logger.info(f"資料清理完成，保留 {len(cleaned_data)} 筆記錄")
         return cleaned_data
@@ -395,12 +578,13 @@ def clean_data(data: pd.DataFrame, remove_duplicates: bool = True,
         return data
 
 
-def validate_data_consistency(data: pd.DataFrame) -> Dict[str, Any]:
+def validate_data_consistency(data: pd.DataFrame, ohlcv: Optional[np.ndarray] = None) -> Dict[str, Any]:
     """
     驗證資料一致性
     
     Args:
         data: 股票資料 DataFrame
+        ohlcv: 已由 validate_all 取出的 OHLCV 陣列，為 None 時自行取出
     
     Returns:
         一致性檢查結果
@@ -417,35 +601,51 @@ def validate_data_consistency(data: pd.DataFrame) -> Dict[str, Any]:
             consistency_result['is_consistent'] = False
             return consistency_result
         
-        # 檢查價格邏輯一致性
-        if all(col in data.columns for col in ['Open', 'High', 'Low', 'Close']):
-            # High >= max(Open, Close)
-            high_consistency = (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
-            if not high_consistency:
-                consistency_result['issues'].append("High 價格邏輯不一致")
-                consistency_result['is_consistent'] = False
+        high_bad = low_bad = large_jumps = volume_outliers = None
+        
+        if ohlcv is None and all(col in data.columns for col in _OHLCV_COLUMNS):
+            ohlcv = data[_OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        
+        if ohlcv is not None:
+            # 完整 OHLCV 時所有檢查融合為單次掃描（已安裝 numba 時為 JIT 編譯）
+            high_bad, low_bad, large_jumps, volume_outliers = consistency_counts(*ohlcv.T)
+        else:
+            # 價格欄位一次取出為陣列（fmax / fmin 與 pandas 相同略過缺失值）
+            if all(col in data.columns for col in ['Open', 'High', 'Low', 'Close']):
+                open_, high, low, close = data[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T
+                high_bad = int(np.count_nonzero(~(high >= np.fmax(open_, close))))
+                low_bad = int(np.count_nonzero(~(low <= np.fmin(open_, close))))
             
-            # Low <= min(Open, Close)
-            low_consistency = (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
-            if not low_consistency:
-                consistency_result['issues'].append("Low 價格邏輯不一致")
-                consistency_result['is_consistent'] = False
-        
-        # 檢查價格跳躍
-        if 'Close' in data.columns:
-            price_changes = data['Close'].pct_change().abs()
-            large_jumps = (price_changes > 0.2).sum()  # 20%以上的跳躍
-            if large_jumps > 0:
-                consistency_result['issues'].append(f"發現 {large_jumps} 次大幅價格跳躍")
-                consistency_result['statistics']['large_price_jumps'] = large_jumps
+            if 'Close' in data.columns:
+                close = data['Close'].to_numpy(dtype=np.float64)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    price_changes = np.abs(np.diff(close) / close[:-1])
+                large_jumps = int(np.count_nonzero(price_changes > 0.2))
+            
+            if 'Volume' in data.columns:
+                # 平均與樣本標準差（ddof=1，與 pandas 相同）
+                volume = data['Volume'].to_numpy(dtype=np.float64)
+                volume_mean = np.nanmean(volume)
+                volume_std = np.nanstd(volume, ddof=1)
+                volume_outliers = int(np.count_nonzero(np.abs(volume - volume_mean) > 3 * volume_std))
+        
+        # 檢查價格邏輯一致性：High >= max(Open, Close)、Low <= min(Open, Close)
+        if high_bad:
+            consistency_result['issues'].append("High 價格邏輯不一致")
+            consistency_result['is_consistent'] = False
+        
+        if low_bad:
+            consistency_result['issues'].append("Low 價格邏輯不一致")
+            consistency_result['is_consistent'] = False
+        
+        # 檢查價格跳躍（20%以上）
+        if large_jumps:
+            consistency_result['issues'].append(f"發現 {large_jumps} 次大幅價格跳躍")
+            consistency_result['statistics']['large_price_jumps'] = large_jumps
         
         # 檢查成交量異常
-        if 'Volume' in data.columns:
-            volume_mean = data['Volume'].mean()
-            volume_std = data['Volume'].std()
-            volume_outliers = ((data['Volume'] - volume_mean).abs() > 3 * volume_std).sum()
-            if volume_outliers > 0:
-                consistency_result['statistics']['volume_outliers'] = volume_outliers
+        if volume_outliers:
+            consistency_result['statistics']['volume_outliers'] = volume_outliers
         
         return consistency_result
         
@@ -454,3 +654,24 @@ def validate_data_consistency(data: pd.DataFrame) -> Dict[str, Any]:
         consistency_result['is_consistent'] = False
         consistency_result['issues'].append(f"檢查過程發生錯誤: {e}")
         return consistency_result
+
+
+def validate_all(data: pd.DataFrame) -> Dict[str, Any]:
+    """
+    一次執行價格資料、資料品質與資料一致性驗證
+    
+    OHLCV 欄位只從DataFrame取出一次陣列，三項檢查共用
+    
+    Args:
+        data: 股票資料 DataFrame
+    
+    Returns:
+        {'price_valid': validate_price_data 結果, 'quality': check_data_quality 結果,
+         'consistency': validate_data_consistency 結果}
+    """
+    ohlcv = _ohlcv_array(data)
+    return {
+        'price_valid': validate_price_data(data, ohlcv),
+        'quality': check_data_quality(data, ohlcv),
+        'consistency': validate_data_consistency(data, ohlcv)
+    }